@@ -46,9 +46,18 @@ import json
 import sys
 import os
 import math
+import hashlib
+import shutil
+import subprocess
+import copy
+import struct
+import time
 #from dataclasses import dataclass
-# Third-party libraries (currently not used)
-#import numpy
+# Third-party libraries (optional, inlet plane generation is vectorized with numpy if available)
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 # Neue globale Hilfsfunktionen für Polygonüberlappung und Gruppierung
 
@@ -198,14 +207,16 @@ def get_simulation_data(json_file_path=None):
         - json_file_path: Pfad zur JSON-Datei
         - simulation_data: geladene Daten (dict)
     Input:
-        - json_file_path: Optionaler Pfad zur JSON-Datei. Wenn None, wird 'simulation_parameters.json' im gleichen Verzeichnis wie das Skript verwendet.
+        - json_file_path: Optionaler Pfad zur JSON-Datei. Wenn None, wird das erste Kommandozeilenargument bzw.
+          'simulation_parameters.json' im gleichen Verzeichnis wie das Skript verwendet.
     Output:
         - Dictionary mit Simulationsdaten
     Usage:
         - Zentrale Funktion zum Einlesen aller Simulationsparameter für nachfolgende Verarbeitung
     """
     if json_file_path is None:
-        json_file_path = os.path.join(os.path.dirname(__file__), 'simulation_parameters.json')
+        # server.js passes the JSON path as first argument, the spin-up case is generated the same way
+        json_file_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), 'simulation_parameters.json')
     if not os.path.exists(json_file_path):
         print(f"Fehler: Datei {json_file_path} nicht gefunden!")
         sys.exit(1)
@@ -296,6 +307,84 @@ class WakeRegion:
         subdivided = WakeRegion.subdivide_rectangles()
         return subdivided  # id assignment now happens in subdivide_rectangles
 
+    @staticmethod
+    def getWakeRegionBoxes():
+        """
+        Liefert die Boxen der unterteilten Wake-Regionen im Mesh-KOS (vor transformPoints).
+
+        Internal Parameter:
+            - simulationArea: SimulationArea-Objekt (Zentrum und Rotation)
+            - wakeHeight: Höhe der Wake-Boxen (höchste Nabe + 1.5 * größter Rotorradius)
+        Input:
+            - keine (liest aus SimulationArea, WindTurbines, getSubdividedWakeRegions)
+        Output:
+            - Liste von Dicts mit "id" und "box" (xMin, yMin, zMin, xMax, yMax, zMax)
+        Usage:
+            - topoSetDict.wakeregions und check_refinement_transitions
+        """
+        simulationArea = SimulationArea.getSimulationArea()
+        turbine_data = WindTurbines.getTurbines()
+        wakeHeight = max(t['hubHeight'] for t in turbine_data['turbines']) + ( 1.5 * max(t['rotorRadius'] for t in turbine_data['turbines']))
+
+        wakeBoxes = []
+        for wake in WakeRegion.getSubdividedWakeRegions():
+            # Shift wake coordinates by simulationArea center
+            shifted_points = [(pt[0] - simulationArea.center[0], pt[1] - simulationArea.center[1])
+                              for pt in wake["coordinates"]]
+            # Apply inverse rotation to align with mesh (angle = -rotation_angle)
+            angle = simulationArea.rotation_angle_rad
+            rotated_points = [(p[0]*math.cos(angle) + p[1]*math.sin(angle),
+                               -p[0]*math.sin(angle) + p[1]*math.cos(angle))
+                              for p in shifted_points]
+            xs = [pt[0] for pt in rotated_points]
+            ys = [pt[1] for pt in rotated_points]
+            wakeBoxes.append({
+                "id": wake["id"],
+                "box": (min(xs), min(ys), 0, max(xs), max(ys), wakeHeight),
+            })
+        return wakeBoxes
+
+    @staticmethod
+    def getNearWakeRegions():
+        """
+        Erzeugt die Near-Wake-Schalen (feinste Verfeinerungsstufe) pro Turbine im Mesh-KOS.
+
+        Internal Parameter:
+            - meshSettings: MeshSettings-Objekt (nearWakeLength in Rotordurchmessern)
+            - halfwidth, upstream, downstream: Abmessungen der Schale (wie createWakeRectangle in main.js)
+        Input:
+            - keine (liest aus SimulationArea, WindTurbines, MeshSettings)
+        Output:
+            - Liste von Dicts mit "id", "turbine", "coordinates" (Mesh-KOS, vor transformPoints) und "zMax"
+        Usage:
+            - topoSetDict.nearwake (Vereinigungsmenge nearWake für refineMesh) im Modus nestedWakeRefinement
+        """
+        simulationArea = SimulationArea.getSimulationArea()
+        turbines = WindTurbines.getTurbines()['turbines']
+        meshSettings = MeshSettings.getMeshSettings()
+        angle = simulationArea.rotation_angle_rad
+
+        nearWakeRegions = []
+        for turbine in turbines:
+            # shift by simulationArea center and de-rotate (same transformation as topoSetDict.wakeregions)
+            px = turbine['coordinates'][0] - simulationArea.center[0]
+            py = turbine['coordinates'][1] - simulationArea.center[1]
+            tx = px * math.cos(angle) + py * math.sin(angle)
+            ty = -px * math.sin(angle) + py * math.cos(angle)
+            rotorRadius = turbine['rotorRadius']
+            # upstream depth and half width like createWakeRectangle (main.js), the wake points to -x
+            halfwidth = turbine['sphereRadius'] * rotorRadius
+            upstream = turbine['sphereRadius'] * rotorRadius
+            downstream = meshSettings.nearWakeLength * 2 * rotorRadius
+            nearWakeRegions.append({
+                "id": f"NearWake_{turbine['id']}",
+                "turbine": turbine['id'],
+                "coordinates": [(tx - downstream, ty - halfwidth), (tx + upstream, ty - halfwidth),
+                                (tx + upstream, ty + halfwidth), (tx - downstream, ty + halfwidth)],
+                "zMax": turbine['hubHeight'] + 1.5 * rotorRadius,
+            })
+        return nearWakeRegions
+
     @staticmethod
     def subdivide_rectangles(tol=1e-9):
        # option 2: disabled ()
@@ -819,6 +908,9 @@ class WindTurbines:
             "endEffects": turbines_data.get("endEffects", ""),
             "hubCheckbox": turbines_data.get("hubCheckbox", False),
             "towerCheckbox": turbines_data.get("towerCheckbox", False),
+            # optional: choose the blade element count from the finest cell size (default: 17 elements)
+            "adaptiveBladeElements": turbines_data.get("adaptiveBladeElements", False),
+            "elementSpacingCells": turbines_data.get("elementSpacingCells", 1.0),
         }
         turbines = [
             {
@@ -834,6 +926,91 @@ class WindTurbines:
         ]
         return {"turbines": turbines, "fvOptions": fvOptionsTurbines}
 
+    @staticmethod
+    def getAlmCellSets():
+        """
+        Erzeugt die kompakten cellSets für das Actuator-Line-Modell (ein Zylinder um die Rotorscheibe pro Turbine).
+
+        Internal Parameter:
+            - margin: Gauß-Projektionsbreite der ALM-Kräfte (almProjectionCells Zellen der feinsten Stufe)
+            - halfLength: halbe Zylinderlänge entlang der Rotorachse (inkl. Turmabstand)
+        Input:
+            - keine (liest aus SimulationArea, WindTurbines, MeshSettings, compute_mesh_parameters)
+        Output:
+            - Liste von Dicts mit "id", "turbine", "p1", "p2", "radius" (Mesh-KOS, vor transformPoints)
+              und optional "towerBox" (xMin, yMin, zMin, xMax, yMax, zMax)
+        Usage:
+            - topoSetDict.wakeregions bzw. topoSetDict.nearwake und cellSet in fvOptions
+        """
+        simulationArea = SimulationArea.getSimulationArea()
+        turbine_data = WindTurbines.getTurbines()
+        meshSettings = MeshSettings.getMeshSettings()
+        angle = simulationArea.rotation_angle_rad
+        # forces are projected with a gaussian of width ~2 cells of the finest level (cell_size / 16)
+        margin = meshSettings.almProjectionCells * compute_mesh_parameters()['fine_cell_size']
+        tower = turbine_data['fvOptions']['towerCheckbox']
+        # tower elements sit 10 m off the rotor plane (elementData in create_fvOptions)
+        towerOffset, towerRadius = 10.0, 2.25
+
+        almCellSets = []
+        for turbine in turbine_data['turbines']:
+            # shift by simulationArea center and de-rotate (same transformation as topoSetDict.wakeregions)
+            px = turbine['coordinates'][0] - simulationArea.center[0]
+            py = turbine['coordinates'][1] - simulationArea.center[1]
+            tx = px * math.cos(angle) + py * math.sin(angle)
+            ty = -px * math.sin(angle) + py * math.cos(angle)
+            hubHeight = turbine['hubHeight']
+            # rotor axis is aligned with x in the mesh, the wake points to -x
+            halfLength = margin + (towerOffset if tower else 0)
+            almCellSet = {
+                "id": f"ALM_{turbine['id']}",
+                "turbine": turbine['id'],
+                "p1": (tx - halfLength, ty, hubHeight),
+                "p2": (tx + halfLength, ty, hubHeight),
+                "radius": turbine['rotorRadius'] + margin,
+            }
+            if tower:
+                # the tower reaches below the rotor disc down to the ground
+                almCellSet["towerBox"] = (tx - halfLength, ty - towerRadius - margin, 0,
+                                          tx + halfLength, ty + towerRadius + margin, hubHeight)
+            almCellSets.append(almCellSet)
+        return almCellSets
+
+    @staticmethod
+    def getRotorDiscs():
+        """
+        Erzeugt die Scheiben für die rotorgemittelte Geschwindigkeit (an der Rotorebene und stromauf).
+
+        Internal Parameter:
+            - thickness: Scheibendicke, zwei Zellen der feinsten Stufe (stromauf mindestens eine refine3-Zelle)
+            - upstream: Abstand der vorderen Scheibe (Solver.discUpstream Rotordurchmesser), stromauf ist +x im Mesh
+        Input:
+            - keine (liest aus get_turbine_frames, SolverParameters, compute_mesh_parameters)
+        Output:
+            - Liste von Dicts mit "id" (rotorDisc_<TurbineId> bzw. upstreamDisc_<TurbineId>), "turbine",
+              "p1", "p2" und "radius" (Mesh-KOS, vor transformPoints); Scheiben vor dem Inlet entfallen
+        Usage:
+            - topoSetDict.wakeregions bzw. topoSetDict.nearwake und system/rotorDiscAverages
+        """
+        solverParameters = SolverParameters.getSolverParameters()
+        meshParams = compute_mesh_parameters()
+        halfThickness = meshParams['fine_cell_size']
+        discs = []
+        for frame in get_turbine_frames():
+            tx, ty = frame['mesh']
+            upstream = solverParameters.discUpstream * 2 * frame['rotorRadius']
+            for name, offset in (("rotorDisc", 0.0), ("upstreamDisc", upstream)):
+                if tx + offset + halfThickness >= meshParams['xMax']:
+                    continue
+                discs.append({
+                    "id": f"{name}_{frame['id']}",
+                    "turbine": frame['id'],
+                    "p1": (tx + offset - halfThickness, ty, frame['hubHeight']),
+                    "p2": (tx + offset + halfThickness, ty, frame['hubHeight']),
+                    "radius": frame['rotorRadius'],
+                })
+        return discs
+
 # Umgebungs-Parameter
 #------------------------------------------------
 class Environment:
@@ -842,6 +1019,15 @@ class Environment:
     turbIntensity_inlet: float = 0.0
     profileHeights_inlet: list = []
     cellDensity: float = 0.0
+    inletPlane: bool = False
+    inletFormat: str = "binary"
+    windVeer: float = 0.0
+    referenceHeight = "firstHub"
+    inletTurbulence: str = "digitalFilter"
+    inflowInterval: float = 0.5
+    inflowChunk: int = 100
+    inflowLengthScale: float = 20.0
+    inflowSeed: int = 1
 
     def __init__(self, simulation_data):
         environment = simulation_data["environment"]["wind"]
@@ -850,6 +1036,21 @@ class Environment:
         self.turbIntensity_inlet = environment["turbulenceIntensity"]
         self.profileHeights_inlet = environment["profileHeights"]
         self.cellDensity = simulation_data["environment"]["cellDensity"]
+        # optional: 2D inlet plane at the inlet face centres instead of the profileHeights column
+        self.inletPlane = environment.get("inletPlane", False)
+        # "binary" or "ascii" boundaryData (inlet plane only)
+        self.inletFormat = environment.get("inletFormat", "binary")
+        # change of wind direction with height in deg per 100 m (same sense as direction)
+        self.windVeer = environment.get("windVeer", 0.0)
+        # height where speed is given: "firstHub", "meanHub" or a height in m
+        self.referenceHeight = environment.get("referenceHeight", "firstHub")
+        # "digitalFilter" (in the solver) or "precomputed" (time series for timeVaryingMappedFixedValue)
+        self.inletTurbulence = environment.get("inletTurbulence", "digitalFilter")
+        # precomputed inflow: snapshot spacing in s, snapshots per chunk, lateral length scale in m, seed
+        self.inflowInterval = environment.get("inflowInterval", 0.5)
+        self.inflowChunk = environment.get("inflowChunk", 100)
+        self.inflowLengthScale = environment.get("inflowLengthScale", 20.0)
+        self.inflowSeed = environment.get("inflowSeed", 1)
 
     @staticmethod
     def getEnvironment():
@@ -864,6 +1065,44 @@ class SolverParameters:
     deltaT: float = 0.0
     writeInterval: float = 0.0
     computeCores: int = 0
+    decompositionMethod: str = "scotch"
+    timeStepMode: str = "fixed"
+    maxCo: float = 0.8
+    tipCellsPerStep: float = 1.0
+    weightedDecomposition: bool = False
+    almCellCost: float = 0.02
+    fieldAverage: bool = False
+    fvSolutionPreset: str = "default"
+    flowThroughSchedule: bool = False
+    spinUpFlowThroughs: float = 1.0
+    averagingFlowThroughs: float = 2.0
+    averageStart: float = 60
+    convergenceStop: bool = False
+    convergenceTolerance: float = 0.01
+    convergenceBatches: int = 10
+    convergenceMinWindow: float = 1.0
+    convergenceCheckInterval: int = 300
+    diskBudget: float = 0.0
+    outputFields: list = ["U"]
+    checkpointMode: bool = False
+    checkpointInterval: float = 0.0
+    checkpointCount: int = 2
+    previousCores: int = 0
+    coarseSpinUp: bool = False
+    spinUpCoarsening: int = 1
+    adaptFlowThroughs: float = 0.25
+    initialField: str = "uniform"
+    initialPerturbation: float = 0.0
+    perturbationSeed: int = 1
+    surfaceSampling: bool = True
+    sampleInterval: float = 0.0
+    sampleFormat: str = "vtk"
+    sampleDistances: list = [1, 3, 5, 7]
+    sampleFields: list = ["U"]
+    rotorDiscAverage: bool = False
+    discUpstream: float = 2.5
+    discInterval: int = 10
+    averageRegion: str = "domain"
 
     def __init__(self, solver_data):
         self.startTime = solver_data["startTime"]
@@ -871,6 +1110,72 @@ class SolverParameters:
         self.deltaT = solver_data["deltaT"]
         self.writeInterval = solver_data["writeInterval"]
         self.computeCores = solver_data["computeCores"]
+        # optional: scotch (default), hierarchical or multiLevel
+        self.decompositionMethod = solver_data.get("decompositionMethod", "scotch")
+        # optional: fixed (deltaT as given), auto (largest stable deltaT) or adaptive (adjustTimeStep with maxCo/maxDeltaT)
+        self.timeStepMode = solver_data.get("timeStepMode", "fixed")
+        self.maxCo = solver_data.get("maxCo", 0.8)
+        # blade tip travel per time step in cells of the finest level (actuator line constraint)
+        self.tipCellsPerStep = solver_data.get("tipCellsPerStep", 1.0)
+        # weight ALM cells in the decomposition, cost of one blade element projection per cell
+        # relative to the flow solution of one cell
+        self.weightedDecomposition = solver_data.get("weightedDecomposition", False)
+        self.almCellCost = solver_data.get("almCellCost", 0.02)
+        # derive averaging start and endTime from flow-through times (xDepth / windSpeed)
+        self.flowThroughSchedule = solver_data.get("flowThroughSchedule", False)
+        self.spinUpFlowThroughs = solver_data.get("spinUpFlowThroughs", 1.0)
+        self.averagingFlowThroughs = solver_data.get("averagingFlowThroughs", 2.0)
+        # include system/fieldAverage (mean/prime2Mean of U and p) in controlDict, on by default with the schedule
+        self.fieldAverage = solver_data.get("fieldAverage", self.flowThroughSchedule)
+        # fieldAverage over the whole domain or only over the wake regions (cellZone averageZone)
+        self.averageRegion = solver_data.get("averageRegion", "domain")
+        # timeStart of fieldAverage without schedule, "auto" = spin-up estimate (default with averageRegion wake)
+        self.averageStart = solver_data.get("averageStart", "auto" if self.averageRegion == "wake" else 60)
+        # watchdog (utilConvergenceWatchdog.sh) sets stopAt writeNow once the turbine statistics are converged:
+        # relative standard error of the batch means below convergenceTolerance, averaging window at least
+        # convergenceMinWindow flow-through times, checked every convergenceCheckInterval seconds (wall-clock)
+        self.convergenceStop = solver_data.get("convergenceStop", False)
+        self.convergenceTolerance = solver_data.get("convergenceTolerance", 0.01)
+        self.convergenceBatches = solver_data.get("convergenceBatches", 10)
+        self.convergenceMinWindow = solver_data.get("convergenceMinWindow", 1.0)
+        self.convergenceCheckInterval = solver_data.get("convergenceCheckInterval", 300)
+        # disk budget for the results in GB (0 = no limit), fields kept as time series when the budget is tight
+        self.diskBudget = solver_data.get("diskBudget", 0.0)
+        self.outputFields = solver_data.get("outputFields", ["U"])
+        # rolling restart snapshots (every checkpointInterval, default 5 * writeInterval, the last checkpointCount kept),
+        # startFrom latestTime and Allrun.restart.slurm for runs split into wall-time chunks
+        self.checkpointMode = solver_data.get("checkpointMode", False)
+        self.checkpointInterval = solver_data.get("checkpointInterval", 0.0) or 5 * self.writeInterval
+        self.checkpointCount = solver_data.get("checkpointCount", 2)
+        # core count of the existing decomposed run, a different computeCores generates Allredistribute.slurm
+        self.previousCores = solver_data.get("previousCores", 0)
+        # spin-up (spinUpFlowThroughs) on a coarse companion case in spinUp/ with spinUpCoarsening levels less,
+        # the fine run maps the developed fields and only needs adaptFlowThroughs before averaging
+        self.coarseSpinUp = solver_data.get("coarseSpinUp", False)
+        self.spinUpCoarsening = solver_data.get("spinUpCoarsening", 1)
+        self.adaptFlowThroughs = solver_data.get("adaptFlowThroughs", 0.25)
+        # uniform ($UInitial) or logLaw (inlet profile per cell centre via setExprFields), optional random
+        # perturbation relative to the local velocity
+        self.initialField = solver_data.get("initialField", "uniform")
+        self.initialPerturbation = solver_data.get("initialPerturbation", 0.0)
+        self.perturbationSeed = solver_data.get("perturbationSeed", 1)
+        # default (static settings) or scaled (GAMG agglomeration from the cells per rank)
+        self.fvSolutionPreset = solver_data.get("fvSolutionPreset", "default")
+        # surfaces function object (sampleSliceDict): hub-height planes, rotor plane and cross-sections at
+        # sampleDistances rotor diameters downstream, streamwise cuts; every sampleInterval (default writeInterval)
+        self.surfaceSampling = solver_data.get("surfaceSampling", True)
+        self.sampleInterval = solver_data.get("sampleInterval", 0.0) or self.writeInterval
+        self.sampleFormat = solver_data.get("sampleFormat", "vtk")
+        self.sampleDistances = solver_data.get("sampleDistances", [1, 3, 5, 7])
+        self.sampleFields = solver_data.get("sampleFields", ["U"])
+        # volume average of U per turbine over a disc at the rotor and discUpstream rotor diameters upstream,
+        # written every discInterval time steps (system/rotorDiscAverages)
+        self.rotorDiscAverage = solver_data.get("rotorDiscAverage", False)
+        self.discUpstream = solver_data.get("discUpstream", 2.5)
+        self.discInterval = solver_data.get("discInterval", 10)
+
+    def isRedistribution(self):
+        return bool(self.previousCores) and self.previousCores != self.computeCores
 
     @staticmethod
     def getSolverParameters():
@@ -878,23 +1183,197 @@ class SolverParameters:
         solver_data = simulation_data["Solver"]
         return SolverParameters(solver_data)
 
+# Mesh-Parameter (optional, Standardwerte erhalten das bisherige Verhalten)
+#------------------------------------------------
+class MeshSettings:
+    verticalGrading: bool = False
+    boundaryLayerHeight: float = 1000.0
+    verticalExpansionRatio: float = 1.2
+    nestedWakeRefinement: bool = False
+    nearWakeLength: float = 3.0
+    decompositionFriendly: bool = False
+    maxExtentChange: float = 0.05
+    meshCache: bool = False
+    meshCacheDir: str = "meshCache"
+    transitionCells: int = 2
+    autoGrowRefinement: bool = False
+    almProjectionCells: int = 6
+    skipRefinementLevels: int = 0
+
+    def __init__(self, mesh_data):
+        self.verticalGrading = mesh_data.get("verticalGrading", False)
+        self.boundaryLayerHeight = mesh_data.get("boundaryLayerHeight", 1000.0)
+        self.verticalExpansionRatio = mesh_data.get("verticalExpansionRatio", 1.2)
+        self.nestedWakeRefinement = mesh_data.get("nestedWakeRefinement", False)
+        # near wake length in rotor diameters downstream of the rotor
+        self.nearWakeLength = mesh_data.get("nearWakeLength", 3.0)
+        # snap the base lattice to the decomposition, relative change of the domain extent
+        self.decompositionFriendly = mesh_data.get("decompositionFriendly", False)
+        self.maxExtentChange = mesh_data.get("maxExtentChange", 0.05)
+        # cache finished meshes under a fingerprint of the mesh inputs (path relative to the case)
+        self.meshCache = mesh_data.get("meshCache", False)
+        self.meshCacheDir = mesh_data.get("meshCacheDir", "meshCache")
+        # minimum buffer (in cells of the parent level) between nested refinement boxes
+        self.transitionCells = mesh_data.get("transitionCells", 2)
+        self.autoGrowRefinement = mesh_data.get("autoGrowRefinement", False)
+        # radial/axial margin of the ALM cellSets in cells of the finest level (3 gaussian widths)
+        self.almProjectionCells = mesh_data.get("almProjectionCells", 6)
+        # leave out the finest levels (1: wake refinement, 2: also refine3), used for the coarse spin-up case
+        self.skipRefinementLevels = mesh_data.get("skipRefinementLevels", 0)
+
+    @staticmethod
+    def getMeshSettings():
+        simulation_data = get_simulation_data()
+        # "mesh" is optional, missing keys fall back to the defaults above
+        return MeshSettings(simulation_data.get("mesh", {}))
+
+# Cluster-Profil (optional, ohne Profil bleiben die bisherigen SLURM-Einstellungen)
+#------------------------------------------------
+class ClusterProfile:
+    coresPerNode: int = 0
+    memoryPerNode: float = 0.0
+    partition: str = "compute"
+    postPartition: str = "compute"
+    hyperthreading: bool = False
+    wallTime: str = "512:00:00"
+    memoryCalibration: float = 0.0
+    throughputCoefficient: float = 1.0e-6
+    costCalibration: float = 0.0
+    targetEfficiency: float = 0.7
+
+    def __init__(self, cluster_data):
+        # physical cores and memory (GB) per node, 0 = no profile
+        self.coresPerNode = cluster_data.get("coresPerNode", 0)
+        self.memoryPerNode = cluster_data.get("memoryPerNode", 0.0)
+        self.partition = cluster_data.get("partition", "compute")
+        self.postPartition = cluster_data.get("postPartition", self.partition)
+        # one rank per hardware thread instead of one per physical core
+        self.hyperthreading = cluster_data.get("hyperthreading", False)
+        self.wallTime = cluster_data.get("wallTime", "512:00:00")
+        # factor on the estimated memory per rank, 0 = learned from past runs (memoryCalibration.json)
+        self.memoryCalibration = cluster_data.get("memoryCalibration", 0.0)
+        # seconds per cell work unit per core and time step, 0 calibration = learned (costCalibration.json)
+        self.throughputCoefficient = cluster_data.get("throughputCoefficient", 1.0e-6)
+        self.costCalibration = cluster_data.get("costCalibration", 0.0)
+        # minimum parallel efficiency for the recommended core count
+        self.targetEfficiency = cluster_data.get("targetEfficiency", 0.7)
+
+    @staticmethod
+    def getClusterProfile():
+        simulation_data = get_simulation_data()
+        return ClusterProfile(simulation_data.get("cluster", {}))
+
+# Zerlegung für decomposePar (nx * ny * nz = computeCores)
+#------------------------------------------------
+def compute_decomposition(cores, xElem, yElem, zElem, maxExtentChange=0.0):
+    """
+    Sucht die Zerlegung nx * ny * nz = cores mit möglichst würfelförmigen Subdomains
+    (minimale Halo-Fläche pro Subdomain) auf dem Grundgitter.
+
+    Internal Parameter:
+        - divisors: Teiler von cores
+        - snap: Hilfsfunktion, rundet eine Elementanzahl auf ein Vielfaches von n (innerhalb maxExtentChange)
+        - halo: Oberfläche einer Subdomain in Zellflächen
+    Input:
+        - cores: Anzahl der Subdomains (SolverParameters.computeCores)
+        - xElem, yElem, zElem: Elementanzahl des Grundgitters
+        - maxExtentChange: erlaubte relative Änderung der Gebietsausdehnung in x und y (0 = keine Anpassung)
+    Output:
+        - dict mit "n" (nx, ny, nz), "xElem", "yElem" (ggf. angepasst)
+    Usage:
+        - compute_mesh_parameters (decompositionFriendly) und create_decomposeParDict (hierarchical/multiLevel)
+    """
+    cores = max(int(cores), 1)
+    divisors = [d for d in range(1, cores + 1) if cores % d == 0]
+
+    def snap(elem, n):
+        # nearest multiple of n within the allowed extent change, prefer growing the domain
+        if elem % n == 0:
+            return elem
+        candidates = [k * n for k in (elem // n, elem // n + 1) if k > 0]
+        candidates = [c for c in candidates if abs(c - elem) <= maxExtentChange * elem]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda c: (abs(c - elem), -c))
+
+    best = None
+    for nx in divisors:
+        for ny in [d for d in divisors if (cores // nx) % d == 0]:
+            nz = cores // (nx * ny)
+            if nx > xElem or ny > yElem or nz > zElem:
+                continue
+            xSnap = snap(xElem, nx) or xElem
+            ySnap = snap(yElem, ny) or yElem
+            # subdomain size in base cells and its surface (halo communication)
+            a, b, c = xSnap / nx, ySnap / ny, zElem / nz
+            halo = a * b + b * c + a * c
+            # lattice that does not divide evenly is penalised
+            uneven = (xSnap % nx != 0) + (ySnap % ny != 0)
+            key = (uneven, halo)
+            if best is None or key < best[0]:
+                best = (key, (nx, ny, nz), xSnap, ySnap)
+
+    if best is None:
+        return {"n": (cores, 1, 1), "xElem": xElem, "yElem": yElem}
+    return {"n": best[1], "xElem": best[2], "yElem": best[3]}
+
+# Refinement-Höhen vergrößern (autoGrowRefinement)
+#------------------------------------------------
+def grow_refinement_heights(refineHeights, wakeHeight, cell_size, transitionCells, zMax=None, lattice=None):
+    """
+    Vergrößert refine3, refine2 und refine1 nach oben, bis zwischen allen Stufen mindestens
+    transitionCells Zellen der jeweils gröberen Stufe liegen (2:1-Übergänge).
+
+    Internal Parameter:
+        - levelCell: Zellgröße der Eltern-Stufe (cell_size / 2**level)
+    Input:
+        - refineHeights: [refine1height, refine2height, refine3height]
+        - wakeHeight: Oberkante der Wake-Boxen (Stufe 4)
+        - cell_size: Grundzellgröße
+        - transitionCells: Mindestanzahl Zellen der Eltern-Stufe zwischen zwei Boxen
+        - zMax: optionale Gebietshöhe (Boxen werden darauf begrenzt, Oberkante = Rand)
+        - lattice: optionales Raster, auf das die Höhen aufgerundet werden
+    Output:
+        - [refine1height, refine2height, refine3height]
+    Usage:
+        - compute_mesh_parameters bei mesh.autoGrowRefinement
+    """
+    grown = list(refineHeights)
+    childHeight = wakeHeight
+    # refine3 (index 2) contains the wake boxes, refine2 contains refine3, refine1 contains refine2
+    for index, level in ((2, 3), (1, 2), (0, 1)):
+        levelCell = cell_size / 2 ** level
+        height = max(grown[index], childHeight + transitionCells * levelCell)
+        if lattice:
+            height = math.ceil(height / lattice) * lattice
+        if zMax is not None:
+            height = min(height, zMax)
+        grown[index] = height
+        childHeight = height
+    return grown
+
 # find ideal dimension, as close to input as possible, inital values before refinements
 #------------------------------------------------
 def compute_mesh_parameters():
     sim_area = SimulationArea.getSimulationArea()
     environment = Environment.getEnvironment()
+    meshSettings = MeshSettings.getMeshSettings()
+    turbines = WindTurbines.getTurbines()['turbines']
     """
     Compute meshing parameters from a SimulationArea instance and cellDensity.
 
     Parameters:
         sim_area (SimulationArea): Instance containing simulation area dimensions.
         cell_density (float): Cell density value from the simulation.
+        meshSettings (MeshSettings): optional vertical mesh design (verticalGrading) and
+            decomposition-friendly lattice (decompositionFriendly, maxExtentChange).
 
     Returns:
         dict: A dictionary with keys:
             scale, cell_size, xElem, yElem, zElem,
             xMin, xMax, xDepth, yMin, yMax, yWidth,
-            zMin, zMax, zWidth.
+            zMin, zMax, zWidth, zGrading, refineHeights, total_cells,
+            decomposition (nx, ny, nz).
     """
 
     # set default scale
@@ -906,7 +1385,66 @@ def compute_mesh_parameters():
     # Use sim_area.depth for x-dimension and sim_area.width for y-dimension fiiting cell size
     xElem = math.ceil(sim_area.depth / cell_size)
     yElem = math.ceil(sim_area.width / cell_size)
-    zElem = math.ceil(1000 / cell_size)
+
+    # refine3 encloses all rotors (highest hub + 2 * largest rotor radius)
+    maxHubHeight = max(t['hubHeight'] for t in turbines)
+    maxRotorRadius = max(t['rotorRadius'] for t in turbines)
+    refine3height = maxHubHeight + (2 * maxRotorRadius)
+    # wake boxes (topoSetDict.wakeregions / nearwake) reach up to highest hub + 1.5 * largest rotor radius
+    wakeHeight = maxHubHeight + (1.5 * maxRotorRadius)
+
+    if not meshSettings.verticalGrading:
+        # fixed 1000 m domain, uniform cells, refine1 spans the whole height
+        zElem = math.ceil(1000 / cell_size)
+        zFineElem = zElem
+        zGrading = "1"
+        refine1height = math.ceil(zElem * cell_size)
+        refine2height = refine1height + ((refine3height - refine1height) / 2)
+        if meshSettings.autoGrowRefinement:
+            refine1height, refine2height, refine3height = grow_refinement_heights(
+                [refine1height, refine2height, refine3height], wakeHeight, cell_size,
+                meshSettings.transitionCells, zMax=zElem * cell_size
+            )
+    else:
+        # vertical mesh design: refinement heights on the base lattice,
+        # one base cell buffer between the levels keeps the 2:1 transitions clean
+        refine3height = math.ceil(refine3height / cell_size) * cell_size
+        refine2height = refine3height + cell_size
+        refine1height = refine2height + cell_size
+        if meshSettings.autoGrowRefinement:
+            refine1height, refine2height, refine3height = grow_refinement_heights(
+                [refine1height, refine2height, refine3height], wakeHeight, cell_size,
+                meshSettings.transitionCells, lattice=cell_size
+            )
+        # uniform cells up to one base cell above refine1
+        zFineElem = round(refine1height / cell_size) + 1
+        zFine = zFineElem * cell_size
+        # domain height: boundary layer height, at least two rotor diameters above the fine region
+        zTarget = math.ceil(max(meshSettings.boundaryLayerHeight, zFine + 4 * maxRotorRadius))
+        # geometric stretching above zFine, first cell = cell_size * ratio
+        ratio = meshSettings.verticalExpansionRatio
+        zStretch = zTarget - zFine
+        if ratio > 1:
+            zStretchElem = math.ceil(math.log(1 + zStretch * (ratio - 1) / (cell_size * ratio)) / math.log(ratio))
+        else:
+            zStretchElem = math.ceil(zStretch / cell_size)
+        zStretchElem = max(zStretchElem, 1)
+        zElem = zFineElem + zStretchElem
+        # multi-grading in z: (length fraction, cell fraction, expansion ratio) per section
+        zGrading = (
+            f"(({round(zFine / zTarget, 6)} {round(zFineElem / zElem, 6)} 1) "
+            f"({round(zStretch / zTarget, 6)} {round(zStretchElem / zElem, 6)} {round(ratio ** (zStretchElem - 1), 6)}))"
+        )
+
+    # decomposition into nx * ny * nz subdomains for computeCores, optionally snap the
+    # horizontal lattice to it (z is fixed by the vertical mesh design)
+    decomposition = compute_decomposition(
+        SolverParameters.getSolverParameters().computeCores, xElem, yElem, zElem,
+        meshSettings.maxExtentChange if meshSettings.decompositionFriendly else 0.0
+    )
+    if meshSettings.decompositionFriendly:
+        xElem, yElem = decomposition["xElem"], decomposition["yElem"]
+
     # total cells before refinement
     total_cells = xElem * yElem * zElem
 
@@ -922,7 +1460,7 @@ def compute_mesh_parameters():
 
     # calc Height Parameters (z)
     zMin = 0
-    zMax = zElem * cell_size
+    zMax = zElem * cell_size if not meshSettings.verticalGrading else zTarget
     zHeight = zMax - zMin
 
     return {
@@ -939,174 +1477,1349 @@ def compute_mesh_parameters():
         "yWidth": yWidth,
         "zMin": zMin,
         "zMax": zMax,
-        "zHeight": zHeight
+        "zHeight": zHeight,
+        "zFineElem": zFineElem,
+        "zGrading": zGrading,
+        "refineHeights": [refine1height, refine2height, refine3height],
+        # finest cells of the refined mesh (turbines and wake)
+        "fine_cell_size": cell_size / 2 ** (4 - meshSettings.skipRefinementLevels),
+        "total_cells": total_cells,
+        "decomposition": decomposition["n"]
     }
 
-# Initialize Objects
-#------------------------------------------------
-
-
-################################################
-#------------------------------------------------
-# PREPROCESSING Settings
+# Mesh-Fingerprint für den Mesh-Cache
 #------------------------------------------------
-################################################
+def compute_mesh_fingerprint():
+    """
+    Berechnet einen Fingerprint aus allen Eingaben, die das Mesh beeinflussen.
 
+    Internal Parameter:
+        - meshInputs: dict mit Simulationsgebiet (inkl. Rotation), cellDensity, Mesh-Parametern
+          (Refinement-Boxen, Grading), Turbinengeometrie und (Near-)Wake-Regionen; die Rotorscheiben
+          (rotorDiscAverage) und die Mittelungszone (averageRegion wake) nur, wenn sie im gecachten
+          topoSet-Lauf entstehen
+    Input:
+        - keine (liest aus get_simulation_data, compute_mesh_parameters, WakeRegion, WindTurbines)
+    Output:
+        - Fingerprint (str, 12 Hex-Zeichen)
+    Usage:
+        - Schlüssel für den Mesh-Cache in Allpre (meshCache); Solver-Parameter wie Windgeschwindigkeit,
+          Turbulenzintensität, TSR oder endTime ändern den Fingerprint nicht
+    """
+    simulation_data = get_simulation_data()
+    meshSettings = MeshSettings.getMeshSettings()
+    solverParameters = SolverParameters.getSolverParameters()
+    # decomposition only affects the processor meshes, those are cached per core count
+    meshParams = {key: value for key, value in compute_mesh_parameters().items() if key != "decomposition"}
+    meshInputs = {
+        "simulationArea": simulation_data["simulationArea"],
+        "cellDensity": Environment.getEnvironment().cellDensity,
+        "meshParameters": meshParams,
+        "turbines": [
+            (t["coordinates"], t["hubHeight"], t["rotorRadius"], t["sphereRadius"])
+            for t in WindTurbines.getTurbines()["turbines"]
+        ],
+        "wakeRegions": WakeRegion.getSubdividedWakeRegions(),
+        "nearWakeRegions": WakeRegion.getNearWakeRegions() if meshSettings.nestedWakeRefinement else [],
+        "almCellSets": WindTurbines.getAlmCellSets(),
+    }
+    if solverParameters.rotorDiscAverage:
+        # rotorDisc/upstreamDisc cellSets are created by the cached topoSet run
+        meshInputs["rotorDiscs"] = WindTurbines.getRotorDiscs()
+    if compute_zone_average()["active"]:
+        # averageRegion cellSet and averageZone cellZone (see write_average_zone_actions)
+        meshInputs["averageZone"] = [wake["box"] for wake in WakeRegion.getWakeRegionBoxes()]
+    return hashlib.sha1(json.dumps(meshInputs, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+# Zeitschritt aus CFL- und Blattspitzen-Kriterium
 #------------------------------------------------
-# Allclean
-#------------------------------------------------
-def create_allclean_script():
+def compute_time_step():
     """
-    Erstellt das Skript 'Allclean' zum Bereinigen des Simulationsverzeichnisses.
-    
+    Berechnet den größten stabilen Zeitschritt aus der feinsten Zellgröße, der Windgeschwindigkeit
+    (CFL-Kriterium) und der Blattspitzengeschwindigkeit (Spitze bewegt sich höchstens tipCellsPerStep Zellen pro Schritt).
+
     Internal Parameter:
-        - allclean_path: Pfad zur Ausgabedatei
+        - fineCell: Zellgröße der feinsten Stufe (cell_size / 16)
+        - deltaT_cfl: maxCo * fineCell / windSpeed
+        - deltaT_tip: tipCellsPerStep * fineCell / (tipSpeedRatio * windSpeed) pro Turbine
+        - nice_floor: rundet auf 1, 2, 2.5 oder 5 * 10^n ab (Ausgabezeiten bleiben Vielfache von deltaT)
     Input:
-        - keine (liest Zielordner aus get_case_folder)
+        - keine (liest aus compute_mesh_parameters, Environment, WindTurbines, SolverParameters)
     Output:
-        - Schreibt Shell-Skript 'Allclean' in den Case-Ordner
+        - dict mit "deltaT" (gewählter Zeitschritt, bei fixed = Eingabe), "stableDeltaT", "driver" (CFL oder Turbine),
+          "maxCo" und "maxDeltaT" (für adjustTimeStep), "mode"
     Usage:
-        - Wird vor jedem neuen Simulationslauf ausgeführt, um alte Ergebnisse zu entfernen
+        - create_controlDict und print_simulation_summary
     """
-    allclean_path = os.path.join(get_case_folder(), "Allclean")
-
-    with open(allclean_path, 'w') as file:
-        file.write("#!/bin/sh\n\n")
-        file.write("### Script for cleaning the folder of the offshore wind park simulation\n")
-        file.write("### HLRS, 2024-2025\n\n")
-
-        file.write("rm log.* slurm.* \n")
-        file.write("\n")
-        file.write("# Lösche Ordner\n")
-        file.write("rm -rf constant/polyMesh processor*\n")    
-        file.write("\n")
-        file.write("find . -maxdepth 1 -type d -regextype posix-extended -regex '\\./[0-9]{1,9}' -exec rm -rf {} +\n")
-        file.write("\n")
-    # print(f"Allclean successfully created at: \n{allclean_path}")
-
-create_allclean_script()
+    solverParameters = SolverParameters.getSolverParameters()
+    windSpeed = Environment.getEnvironment().windSpeed
+    fineCell = compute_mesh_parameters()['fine_cell_size']
+
+    def nice_floor(value):
+        exponent = math.floor(math.log10(value))
+        mantissa = value / 10 ** exponent
+        step = max(m for m in (1, 2, 2.5, 5, 10) if m <= mantissa + 1e-9)
+        return round(step * 10 ** exponent, 12)
+
+    deltaT_cfl = solverParameters.maxCo * fineCell / windSpeed
+    stableDeltaT, driver = deltaT_cfl, "CFL"
+    maxTipSpeedRatio = 0.0
+    for turbine in WindTurbines.getTurbines()['turbines']:
+        maxTipSpeedRatio = max(maxTipSpeedRatio, turbine['tipSpeedRatio'])
+        if turbine['tipSpeedRatio'] > 0:
+            deltaT_tip = solverParameters.tipCellsPerStep * fineCell / (turbine['tipSpeedRatio'] * windSpeed)
+            if deltaT_tip < stableDeltaT:
+                stableDeltaT, driver = deltaT_tip, f"tip speed {turbine['id']}"
+    stableDeltaT = nice_floor(stableDeltaT)
+
+    # the tip constraint as courant number of the free stream: Co = windSpeed * deltaT / fineCell
+    maxCo = solverParameters.maxCo
+    if maxTipSpeedRatio > 0:
+        maxCo = min(maxCo, solverParameters.tipCellsPerStep / maxTipSpeedRatio)
+
+    deltaT = solverParameters.deltaT if solverParameters.timeStepMode == "fixed" else stableDeltaT
+    return {
+        "mode": solverParameters.timeStepMode,
+        "deltaT": deltaT,
+        "stableDeltaT": stableDeltaT,
+        "driver": driver,
+        "maxCo": round(maxCo, 6),
+        "maxDeltaT": stableDeltaT,
+    }
 
+# Blattelemente (umgetastete elementData)
 #------------------------------------------------
-# Allpre
-#------------------------------------------------
+# resampled tables per (bladeType, nElements), filled by resample_blade_elements
+bladeElementCache = {}
 
-def create_allpre_script():
+def resample_blade_elements(bladeType, baseElements, nElements):
     """
-    Erstellt das Skript 'Allpre' zur Vorbereitung des Grids und der Mesh-Verfeinerung.
-    
+    Tastet die radiale Blatttabelle (elementData, elementProfiles) auf nElements Punkte um und schreibt sie
+    als abgeleitete Include-Dateien {bladeType}_{nElements}_elementData/_elementProfiles.
+
     Internal Parameter:
-        - allpre_path: Pfad zur Ausgabedatei
-        - wake_names: Liste der Wake-Region-IDs
+        - blade_folder: constant/{bladeType}_Blade im Case-Ordner
+        - rows: (Werte, Kommentar) je Zeile der Ausgangstabelle (axialDistance, radius, azimuth, chord, chordMount, twist)
+        - profiles: Profilnamen je Zeile der Ausgangstabelle
     Input:
-        - keine (liest Zielordner und Wake-Regionen aus get_case_folder/WakeRegion)
+        - bladeType: z.B. NREL15MW
+        - baseElements: Punktzahl der Ausgangstabelle (z.B. "17")
+        - nElements: gewünschte Punktzahl
     Output:
-        - Schreibt Shell-Skript 'Allpre' in den Case-Ordner
+        - Name des Element-Sets (str(nElements)); Dateien werden nur geschrieben, wenn sie noch nicht existieren
     Usage:
-        - Automatisiert die Mesh-Erstellung und -Verfeinerung für OpenFOAM
+        - create_fvOptions bei turbines.adaptiveBladeElements; Radien gleichmäßig zwischen erstem und letztem Punkt,
+          Sehne, Verwindung usw. linear interpoliert, Profil des nächstgelegenen Ausgangspunkts
     """
-    allpre_path = os.path.join(get_case_folder(), "Allpre")
-
-    with open(allpre_path, 'w') as file:
-        file.write("#!/bin/sh\n\n")
-
-        file.write("### Script for preparing the grid for the offshore wind park simulation\n")
-        file.write("### HLRS, 2024-2025\n\n")
-
-        file.write(". $WM_PROJECT_DIR/bin/tools/RunFunctions\n")
-        file.write("\n")
-
-        # Replace turbine_names loop with wake_names loop.
-        # Original code:
-        # turbine_names = [turbine[0] for turbine in WindTurbines.getTurbines().turbine_coordinates]
-        wake_names = [wake["id"] for wake in WakeRegion.getSubdividedWakeRegions()]
-        file.write("loopRefineMesh () {\n")
-        file.write("    for SET in " + " ".join(wake_names) + " ; do\n")
-        file.write("        sed -i \"0,/set [a-zA-Z0-9_]*/s//set ${SET}/\" system/refineMeshDict.wakeregions \n")
-        # Update runApplication command to use wake_${SET} instead of windturbine_${SET}
-        file.write("        runApplication -s wake_${SET} refineMesh -overwrite -dict system/refineMeshDict.wakeregions\n")
-        file.write("    done\n")
-        file.write("}\n\n")
-
-        file.write("runApplication blockMesh -dict system/blockMeshDict\n")
-        file.write("\n")
-        # ------------------------------------------------
-        # approx refine1 500m refine2 250m refine3 1000m
-        file.write("runApplication -s refine1 topoSet -dict system/topoSetDict.refine1\n")
-        file.write("runApplication -s refine1 refineMesh -overwrite -dict system/refineMeshDict.refine1\n")
-        file.write("runApplication -s refine2 topoSet -dict system/topoSetDict.refine2\n")
-        file.write("runApplication -s refine2 refineMesh -overwrite -dict system/refineMeshDict.refine2\n")
-        file.write("runApplication -s refine3 topoSet -dict system/topoSetDict.refine3\n")
-        file.write("runApplication -s refine3 refineMesh -overwrite -dict system/refineMeshDict.refine3\n")
-        #------------------------------------------------
-
+    key = (bladeType, nElements)
+    if key in bladeElementCache:
+        return bladeElementCache[key]
+
+    blade_folder = os.path.join(get_case_folder(), "constant", f"{bladeType}_Blade")
+    elementData_path = os.path.join(blade_folder, f"{bladeType}_{nElements}_elementData")
+    elementProfiles_path = os.path.join(blade_folder, f"{bladeType}_{nElements}_elementProfiles")
+    if str(nElements) == str(baseElements) or (os.path.exists(elementData_path) and os.path.exists(elementProfiles_path)):
+        bladeElementCache[key] = str(nElements)
+        return bladeElementCache[key]
+
+    rows = []
+    with open(os.path.join(blade_folder, f"{bladeType}_{baseElements}_elementData"), 'r') as file:
+        for line in file:
+            line = line.strip()
+            if not line.startswith("("):
+                continue
+            values = [float(v) for v in line[1:line.index(")")].split()]
+            comment = line.split("//", 1)[1].strip() if "//" in line else ""
+            rows.append((values, comment))
+    profiles = []
+    with open(os.path.join(blade_folder, f"{bladeType}_{baseElements}_elementProfiles"), 'r') as file:
+        for line in file:
+            line = line.split("//", 1)[0].strip()
+            if line:
+                profiles.append(line)
+
+    radii = [values[1] for values, _ in rows]
+    resampled = []
+    for i in range(nElements):
+        radius = radii[0] + (radii[-1] - radii[0]) * i / (nElements - 1)
+        # linear interpolation between the neighbouring base points
+        j = max(k for k in range(len(radii) - 1) if radii[k] <= radius) if radius < radii[-1] else len(radii) - 2
+        weight = (radius - radii[j]) / (radii[j + 1] - radii[j])
+        values = [a + weight * (b - a) for a, b in zip(rows[j][0], rows[j + 1][0])]
+        values[1] = radius
+        # profile assignment and comment from the nearest base point
+        nearest = min(range(len(radii)), key=lambda k: abs(radii[k] - radius))
+        resampled.append((values, rows[nearest][1], profiles[nearest]))
+
+    with open(elementData_path, 'w') as file:
+        file.write(f"// Blade element data for {bladeType} with {nElements} actuator points "
+                   f"(resampled from {bladeType}_{baseElements}_elementData)\n")
+        file.write("// axialDistance, radius, azimuth, chord, chordMount, twist\n")
+        for values, comment, _ in resampled:
+            file.write("(\t" + "\t".join(f"{round(v, 4):g}" for v in values) + f"\t)\t//\t{comment}\n")
+    with open(elementProfiles_path, 'w') as file:
+        file.write(f"// Blade element profiles for {bladeType} with {nElements} actuator points "
+                   f"(resampled from {bladeType}_{baseElements}_elementProfiles)\n")
+        for i, (_, _, profile) in enumerate(resampled, start=1):
+            file.write(f"{profile}\t//{i}\n")
+
+    bladeElementCache[key] = str(nElements)
+    return bladeElementCache[key]
+
+def compute_blade_elements(turbine):
+    """
+    Bestimmt die Anzahl der Blattelemente einer Turbine aus der feinsten Zellgröße.
 
-        file.write("\n")
-        file.write("runApplication -s wakeregions topoSet -dict system/topoSetDict.wakeregions\n")
-        file.write("loopRefineMesh\n")
-        file.write("\n")
+    Internal Parameter:
+        - fineCell: Zellgröße der feinsten Stufe (cell_size / 16)
+        - span: radiale Länge der Ausgangstabelle (letzter - erster Radius)
+    Input:
+        - turbine: Turbinen-Dict aus WindTurbines.getTurbines
+    Output:
+        - (nElements, elementSet): Anzahl der Elemente und Namensteil der elementData/elementProfiles-Includes
+    Usage:
+        - create_fvOptions; ohne turbines.adaptiveBladeElements bleibt es bei 17 Elementen und der Ausgangstabelle,
+          sonst etwa ein Element pro elementSpacingCells feinsten Zellen
+    """
+    fvOptionsTurbines = WindTurbines.getTurbines()['fvOptions']
+    bladeType = turbine['turbineType'].split('_')[0]
+    baseElements = turbine['turbineType'].split('_')[-1]
+    if not fvOptionsTurbines['adaptiveBladeElements']:
+        return 17, baseElements
+
+    with open(os.path.join(get_case_folder(), "constant", f"{bladeType}_Blade",
+                           f"{bladeType}_{baseElements}_elementData"), 'r') as file:
+        radii = [float(line.split()[2]) for line in file if line.strip().startswith("(")]
+    fineCell = compute_mesh_parameters()['fine_cell_size']
+    span = radii[-1] - radii[0]
+    # at least 5 elements per blade, roughly one element per elementSpacingCells finest cells
+    nElements = max(5, round(span / (fvOptionsTurbines['elementSpacingCells'] * fineCell)) + 1)
+    return nElements, resample_blade_elements(bladeType, baseElements, nElements)
+
+# Abschätzung der Zellanzahl nach der Verfeinerung
+#------------------------------------------------
+def estimate_cell_counts():
+    """
+    Schätzt die Zellanzahl des fertigen Meshes aus den Volumina der Verfeinerungsboxen.
 
-        file.write("\n")
-        # rotate (rotation center alsways 0 0 0, beware of relative simulationarea position, its influencing rotation)
-        file.write(f"runApplication -s iter1 transformPoints -rollPitchYaw '(0 0 {SimulationArea.getSimulationArea().rotation_angle_deg})'\n")
-        # -rollPitchYaw <vector>
+    Internal Parameter:
+        - levelVolumes: Volumen der Boxen je Stufe (refine1-3, Wake-Boxen; Überlappungen doppelt gezählt)
+        - levelCell: Zellgröße je Stufe (cell_size / 2**level, refineMesh teilt in alle drei Richtungen)
+        - maxLevel: feinste erzeugte Stufe (4 - skipRefinementLevels), Volumen darüber zählt zu maxLevel
+    Input:
+        - keine (liest aus compute_mesh_parameters, get_refinement_boxes, WindTurbines.getAlmCellSets)
+    Output:
+        - dict mit "total" (Zellen gesamt), "levels" (Zellen je Stufe 0-4), "alm" (Zellen je ALM-cellSet)
+          und "wake" (Zellen in den Wake-Regionen, Größe der cellZone averageZone)
+    Usage:
+        - Lastverteilung (compute_load_balance) und Zusammenfassung
+    """
+    meshParams = compute_mesh_parameters()
+    cell_size = meshParams['cell_size']
+    levelVolumes = [0.0] * 5
+    for box in get_refinement_boxes():
+        xMin, yMin, zMin, xMax, yMax, zMax = box["box"]
+        levelVolumes[box["level"]] += (xMax - xMin) * (yMax - yMin) * (zMax - zMin)
+
+    # base cells outside refine1 (also covers the stretched cells above the fine region)
+    levels = [meshParams['total_cells'] - meshParams['xElem'] * meshParams['yElem'] * round(meshParams['refineHeights'][0] / cell_size)]
+    maxLevel = 4 - MeshSettings.getMeshSettings().skipRefinementLevels
+    for level in range(1, 5):
+        innerVolume = levelVolumes[level + 1] if level < maxLevel else 0.0
+        levels.append(round((levelVolumes[level] - innerVolume) / (cell_size / 2 ** level) ** 3) if level <= maxLevel else 0)
+
+    fineCellVolume = meshParams['fine_cell_size'] ** 3
+    alm = {}
+    for almCellSet in WindTurbines.getAlmCellSets():
+        length = almCellSet["p2"][0] - almCellSet["p1"][0]
+        volume = math.pi * almCellSet["radius"] ** 2 * length
+        if "towerBox" in almCellSet:
+            xMin, yMin, zMin, xMax, yMax, zMax = almCellSet["towerBox"]
+            volume += (xMax - xMin) * (yMax - yMin) * (zMax - zMin)
+        alm[almCellSet["turbine"]] = round(volume / fineCellVolume)
+    # wake regions: finest level where refined (near-wake shells with nestedWakeRefinement), refine3 level elsewhere
+    wakeVolume = sum((box[3] - box[0]) * (box[4] - box[1]) * (box[5] - box[2])
+                     for box in (wake["box"] for wake in WakeRegion.getWakeRegionBoxes()))
+    fineWakeVolume = min(levelVolumes[4], wakeVolume)
+    wake = round(fineWakeVolume / fineCellVolume + (wakeVolume - fineWakeVolume) / (8 * fineCellVolume))
+    return {"total": sum(levels), "levels": levels, "alm": alm, "wake": wake}
+
+# Mittelung nur in den Wake-Regionen
+#------------------------------------------------
+def compute_zone_average():
+    """
+    Entscheidet, ob fieldAverage bei Solver.averageRegion wake nur in der cellZone averageZone mittelt.
 
-        #translate to actual position
-        # file.write(f"runApplication -s iter2 transformPoints -translate '( {center_x} {center_y} 0)'\n\n")
-        # -translate <vector>
-        # Translate by specified <vector> before rotations
-        # file.write("\n")
-        # overwriting initial conditions
-        # file.write("python createInletBoundaryData.py\n")
-        file.write("\n")
-        # Postprocessing Mesh
-        ################################################
-        # Option1: parallel VTK generation (conflicts with Allrun)
-        # parallel VTK generation
-        # file.write("runApplication decomposePar\n")
-        # file.write("runParallel renumberMesh -overwrite \n")
-        # file.write(f"mpirun -np {computeCores} foamToVTK -parallel \n")
+    Internal Parameter:
+        - fraction: Anteil der Wake-Zellen an allen Zellen (estimate_cell_counts)
+        - domainBytes: Mittelwerte des Standard-fieldAverage (UMean, UPrime2Mean, pMean, pPrime2Mean, 88 B pro Zelle)
+        - zoneBytes: laufende Mittel der Zone (88 B pro Zonen-Zelle) plus das beim Schreiben angelegte volle
+          UPrime2Mean (48 B pro Zelle)
+    Input:
+        - keine (liest aus SolverParameters, estimate_cell_counts)
+    Output:
+        - dict mit "requested" (fieldAverage mit averageRegion wake), "active" (requested und zoneBytes < domainBytes),
+          "fraction", "domainBytes" und "zoneBytes" (pro Zelle des Gebiets)
+    Usage:
+        - compute_mesh_fingerprint, estimate_rank_memory, compute_io_plan, write_average_zone_actions,
+          create_fieldAverage und print_simulation_summary; sonst gilt der Standard-fieldAverage
+    """
+    solverParameters = SolverParameters.getSolverParameters()
+    cellCounts = estimate_cell_counts()
+    fraction = min(1.0, cellCounts["wake"] / cellCounts["total"])
+    requested = solverParameters.fieldAverage and solverParameters.averageRegion == "wake"
+    domainBytes = 24 + 48 + 8 + 8
+    zoneBytes = domainBytes * fraction + 48
+    return {
+        "requested": requested,
+        "active": requested and zoneBytes < domainBytes,
+        "fraction": fraction,
+        "domainBytes": domainBytes,
+        "zoneBytes": zoneBytes,
+    }
 
-        #Option2: serial VTK generation
-        file.write("runApplication checkMesh\n")
-        file.write("runApplication foamToVTK\n")
-        file.write("\n")
-        # prepare for Solver
-        file.write("restore0Dir \n")
-        file.write("runApplication decomposePar \n")
-        file.write("runParallel renumberMesh -overwrite \n")
+# Lastverteilung mit ALM-Gewichtung
+#------------------------------------------------
+def compute_load_balance(cores=None):
+    """
+    Schätzt die Lastungleichheit der Zerlegung ohne und mit Gewichtung der ALM-Zellen.
 
-        #Check log.files
-        file.write("grep -i 'error' log.* || echo 'no errors!' \n")
+    Internal Parameter:
+        - weights: Gewicht je Turbine, 1 + almCellCost * 3 Blätter * nElements
+        - share: Zellen je Rank bei gleichmäßiger Zerlegung (total / computeCores)
+        - meanLoad, maxLoad: mittlere und höchste Last eines Ranks (in Zell-Einheiten)
+        - almPeak: höchste ALM-Last eines Ranks bei gewichteter Zerlegung; ALM-Projektion und Druckkorrektor
+          sind durch globale Reduktionen getrennt, der langsamste Rank jeder Phase bestimmt die Schrittzeit
+    Input:
+        - cores: Anzahl der Ranks (Standard computeCores)
+    Output:
+        - dict mit "weights" (pro Turbine), "unweighted" und "weighted" (Ungleichheit maxLoad / meanLoad - 1),
+          "almWork" (Zusatzlast der ALM-Zellen in Zell-Einheiten)
+    Usage:
+        - create_cellWeights (Gewichtsfeld für decomposePar), compute_run_cost und print_simulation_summary
+    """
+    solverParameters = SolverParameters.getSolverParameters()
+    cellCounts = estimate_cell_counts()
+    weights = {}
+    for turbine in WindTurbines.getTurbines()['turbines']:
+        nElements, _ = compute_blade_elements(turbine)
+        weights[turbine['id']] = round(1 + solverParameters.almCellCost * 3 * nElements, 3)
+
+    cores = cores or solverParameters.computeCores
+    share = cellCounts["total"] / cores
+    almWork = sum(n * (weights[t] - 1) for t, n in cellCounts["alm"].items())
+    meanLoad = (cellCounts["total"] + almWork) / cores
+    # cell counts are balanced: a rotor either fills whole ranks or sits on top of one rank's share
+    maxLoad = share
+    for turbine, n in cellCounts["alm"].items():
+        maxLoad = max(maxLoad, share * weights[turbine] if n >= share else share + n * (weights[turbine] - 1))
+    # weights are balanced: rotor ranks hold meanLoad / weight cells, the other ranks meanLoad plain cells;
+    # the flow phase waits for the latter, the ALM phase for the rotor ranks
+    almPeak = max((n if n * weights[turbine] < meanLoad else meanLoad / weights[turbine]) * (weights[turbine] - 1)
+                  for turbine, n in cellCounts["alm"].items()) if cellCounts["alm"] else 0.0
+    return {
+        "weights": weights,
+        "unweighted": maxLoad / meanLoad - 1,
+        "weighted": almPeak / meanLoad,
+        "almWork": almWork,
+    }
 
-    # print(f"Allpre successfully created at: \n{allpre_path}")
+# Speicherbedarf pro Rank
+#------------------------------------------------
+def get_calibration(fileName, override=0.0):
+    """
+    Liefert einen Kalibrierfaktor (gemessen / geschätzt) aus früheren Läufen.
 
-create_allpre_script()
+    Internal Parameter:
+        - calibration_path: Kalibrierdatei im Case-Ordner (bleibt bei Allclean erhalten)
+    Input:
+        - fileName: memoryCalibration.json oder costCalibration.json
+        - override: fester Faktor aus dem Cluster-Profil (0 = aus Messungen)
+    Output:
+        - Kalibrierfaktor (float, 1.0 ohne Messungen)
+    Usage:
+        - estimate_rank_memory und compute_run_cost; Mittelwert der letzten fünf Läufe
+    """
+    if override:
+        return override
+    calibration_path = os.path.join(get_case_folder(), fileName)
+    if not os.path.exists(calibration_path):
+        return 1.0
+    with open(calibration_path, 'r') as file:
+        factors = list(json.load(file).values())[-5:]
+    return sum(factors) / len(factors) if factors else 1.0
+
+def update_run_calibration():
+    """
+    Lernt die Kalibrierfaktoren für Speicher und Laufzeit aus log.slurm_pimpleFoam eines früheren Laufs.
 
+    Internal Parameter:
+        - log_path: log.slurm_pimpleFoam im Case-Ordner
+        - memEstimate: memEstimatePerRank (MB), maxRSS: größter memMaxRSS-Wert (kB) aller Ranks (/usr/bin/time)
+        - costEstimate: costEstimatePerStep (s), executionTimes: ExecutionTime je Zeitschritt
+    Input:
+        - keine (liest aus dem Case-Ordner)
+    Output:
+        - Ergänzt memoryCalibration.json und costCalibration.json um {slurmJobId: gemessen / geschätzt}
+    Usage:
+        - Wird vor create_allrun_slurm_script aufgerufen (Allrun.slurm schreibt die Schätzungen in das Log)
+    """
+    log_path = os.path.join(get_case_folder(), "log.slurm_pimpleFoam")
+    if not os.path.exists(log_path):
+        return
+    jobId, memEstimate, maxRSS, costEstimate = None, None, 0, None
+    executionTimes = []
+    with open(log_path, 'r', errors='ignore') as file:
+        for line in file:
+            if line.startswith("slurmJobId="):
+                jobId = line.strip().split("=", 1)[1]
+            elif line.startswith("memEstimatePerRank="):
+                memEstimate = float(line.strip().split("=", 1)[1].rstrip("MB"))
+            elif line.startswith("costEstimatePerStep="):
+                costEstimate = float(line.strip().split("=", 1)[1].rstrip("s"))
+            elif line.startswith("memMaxRSS="):
+                maxRSS = max(maxRSS, float(line.strip().split("=", 1)[1].rstrip("kB")))
+            elif line.startswith("ExecutionTime ="):
+                executionTimes.append(float(line.split()[2]))
+    if not jobId:
+        return
+
+    def store(fileName, factor):
+        calibration_path = os.path.join(get_case_folder(), fileName)
+        calibration = {}
+        if os.path.exists(calibration_path):
+            with open(calibration_path, 'r') as file:
+                calibration = json.load(file)
+        calibration[jobId] = round(factor, 3)
+        with open(calibration_path, 'w') as file:
+            json.dump(calibration, file, indent=2)
+
+    if memEstimate and maxRSS:
+        store("memoryCalibration.json", maxRSS / 1024 / memEstimate)
+    # time per step without the start-up of the first step
+    if costEstimate and len(executionTimes) > 2:
+        store("costCalibration.json", (executionTimes[-1] - executionTimes[0]) / (len(executionTimes) - 1) / costEstimate)
+
+def estimate_rank_memory(ranks=None, solver=True):
+    """
+    Schätzt den Speicherbedarf eines Ranks aus Zellanzahl, Feldern, turbinesFoam-Daten und MPI-Halo.
 
+    Internal Parameter:
+        - cellsPerRank: geschätzte Zellen / ranks
+        - mesh: polyMesh und fvMesh-Geometrie (~500 B pro Zelle)
+        - fields: U (3 Zeitstufen), p (2), nut, delta, phi (2, ~3 Flächen pro Zelle),
+          bei fieldAverage zusätzlich UMean, UPrime2Mean, pMean, pPrime2Mean (bei Mittelung in der Zone nur
+          für den Anteil der Wake-Zellen, dazu beim Schreiben ein temporäres UPrime2Mean, compute_zone_average)
+        - matrices: fvMatrix und GAMG-Hierarchie (~400 B pro Zelle)
+        - alm: forceField (volVectorField) je Blatt, Turm, Nabe und Turbine sowie Elementdaten (~8 kB pro Element)
+        - halo: Prozessor-Patches und Sendepuffer (~300 B pro Halo-Zelle, 6 * cellsPerRank^(2/3))
+        - base: Prozess, Bibliotheken und MPI (250 MB + 0.1 MB pro Rank)
+    Input:
+        - ranks: Anzahl der Ranks (Standard computeCores)
+        - solver: False für Nachbearbeitung (reconstructPar, foamToVTK: ohne Matrizen und ALM)
+    Output:
+        - dict mit Anteilen in MB, "estimate" (Summe), "calibration" und "request"
+          (estimate * calibration * 1.2, auf 100 MB aufgerundet)
+    Usage:
+        - compute_slurm_layout (--mem-per-cpu) und print_simulation_summary
+    """
+    solverParameters = SolverParameters.getSolverParameters()
+    turbine_data = WindTurbines.getTurbines()
+    ranks = ranks or solverParameters.computeCores
+    cellCounts = estimate_cell_counts()
+    cellsPerRank = cellCounts["total"] / ranks
+    MB = 1024 * 1024
+
+    fieldBytes = 24 * 3 + 8 * 2 + 8 + 8 + 3 * 8 * 2
+    if solverParameters.fieldAverage:
+        zoneAverage = compute_zone_average()
+        fieldBytes += zoneAverage["zoneBytes"] if zoneAverage["active"] else zoneAverage["domainBytes"]
+    lines = 3 + (1 if turbine_data['fvOptions']['towerCheckbox'] else 0) + (1 if turbine_data['fvOptions']['hubCheckbox'] else 0)
+    elements = sum(3 * compute_blade_elements(turbine)[0] for turbine in turbine_data['turbines'])
+    memory = {
+        "mesh": 500 * cellsPerRank / MB,
+        "fields": fieldBytes * cellsPerRank / MB,
+        "matrices": 400 * cellsPerRank / MB if solver else 0.0,
+        "alm": (len(turbine_data['turbines']) * (lines + 1) * 24 * cellsPerRank + elements * 8 * 1024) / MB if solver else 0.0,
+        "halo": 300 * 6 * cellsPerRank ** (2 / 3) / MB if ranks > 1 else 0.0,
+        "base": 250 + 0.1 * ranks,
+    }
+    memory = {key: round(value) for key, value in memory.items()}
+    memory["estimate"] = sum(memory.values())
+    memory["calibration"] = get_calibration("memoryCalibration.json", ClusterProfile.getClusterProfile().memoryCalibration)
+    # 20 % headroom on the calibrated estimate
+    memory["request"] = math.ceil(memory["estimate"] * memory["calibration"] * 1.2 / 100) * 100
+    return memory
+
+# fvSolution-Einstellungen
 #------------------------------------------------
-# blockMeshDict
+def compute_fvSolution_settings():
+    """
+    Bestimmt die Löser-Einstellungen für fvSolution aus dem Preset und der Zellanzahl pro Rank.
+
+    Internal Parameter:
+        - cellsPerRank: geschätzte Zellen / computeCores
+        - nCellsInCoarsestLevel: ~ sqrt(cellsPerRank) / 4, begrenzt auf 10-200 (Preset scaled)
+        - mergeLevels: 2 ab 200000 Zellen pro Rank (schnellere Agglomeration), sonst 1
+        - processorAgglomerator: masterCoarsest ab 64 Ranks (grobe Ebenen auf wenigen Ranks)
+        - pRefPoint: Gebietsmitte (0 0) knapp unter dem oberen Rand, unabhängig von der Rotation
+    Input:
+        - keine (liest Solver.fvSolutionPreset aus SolverParameters, Zellanzahl aus estimate_cell_counts)
+    Output:
+        - dict mit GAMG-, PIMPLE- und Druckreferenz-Einstellungen
+    Usage:
+        - create_fvSolution und compute_run_cost; Preset default entspricht der bisherigen statischen Datei
+    """
+    solverParameters = SolverParameters.getSolverParameters()
+    settings = {
+        "nCellsInCoarsestLevel": 100,
+        "mergeLevels": 1,
+        "processorAgglomerator": None,
+        "nOuterCorrectors": 1,
+        "nCorrectors": 3,
+        "nNonOrthogonalCorrectors": 0,
+        "pRefCell": 1001,
+        "pRefPoint": None,
+    }
+    if solverParameters.fvSolutionPreset == "scaled":
+        meshParams = compute_mesh_parameters()
+        cores = solverParameters.computeCores
+        cellsPerRank = estimate_cell_counts()["total"] / cores
+        settings["nCellsInCoarsestLevel"] = min(200, max(10, round(math.sqrt(cellsPerRank) / 4)))
+        settings["mergeLevels"] = 2 if cellsPerRank >= 200000 else 1
+        settings["processorAgglomerator"] = "masterCoarsest" if cores >= 64 else None
+        settings["pRefPoint"] = (0, 0, meshParams['zMax'] - meshParams['cell_size'] / 2)
+    return settings
+
+# Zeitplan aus Durchströmzeiten (Einschwingen, Mittelung, endTime)
 #------------------------------------------------
-def create_blockMeshDict():
+def compute_flow_through_schedule():
     """
-    Erstellt die zentrale OpenFOAM-Meshdatei 'blockMeshDict'.
-    
+    Bestimmt Einschwingphase, Beginn der Mittelung und minimale endTime als Vielfache der Durchströmzeit.
+
     Internal Parameter:
-        - blockMeshDict_path: Pfad zur Ausgabedatei
-        - meshParams: dict mit Mesh-Parametern
+        - flowThrough: Durchströmzeit xDepth / windSpeed (Gebietslänge in Strömungsrichtung)
+        - round_up: rundet auf ein Vielfaches von writeInterval auf (Mittelung beginnt auf einem Ausgabezeitpunkt)
+        - averageStart: startTime + spinUpFlowThroughs * flowThrough (bei coarseSpinUp adaptFlowThroughs,
+          die Einschwingphase läuft im groben Case bis spinUpEnd); ohne Zeitplan Solver.averageStart bzw.
+          bei "auto" dieselbe Abschätzung
+        - endTime: averageStart + averagingFlowThroughs * flowThrough
+        - coarseSpinUp: Zeitplan immer aktiv, sonst wiederholt der feine Lauf die Einschwingphase des groben Case
     Input:
-        - keine (liest Parameter aus compute_mesh_parameters)
+        - keine (liest aus SolverParameters, Environment, compute_mesh_parameters)
     Output:
-        - Schreibt 'blockMeshDict' in den system-Ordner des Case
+        - dict mit "active", "flowThrough" (s), "averageStart" und "endTime" (bei inaktivem Zeitplan die Eingaben),
+          "userEndTime", "spinUpEnd" (endTime des groben Spin-up-Case), "spinUpFlowThroughs" (Durchströmzeiten
+          des feinen Laufs vor der Mittelung)
     Usage:
-        - Definiert das Grundgitter für die Simulation
+        - create_controlDict, create_fieldAverage, compute_run_cost und print_simulation_summary
     """
-    blockMeshDict_path = os.path.join(get_case_folder(), "system/blockMeshDict")
-    meshParams = compute_mesh_parameters()
-    with open(blockMeshDict_path, 'w') as file:
-        file.write("/*--------------------------------*- C++ -*----------------------------------*\\\n")
-        file.write("| =========                 |                                                 |\n")
-        file.write("| \\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |\n")
-        file.write("|  \\    /   O peration     | Version:  2212                                  |\n")
+    solverParameters = SolverParameters.getSolverParameters()
+    flowThrough = compute_mesh_parameters()['xDepth'] / Environment.getEnvironment().windSpeed
+
+    def round_up(value):
+        interval = solverParameters.writeInterval
+        rounded = round(math.ceil(value / interval - 1e-9) * interval, 6)
+        return int(rounded) if float(rounded).is_integer() else rounded
+
+    schedule = {
+        "active": solverParameters.flowThroughSchedule or solverParameters.coarseSpinUp,
+        "flowThrough": flowThrough,
+        "averageStart": solverParameters.averageStart,
+        "endTime": solverParameters.endTime,
+        "userEndTime": solverParameters.endTime,
+        "spinUpEnd": round_up(solverParameters.startTime + solverParameters.spinUpFlowThroughs * flowThrough),
+    }
+    spinUp = solverParameters.adaptFlowThroughs if solverParameters.coarseSpinUp else solverParameters.spinUpFlowThroughs
+    schedule["spinUpFlowThroughs"] = spinUp
+    if solverParameters.averageStart == "auto":
+        schedule["averageStart"] = round_up(solverParameters.startTime + spinUp * flowThrough)
+    if schedule["active"]:
+        averageStart = round_up(solverParameters.startTime + spinUp * flowThrough)
+        schedule["averageStart"] = averageStart
+        schedule["endTime"] = round_up(averageStart + solverParameters.averagingFlowThroughs * flowThrough)
+    return schedule
+
+# Ausgabe-Budget (writeInterval, Neustartstände, Felder)
+#------------------------------------------------
+def compute_io_plan():
+    """
+    Schätzt das Datenvolumen pro Ausgabe und insgesamt und wählt die Ausgabe-Einstellungen so,
+    dass die Ergebnisse in Solver.diskBudget passen.
+
+    Internal Parameter:
+        - fieldComponents: geschriebene Felder mit Komponenten (U, p, nut, phi auf ~3 Flächen pro Zelle,
+          force von turbinesFoam, bei fieldAverage zusätzlich Mittelwerte und prime2Mean; bei Mittelung in der
+          Zone außerhalb der Zone null, sie liegen in den Neustartständen und nicht bei writeRegisteredObject)
+        - bytesPerField: Zellen * Komponenten * 8 Byte (binary, double) + pro Rank Header und Prozessorränder
+        - meshBytes: polyMesh nach refineMesh (~110 Byte pro Zelle, einmalig)
+        - inflowBytes: vorberechnete Zuströmung constant/boundaryData/inlet/<t>/U (aus compute_inflow_plan, einmalig)
+        - Stufen: full (alles wie eingegeben), reduced (volle Felder nur als Neustartstände alle ~10 % der
+          Laufzeit, die letzten zwei bleiben vollständig; outputFields über writeRegisteredObject im
+          writeInterval bzw. einem Vielfachen davon), checkpoint (wie reduced mit checkpointInterval und
+          checkpointCount, unabhängig vom Budget); writeCompression bleibt aus, v2212 komprimiert binäre Felder nicht
+        - keepSnapshots: ältere Neustartstände dünnt utilPruneSnapshots.sh aus; purgeWrite würde ganze Zeitordner
+          löschen, also auch die outputFields gleichzeitiger writeRegisteredObject-Ausgaben
+    Input:
+        - keine (liest aus SolverParameters, estimate_cell_counts, compute_flow_through_schedule)
+    Output:
+        - dict mit "mode", "bytesPerWrite", "totalBytes", "writes", "writeInterval" (volle Felder), "keepSnapshots",
+          "inflowBytes", "objects" und "objectInterval" (writeRegisteredObject, None = aus), "fits"
+    Usage:
+        - create_controlDict, create_writeRegisteredObject und print_simulation_summary
+    """
+    solverParameters = SolverParameters.getSolverParameters()
+    cellCounts = estimate_cell_counts()
+    cells = cellCounts["total"]
+    ranks = solverParameters.computeCores
+    duration = compute_flow_through_schedule()["endTime"] - solverParameters.startTime
+    zoneAverage = compute_zone_average()["active"]
+
+    fieldComponents = {"U": 3, "p": 1, "nut": 1, "phi": 3, "force": 3}
+    if solverParameters.fieldAverage:
+        # zone averages (write_zone_fieldAverage) are written as full volFields as well
+        fieldComponents.update({"UMean": 3, "UPrime2Mean": 6, "pMean": 1, "pPrime2Mean": 1})
+
+    def bytes_of(fields):
+        # processor boundary values (~6 faces of a cubic subdomain) and ~2 kB header per file and rank
+        halo = 6 * (cells / ranks) ** (2 / 3) if ranks > 1 else 0.0
+        return sum(cells * fieldComponents[field] * 8 + ranks * (2048 + halo * fieldComponents[field] * 8) for field in fields)
+
+    fullBytes = bytes_of(fieldComponents)
+    meshBytes = 110 * cells
+    inflowBytes = compute_inflow_plan()["totalBytes"]
+    writes = max(1, math.floor(duration / solverParameters.writeInterval + 1e-9))
+    plan = {
+        "mode": "full",
+        "bytesPerWrite": fullBytes,
+        "totalBytes": meshBytes + inflowBytes + writes * fullBytes,
+        "writes": writes,
+        "writeInterval": solverParameters.writeInterval,
+        "keepSnapshots": 0,
+        "inflowBytes": inflowBytes,
+        "objects": None,
+        "objectInterval": None,
+        "fits": True,
+    }
+    budget = solverParameters.diskBudget * 1e9
+    checkpoint = solverParameters.checkpointMode
+    if not checkpoint:
+        if budget <= 0 or plan["totalBytes"] <= budget:
+            plan["fits"] = budget <= 0 or plan["totalBytes"] <= budget
+            return plan
+
+    # full fields only as rolling restart snapshots, analysis time series of the selected fields
+    objects = [field for field in solverParameters.outputFields if field in fieldComponents]
+    if solverParameters.fieldAverage and not zoneAverage:
+        objects += [field for field in ("UMean", "UPrime2Mean", "pMean", "pPrime2Mean") if field not in objects]
+    if checkpoint:
+        restartInterval, restartCount = solverParameters.checkpointInterval, solverParameters.checkpointCount
+    else:
+        restartInterval, restartCount = solverParameters.writeInterval * max(1, math.ceil(writes / 10)), 2
+    objectBytes = bytes_of(objects)
+    fixedBytes = meshBytes + inflowBytes + restartCount * fullBytes
+    multiple = 1
+    if budget > 0:
+        multiple = min(writes, max(1, math.ceil(writes * objectBytes / max(budget - fixedBytes, 1.0))))
+    objectWrites = max(1, math.floor(writes / multiple))
+    plan.update({
+        "mode": "checkpoint" if checkpoint else "reduced",
+        "bytesPerWrite": objectBytes,
+        "totalBytes": fixedBytes + objectWrites * objectBytes,
+        "writes": objectWrites,
+        "writeInterval": restartInterval,
+        "keepSnapshots": restartCount,
+        "objects": objects,
+        "objectInterval": solverParameters.writeInterval * multiple,
+    })
+    plan["fits"] = budget <= 0 or plan["totalBytes"] <= budget
+    return plan
+
+# Kostenmodell (Wall-Clock und Kernstunden)
+#------------------------------------------------
+def compute_run_cost(cores=None, endTime=None):
+    """
+    Schätzt Laufzeit und Kernstunden aus Zellanzahl, Zeitschritt, PIMPLE-Korrektoren und Turbinen (ALM-Last).
+
+    Internal Parameter:
+        - steps: (endTime - startTime) / deltaT, endTime aus compute_flow_through_schedule
+        - unitsPerCell: Arbeitseinheiten pro Zelle und Zeitschritt,
+          nOuterCorrectors * (1 Impuls + nCorrectors * (1 + nNonOrthogonalCorrectors) * 2 Druck/GAMG)
+        - work: (Zellen + ALM-Zusatzlast) * unitsPerCell
+        - pimple: PIMPLE-Korrektoren aus compute_fvSolution_settings
+        - stepTime: throughputCoefficient * work / cores * (1 + Lastungleichheit) + Halo-Austausch + Reduktionen
+        - efficiency: ideale / geschätzte Schrittzeit
+    Input:
+        - cores: Anzahl der Ranks (Standard computeCores)
+        - endTime: Endzeit (Standard endTime aus compute_flow_through_schedule)
+    Output:
+        - dict mit "steps", "stepTimeEstimate" (unkalibriert, s), "stepTime" (kalibriert, s), "wallClock" (h),
+          "coreHours", "efficiency", "calibration"
+    Usage:
+        - recommend_core_count, Allrun.slurm (costEstimatePerStep für die Kalibrierung) und print_simulation_summary
+    """
+    solverParameters = SolverParameters.getSolverParameters()
+    cluster = ClusterProfile.getClusterProfile()
+    cores = cores or solverParameters.computeCores
+    endTime = compute_flow_through_schedule()["endTime"] if endTime is None else endTime
+    pimple = compute_fvSolution_settings()
+    cellCounts = estimate_cell_counts()
+    loadBalance = compute_load_balance(cores)
+
+    steps = math.ceil((endTime - solverParameters.startTime) / compute_time_step()["deltaT"])
+    unitsPerCell = pimple["nOuterCorrectors"] * (1 + pimple["nCorrectors"] * (1 + pimple["nNonOrthogonalCorrectors"]) * 2)
+    work = (cellCounts["total"] + loadBalance["almWork"]) * unitsPerCell
+    imbalance = loadBalance["weighted"] if solverParameters.weightedDecomposition else loadBalance["unweighted"]
+
+    idealTime = cluster.throughputCoefficient * work / cores
+    # halo exchange per corrector (~5 cell units per halo cell) and global reductions of the linear solvers
+    haloTime = 5 * cluster.throughputCoefficient * 6 * (cellCounts["total"] / cores) ** (2 / 3) * unitsPerCell if cores > 1 else 0.0
+    reductionTime = 2e-5 * math.log2(cores) * pimple["nOuterCorrectors"] * pimple["nCorrectors"] * 30 if cores > 1 else 0.0
+    stepTimeEstimate = idealTime * (1 + imbalance) + haloTime + reductionTime
+    calibration = get_calibration("costCalibration.json", cluster.costCalibration)
+    stepTime = stepTimeEstimate * calibration
+    return {
+        "steps": steps,
+        "stepTimeEstimate": round(stepTimeEstimate, 4),
+        "stepTime": stepTime,
+        "wallClock": steps * stepTime / 3600,
+        "coreHours": steps * stepTime * cores / 3600,
+        "efficiency": idealTime / stepTimeEstimate,
+        "calibration": calibration,
+    }
+
+def recommend_core_count():
+    """
+    Empfiehlt die größte Kernzahl, deren parallele Effizienz noch mindestens targetEfficiency erreicht.
+
+    Internal Parameter:
+        - granularity: Schrittweite der Kandidaten (coresPerNode aus dem Cluster-Profil, sonst 8)
+        - candidates: Vielfache von granularity bis mindestens 5000 Zellen pro Kern
+    Input:
+        - keine (liest aus ClusterProfile, estimate_cell_counts, compute_run_cost)
+    Output:
+        - (Kernzahl, Kostenmodell-dict) der Empfehlung
+    Usage:
+        - print_simulation_summary
+    """
+    cluster = ClusterProfile.getClusterProfile()
+    granularity = cluster.coresPerNode or 8
+    maxCores = max(granularity, math.floor(estimate_cell_counts()["total"] / 5000))
+    best = (granularity, compute_run_cost(granularity))
+    for cores in range(2 * granularity, maxCores + 1, granularity):
+        cost = compute_run_cost(cores)
+        if cost["efficiency"] < cluster.targetEfficiency:
+            break
+        best = (cores, cost)
+    return best
+
+# Grober Spin-up-Case (coarseSpinUp)
+#------------------------------------------------
+def compute_spinup_plan():
+    """
+    Schätzt Zellanzahl, Kernzahl, Zeitschritt und Kosten des groben Spin-up-Case und die gesparten Kernstunden.
+
+    Internal Parameter:
+        - maxLevel: feinste Stufe des groben Case (4 - spinUpCoarsening), feinere Zellen zählen 8:1 je Stufe
+        - cores: gleiche Zellen pro Rank wie der feine Lauf (bei decompositionFriendly computeCores, das
+          Grundgitter hängt von der Kernzahl ab und muss für mapFieldsPar -consistent gleich bleiben)
+        - deltaT: Zeitschritt des feinen Laufs * 2**spinUpCoarsening (CFL mit der gröbsten feinsten Zelle)
+        - finePerSecond: Kernstunden des feinen Laufs pro simulierter Sekunde (compute_run_cost)
+        - fullEndTime: endTime des feinen Laufs ohne groben Case (Einschwingen über spinUpFlowThroughs)
+    Input:
+        - keine (liest aus SolverParameters, MeshSettings, estimate_cell_counts, compute_flow_through_schedule)
+    Output:
+        - dict mit "cells", "cores", "deltaT", "endTime" (spinUpEnd), "coreHours" und "savedCoreHours"
+          (Kosten bis fullEndTime abzüglich der Kosten bis zur geschriebenen endTime und des groben Laufs)
+    Usage:
+        - create_spinup_case und print_simulation_summary
+    """
+    solverParameters = SolverParameters.getSolverParameters()
+    coarsening = solverParameters.spinUpCoarsening
+    levels = estimate_cell_counts()["levels"]
+    maxLevel = 4 - coarsening
+    cells = sum(levels[:maxLevel + 1]) + sum(levels[level] / 8 ** (level - maxLevel) for level in range(maxLevel + 1, 5))
+    cores = max(1, round(solverParameters.computeCores * cells / sum(levels)))
+    if MeshSettings.getMeshSettings().decompositionFriendly:
+        cores = solverParameters.computeCores
+    schedule = compute_flow_through_schedule()
+    fineCoreHours = compute_run_cost()["coreHours"]
+    finePerSecond = fineCoreHours / (schedule["endTime"] - solverParameters.startTime)
+    # cheaper steps (fewer cells) and 2**coarsening fewer steps per simulated second
+    coreHours = finePerSecond * cells / sum(levels) / 2 ** coarsening * (schedule["spinUpEnd"] - solverParameters.startTime)
+    # both averaging starts lie on writeInterval, so the shift keeps endTime on it as well
+    fullEndTime = schedule["endTime"] + schedule["spinUpEnd"] - schedule["averageStart"]
+    return {
+        "cells": round(cells),
+        "cores": cores,
+        "deltaT": round(compute_time_step()["deltaT"] * 2 ** coarsening, 12),
+        "endTime": schedule["spinUpEnd"],
+        "coreHours": coreHours,
+        "savedCoreHours": compute_run_cost(endTime=fullEndTime)["coreHours"] - fineCoreHours - coreHours,
+    }
+
+# SLURM-Layout aus dem Cluster-Profil
+#------------------------------------------------
+def compute_slurm_layout(cores=None, memPerRank=None):
+    """
+    Leitet Knoten, Tasks pro Knoten, Binding und Speicher pro Rank aus dem Cluster-Profil und der
+    geschätzten Zellanzahl ab.
+
+    Internal Parameter:
+        - slotsPerNode: Ranks pro Knoten (physische Kerne bzw. Hardware-Threads bei hyperthreading)
+    Input:
+        - cores: Anzahl der Ranks (Standard computeCores = numberOfSubdomains in decomposeParDict = ntasks in Allrun.slurm)
+        - memPerRank: Speicher pro Rank in MB (Standard aus estimate_rank_memory)
+    Output:
+        - dict mit "nodes", "tasksPerNode", "tasksPerCore", "memPerCpu", "postMem", "partition",
+          "postPartition", "wallTime", "bind" (mpirun-Optionen), "hint" (None ohne Profil)
+    Usage:
+        - create_allrun_slurm_script, create_allpost_slurm_script und print_simulation_summary;
+          ohne Cluster-Profil bleiben die bisherigen 15 Tasks pro Knoten (Knoten = cores / 15), der Speicher kommt
+          immer aus der Abschätzung
+    """
+    cluster = ClusterProfile.getClusterProfile()
+    cores = cores or SolverParameters.getSolverParameters().computeCores
+    memPerRank = memPerRank or estimate_rank_memory()["request"]
+    postMem = estimate_rank_memory(ranks=1, solver=False)["request"]
+    if not cluster.coresPerNode:
+        # legacy nodes with 15 tasks each, the ranks are spread evenly over as many nodes as needed
+        nodes = math.ceil(cores / 15)
+        return {"nodes": nodes, "tasksPerNode": math.ceil(cores / nodes), "tasksPerCore": 2, "memPerCpu": f"{memPerRank}M", "postMem": f"{postMem}M",
+                "partition": cluster.partition, "postPartition": cluster.postPartition,
+                "wallTime": cluster.wallTime, "bind": "", "hint": None}
+
+    slotsPerNode = cluster.coresPerNode * (2 if cluster.hyperthreading else 1)
+    if cluster.memoryPerNode:
+        # fewer ranks per node if the memory of a full node is not sufficient
+        slotsPerNode = max(1, min(slotsPerNode, math.floor(cluster.memoryPerNode * 1024 / memPerRank)))
+    nodes = math.ceil(cores / slotsPerNode)
+    # spread the ranks evenly over the nodes
+    tasksPerNode = math.ceil(cores / nodes)
+    if cluster.memoryPerNode:
+        postMem = min(postMem, math.floor(cluster.memoryPerNode * 1024))
+    return {
+        "nodes": nodes,
+        "tasksPerNode": tasksPerNode,
+        "tasksPerCore": 2 if cluster.hyperthreading else 1,
+        "memPerCpu": f"{memPerRank}M",
+        "postMem": f"{postMem}M",
+        "partition": cluster.partition,
+        "postPartition": cluster.postPartition,
+        "wallTime": cluster.wallTime,
+        "bind": f"--bind-to {'hwthread' if cluster.hyperthreading else 'core'} --map-by ppr:{tasksPerNode}:node ",
+        "hint": "multithread" if cluster.hyperthreading else "nomultithread",
+    }
+
+# Verfeinerungsboxen aller Stufen
+#------------------------------------------------
+def get_refinement_boxes():
+    """
+    Sammelt die Boxen aller Verfeinerungsstufen im Mesh-KOS (vor transformPoints).
+
+    Internal Parameter:
+        - meshParams: dict mit Mesh-Parametern (Gebietsgrenzen, refineHeights)
+        - wakeBoxes: Stufe 4, Wake-Regionen bzw. Near-Wake-Schalen (nestedWakeRefinement)
+    Input:
+        - keine (liest aus compute_mesh_parameters, WakeRegion, MeshSettings)
+    Output:
+        - Liste von Dicts mit "name", "level" (1-4) und "box" (xMin, yMin, zMin, xMax, yMax, zMax)
+    Usage:
+        - check_refinement_transitions
+    """
+    meshParams = compute_mesh_parameters()
+    boxes = []
+    # refine1-3 span the whole domain horizontally (create_refine_files)
+    for level, (name, height) in enumerate(zip(["refineRegion1", "refineRegion2", "refineH3"], meshParams['refineHeights']), start=1):
+        boxes.append({
+            "name": name,
+            "level": level,
+            "box": (meshParams['xMin'], meshParams['yMin'], 0, meshParams['xMax'], meshParams['yMax'], height),
+        })
+    if MeshSettings.getMeshSettings().nestedWakeRefinement:
+        for nearWake in WakeRegion.getNearWakeRegions():
+            xs = [pt[0] for pt in nearWake["coordinates"]]
+            ys = [pt[1] for pt in nearWake["coordinates"]]
+            boxes.append({"name": nearWake["id"], "level": 4, "box": (min(xs), min(ys), 0, max(xs), max(ys), nearWake["zMax"])})
+    else:
+        for wake in WakeRegion.getWakeRegionBoxes():
+            boxes.append({"name": wake["id"], "level": 4, "box": wake["box"]})
+    return boxes
+
+# Prüfung der Verfeinerungsübergänge (vor dem Schreiben der Case-Dateien)
+#------------------------------------------------
+def check_refinement_transitions():
+    """
+    Prüft die Verfeinerungsboxen auf saubere 2:1-Übergänge, bevor Dateien geschrieben werden.
+
+    Internal Parameter:
+        - tol: Toleranz für Koordinatenvergleiche
+        - domain: Gebietsgrenzen (Flächen auf dem Rand brauchen keinen Abstand)
+        - parentCell: Zellgröße der Eltern-Stufe (cell_size / 2**(level-1))
+        - errors: Liste der gefundenen Verletzungen
+    Input:
+        - keine (liest aus get_refinement_boxes, compute_mesh_parameters, MeshSettings)
+    Output:
+        - Liste der Fehlermeldungen (leer, wenn alle Übergänge in Ordnung sind);
+          bei Verletzungen Ausgabe der Fehler und Abbruch (sys.exit(1))
+    Usage:
+        - Wird vor create_allclean_script aufgerufen; jede Box der Stufe n muss in einer Box der Stufe n-1
+          liegen, mit mindestens transitionCells Zellen der Stufe n-1 Abstand zu jeder inneren Fläche.
+          Wake-Boxen (Stufe 4) dürfen sich nicht überlappen (doppelte Verfeinerung).
+          Mit mesh.autoGrowRefinement werden refine1-3 in compute_mesh_parameters vergrößert.
+    """
+    meshParams = compute_mesh_parameters()
+    meshSettings = MeshSettings.getMeshSettings()
+    tol = 1e-6
+    domain = (meshParams['xMin'], meshParams['yMin'], meshParams['zMin'],
+              meshParams['xMax'], meshParams['yMax'], meshParams['zMax'])
+    boxes = get_refinement_boxes()
+    errors = []
+
+    for child in [b for b in boxes if b["level"] > 1]:
+        parentCell = meshParams['cell_size'] / 2 ** (child["level"] - 1)
+        minGap = meshSettings.transitionCells * parentCell
+        parents = [b for b in boxes if b["level"] == child["level"] - 1]
+        contained = False
+        for parent in parents:
+            gaps_ok = True
+            for axis in range(3):
+                cMin, cMax = child["box"][axis], child["box"][axis + 3]
+                pMin, pMax = parent["box"][axis], parent["box"][axis + 3]
+                # lower face: on the domain boundary the boxes may share the face
+                if abs(cMin - domain[axis]) <= tol and abs(pMin - domain[axis]) <= tol:
+                    lower_ok = True
+                else:
+                    lower_ok = cMin - pMin >= minGap - tol
+                if abs(cMax - domain[axis + 3]) <= tol and abs(pMax - domain[axis + 3]) <= tol:
+                    upper_ok = True
+                else:
+                    upper_ok = pMax - cMax >= minGap - tol
+                gaps_ok = gaps_ok and lower_ok and upper_ok
+            if gaps_ok:
+                contained = True
+                break
+        if not contained:
+            errors.append(
+                f"{child['name']} (Stufe {child['level']}) liegt nicht mit mindestens {meshSettings.transitionCells} Zellen "
+                f"({round(minGap, 3)} m) Abstand in einer Box der Stufe {child['level'] - 1}"
+            )
+
+    # level 4 sets are refined one after another: overlapping wake boxes would be refined twice
+    # (near-wake shells are merged into one cellSet and may overlap)
+    if not meshSettings.nestedWakeRefinement:
+        wakeBoxes = [b for b in boxes if b["level"] == 4]
+        for i in range(len(wakeBoxes)):
+            for j in range(i + 1, len(wakeBoxes)):
+                b1, b2 = wakeBoxes[i]["box"], wakeBoxes[j]["box"]
+                overlap_x = min(b1[3], b2[3]) - max(b1[0], b2[0])
+                overlap_y = min(b1[4], b2[4]) - max(b1[1], b2[1])
+                if overlap_x > 1e-3 and overlap_y > 1e-3:
+                    errors.append(f"{wakeBoxes[i]['name']} und {wakeBoxes[j]['name']} überlappen (doppelte Verfeinerung)")
+
+    if errors:
+        for error in errors:
+            print(f"Fehler: {error}")
+        print("Abbruch: Verfeinerungsübergänge ungültig (mesh.autoGrowRefinement oder cellDensity anpassen)")
+        sys.exit(1)
+    return errors
+
+# Logarithmisches Windprofil (Inlet und Anfangsfeld)
+#------------------------------------------------
+def compute_log_law():
+    """
+    Bestimmt die Parameter des logarithmischen Windprofils U(z) = ustar / kappa * ln((z + z0) / z0).
+
+    Internal Parameter:
+        - kappa: von-Kármán-Konstante (0.41)
+        - z0: Rauhigkeitslänge über See (0.05 m)
+        - zRef: Referenzhöhe der Windgeschwindigkeit (wind.referenceHeight: Nabenhöhe der ersten Turbine,
+          mittlere Nabenhöhe "meanHub" oder feste Höhe in m)
+        - ustar: Schubspannungsgeschwindigkeit aus windSpeed in zRef
+        - veer: Drehung der Windrichtung mit der Höhe in rad/m (wind.windVeer in Grad pro 100 m)
+    Input:
+        - keine (liest aus Environment, WindTurbines)
+    Output:
+        - dict mit "kappa", "z0", "ustar", "angle" (Windrichtung in rad in zRef), "zRef" und "veer"
+    Usage:
+        - create_inlet_conditions und create_setExprFieldsDict_U (gleiches Profil am Inlet und im Anfangsfeld)
+    """
+    environment = Environment.getEnvironment()
+    turbines = WindTurbines.getTurbines()['turbines']
+    kappa = 0.41
+    z0 = 0.05
+    if environment.referenceHeight == "firstHub":
+        zRef = turbines[0]['hubHeight']
+    elif environment.referenceHeight == "meanHub":
+        zRef = sum(t['hubHeight'] for t in turbines) / len(turbines)
+    else:
+        zRef = float(environment.referenceHeight)
+    ustar = environment.windSpeed * kappa / math.log((zRef + z0) / z0)
+    veer = math.radians(environment.windVeer) / 100
+    return {"kappa": kappa, "z0": z0, "ustar": ustar, "angle": environment.windDirectionRad, "zRef": zRef, "veer": veer}
+
+# Inlet-Ebene an den Flächenmittelpunkten des Inlet-Patches
+#------------------------------------------------
+def compute_inlet_face_centres():
+    """
+    Bestimmt die Flächenmittelpunkte des Inlet-Patches (x = xMax) nach blockMesh und refine1-3.
+
+    Internal Parameter:
+        - zFaces: Unterkanten und Höhen der Basiszellen in z (uniform bis zFineElem, darüber geometrisch
+          gestreckt wie das zGrading in compute_mesh_parameters)
+        - refineHeights: aktive Stufen refine1-3 (mesh.skipRefinementLevels 2 lässt refine3 weg), sie
+          überspannen das Gebiet horizontal, die Stufe einer Basiszelle folgt aus ihrem Mittelpunkt
+        - level: Anzahl der Stufen über dem Zellmittelpunkt, die Zelle wird in 2**level Flächen je Richtung geteilt
+    Input:
+        - keine (liest aus compute_mesh_parameters, MeshSettings)
+    Output:
+        - dict mit "rows" (Liste von (z, dy) je Flächenzeile, dy = Flächenbreite in y), "xMax", "yMin"
+          und "yWidth" im Mesh-KOS (vor transformPoints)
+    Usage:
+        - create_inlet_conditions (Environment.inletPlane), die Wake-Regionen berühren das Inlet nicht
+    """
+    meshParams = compute_mesh_parameters()
+    cell_size = meshParams['cell_size']
+    skip = MeshSettings.getMeshSettings().skipRefinementLevels
+    refineHeights = meshParams['refineHeights'][:2 if skip >= 2 else 3]
+
+    if meshParams['zGrading'] == "1":
+        zFaces = [(k * cell_size, cell_size) for k in range(meshParams['zElem'])]
+    else:
+        zFine = meshParams['zFineElem'] * cell_size
+        zFaces = [(k * cell_size, cell_size) for k in range(meshParams['zFineElem'])]
+        nStretch = meshParams['zElem'] - meshParams['zFineElem']
+        ratio = MeshSettings.getMeshSettings().verticalExpansionRatio
+        zStretch = meshParams['zMax'] - zFine
+        # blockMesh: expansion ratio ratio**(n-1) between first and last cell
+        first = zStretch * (ratio - 1) / (ratio ** nStretch - 1) if ratio > 1 else zStretch / nStretch
+        z = zFine
+        for k in range(nStretch):
+            dz = first * ratio ** k if ratio > 1 else first
+            zFaces.append((z, dz))
+            z += dz
+
+    rows = []
+    for zBase, dz in zFaces:
+        level = sum(1 for height in refineHeights if height > zBase + dz / 2)
+        n = 2 ** level
+        for j in range(n):
+            rows.append((zBase + (j + 0.5) * dz / n, cell_size / n))
+    return {"rows": rows, "xMax": meshParams['xMax'], "yMin": meshParams['yMin'], "yWidth": meshParams['yWidth']}
+
+# OpenFOAM boundaryData (binär oder ASCII)
+#------------------------------------------------
+def write_boundary_data(path, objectName, className, values, nComponents, binary=True):
+    """
+    Schreibt eine boundaryData-Datei (points, UMean, R) mit FoamFile-Header.
+
+    Internal Parameter:
+        - arch: "LSB;label=32;scalar=64", Werte als little-endian double
+        - n: Anzahl der Einträge (len(values) // nComponents)
+    Input:
+        - path: Zieldatei
+        - objectName, className: Header-Einträge (z.B. "points", "vectorField")
+        - values: flache Werteliste bzw. numpy-Array (Einträge nacheinander, je nComponents Werte)
+        - nComponents: 3 (vector) oder 6 (symmTensor)
+        - binary: True schreibt den Listeninhalt binär, sonst ASCII
+    Output:
+        - Schreibt die Datei
+    Usage:
+        - create_inlet_conditions (Environment.inletPlane)
+    """
+    n = len(values) // nComponents
+    with open(path, 'wb') as f:
+        f.write(b"FoamFile\n{\n")
+        f.write(b"    version     2.0;\n")
+        f.write(f"    format      {'binary' if binary else 'ascii'};\n".encode())
+        if binary:
+            f.write(b"    arch        \"LSB;label=32;scalar=64\";\n")
+        f.write(f"    class       {className};\n".encode())
+        f.write(f"    object      {objectName};\n".encode())
+        f.write(b"}\n\n")
+        f.write(f"{n}\n(".encode())
+        if binary:
+            if numpy is not None:
+                f.write(numpy.asarray(values, dtype='<f8').tobytes())
+            else:
+                f.write(struct.pack(f"<{len(values)}d", *values))
+        else:
+            f.write(b"\n")
+            for i in range(n):
+                entry = " ".join(repr(float(v)) for v in values[i * nComponents:(i + 1) * nComponents])
+                f.write(f"( {entry} )\n".encode())
+        f.write(b")\n")
+
+# Turbinen im OpenFOAM-KOS (nach transformPoints)
+#------------------------------------------------
+def get_turbine_frames():
+    """
+    Bestimmt Lage und Ausrichtung der Turbinen im OpenFOAM-KOS für Schnitte und Mittelungen.
+
+    Internal Parameter:
+        - origin: Nabe (Koordinaten minus simulationArea.center, wie die origin in fvOptions)
+        - mesh: Nabe im Mesh-KOS (vor transformPoints), die Rotorachse liegt dort entlang x
+        - downstream: Einheitsvektor in Nachlaufrichtung, -x des Mesh gedreht um rotation_angle
+        - lateral: horizontaler Einheitsvektor in der Rotorebene
+    Input:
+        - keine (liest aus SimulationArea, WindTurbines)
+    Output:
+        - Liste von Dicts mit "id", "origin", "mesh", "hubHeight", "rotorRadius", "downstream" und "lateral"
+    Usage:
+        - create_sampleSlice
+    """
+    simulationArea = SimulationArea.getSimulationArea()
+    angle = simulationArea.rotation_angle_rad
+    downstream = (-math.cos(angle), -math.sin(angle), 0.0)
+    lateral = (math.sin(angle), -math.cos(angle), 0.0)
+    frames = []
+    for turbine in WindTurbines.getTurbines()['turbines']:
+        px = turbine['coordinates'][0] - simulationArea.center[0]
+        py = turbine['coordinates'][1] - simulationArea.center[1]
+        frames.append({
+            "id": turbine['id'],
+            "origin": (px, py, turbine['hubHeight']),
+            "mesh": (px * math.cos(angle) + py * math.sin(angle), -px * math.sin(angle) + py * math.cos(angle)),
+            "hubHeight": turbine['hubHeight'],
+            "rotorRadius": turbine['rotorRadius'],
+            "downstream": downstream,
+            "lateral": lateral,
+        })
+    return frames
+
+# Initialize Objects
+#------------------------------------------------
+
+
+################################################
+#------------------------------------------------
+# PREPROCESSING Settings
+#------------------------------------------------
+################################################
+
+#------------------------------------------------
+# Allclean
+#------------------------------------------------
+def create_allclean_script():
+    """
+    Erstellt das Skript 'Allclean' zum Bereinigen des Simulationsverzeichnisses.
+    
+    Internal Parameter:
+        - allclean_path: Pfad zur Ausgabedatei
+    Input:
+        - keine (liest Zielordner aus get_case_folder, meshCache aus MeshSettings)
+    Output:
+        - Schreibt Shell-Skript 'Allclean' in den Case-Ordner
+    Usage:
+        - Wird vor jedem neuen Simulationslauf ausgeführt, um alte Ergebnisse zu entfernen
+    """
+    allclean_path = os.path.join(get_case_folder(), "Allclean")
+
+    with open(allclean_path, 'w') as file:
+        file.write("#!/bin/sh\n\n")
+        file.write("### Script for cleaning the folder of the offshore wind park simulation\n")
+        file.write("### HLRS, 2024-2025\n\n")
+
+        file.write("rm log.* slurm.* \n")
+        file.write("\n")
+        file.write("# Lösche Ordner\n")
+        if MeshSettings.getMeshSettings().meshCache:
+            file.write(f"# Mesh-Cache ({MeshSettings.getMeshSettings().meshCacheDir}) bleibt erhalten, Allpre stellt das Mesh wieder her\n")
+        file.write("rm -rf constant/polyMesh processor*\n")    
+        file.write("\n")
+        file.write("find . -maxdepth 1 -type d -regextype posix-extended -regex '\\./[0-9]{1,9}' -exec rm -rf {} +\n")
+        file.write("\n")
+        if SolverParameters.getSolverParameters().coarseSpinUp:
+            file.write("[ -d spinUp ] && (cd spinUp && sh ./Allclean)\n")
+            file.write("\n")
+    # print(f"Allclean successfully created at: \n{allclean_path}")
+
+check_refinement_transitions()
+
+create_allclean_script()
+
+#------------------------------------------------
+# Allpre
+#------------------------------------------------
+
+def create_allpre_script():
+    """
+    Erstellt das Skript 'Allpre' zur Vorbereitung des Grids und der Mesh-Verfeinerung.
+    
+    Internal Parameter:
+        - allpre_path: Pfad zur Ausgabedatei
+        - wake_names: Liste der Wake-Region-IDs (bzw. Near-Wake-IDs bei nestedWakeRefinement)
+        - ind: Einrückung des Meshing-Blocks (bei meshCache innerhalb von if/else)
+    Input:
+        - keine (liest Zielordner, Wake-Regionen und MeshSettings aus get_case_folder/WakeRegion/MeshSettings)
+    Output:
+        - Schreibt Shell-Skript 'Allpre' in den Case-Ordner
+    Usage:
+        - Automatisiert die Mesh-Erstellung und -Verfeinerung für OpenFOAM; mesh.skipRefinementLevels lässt
+          die Wake-Verfeinerung (1) bzw. zusätzlich refine3 (2) weg
+    """
+    allpre_path = os.path.join(get_case_folder(), "Allpre")
+
+    with open(allpre_path, 'w') as file:
+        file.write("#!/bin/sh\n\n")
+
+        file.write("### Script for preparing the grid for the offshore wind park simulation\n")
+        file.write("### HLRS, 2024-2025\n\n")
+
+        file.write(". $WM_PROJECT_DIR/bin/tools/RunFunctions\n")
+        file.write("\n")
+
+        # Replace turbine_names loop with wake_names loop.
+        # Original code:
+        # turbine_names = [turbine[0] for turbine in WindTurbines.getTurbines().turbine_coordinates]
+        meshSettings = MeshSettings.getMeshSettings()
+        nestedWakeRefinement = meshSettings.nestedWakeRefinement
+        computeCores = SolverParameters.getSolverParameters().computeCores
+        if nestedWakeRefinement:
+            # one union set of all near wake shells is refined to the finest level (no double refinement
+            # where shells overlap), the far wake stays at refine3 level
+            wake_names = ["nearWake"]
+        else:
+            wake_names = [wake["id"] for wake in WakeRegion.getSubdividedWakeRegions()]
+        file.write("loopRefineMesh () {\n")
+        file.write("    for SET in " + " ".join(wake_names) + " ; do\n")
+        file.write("        sed -i \"0,/set [a-zA-Z0-9_]*/s//set ${SET}/\" system/refineMeshDict.wakeregions \n")
+        # Update runApplication command to use wake_${SET} instead of windturbine_${SET}
+        file.write("        runApplication -s wake_${SET} refineMesh -overwrite -dict system/refineMeshDict.wakeregions\n")
+        file.write("    done\n")
+        file.write("}\n\n")
+
+        # mesh cache: the meshing block only runs if no mesh with the same fingerprint is cached
+        ind = "    " if meshSettings.meshCache else ""
+        if meshSettings.meshCache:
+            meshCache_path = f"{meshSettings.meshCacheDir}/{compute_mesh_fingerprint()}"
+            file.write(f"MESHCACHE={meshCache_path}\n")
+            # decompositions are cached per method (and n for the geometric methods), weighted ones separately
+            solverParameters = SolverParameters.getSolverParameters()
+            method = solverParameters.decompositionMethod
+            if method in ("hierarchical", "multiLevel"):
+                method += "_" + "x".join(str(n) for n in compute_mesh_parameters()["decomposition"])
+            weighted = "_weighted" if solverParameters.weightedDecomposition else ""
+            file.write(f"PROCCACHE=$MESHCACHE/processors{computeCores}_{method}{weighted}\n\n")
+            file.write("if [ -d \"$MESHCACHE/polyMesh\" ]; then\n")
+            file.write("    echo \"restoring mesh from $MESHCACHE\"\n")
+            file.write("    rm -rf constant/polyMesh\n")
+            file.write("    cp -r \"$MESHCACHE/polyMesh\" constant/polyMesh\n")
+            file.write("else\n")
+
+        file.write(f"{ind}runApplication blockMesh -dict system/blockMeshDict\n")
+        file.write("\n")
+        # ------------------------------------------------
+        # approx refine1 500m refine2 250m refine3 1000m
+        file.write(f"{ind}runApplication -s refine1 topoSet -dict system/topoSetDict.refine1\n")
+        file.write(f"{ind}runApplication -s refine1 refineMesh -overwrite -dict system/refineMeshDict.refine1\n")
+        file.write(f"{ind}runApplication -s refine2 topoSet -dict system/topoSetDict.refine2\n")
+        file.write(f"{ind}runApplication -s refine2 refineMesh -overwrite -dict system/refineMeshDict.refine2\n")
+        if meshSettings.skipRefinementLevels < 2:
+            file.write(f"{ind}runApplication -s refine3 topoSet -dict system/topoSetDict.refine3\n")
+            file.write(f"{ind}runApplication -s refine3 refineMesh -overwrite -dict system/refineMeshDict.refine3\n")
+        #------------------------------------------------
+
+
+        file.write("\n")
+        wakeTopoSetDict = "nearwake" if nestedWakeRefinement else "wakeregions"
+        if meshSettings.skipRefinementLevels < 1:
+            file.write(f"{ind}runApplication -s {wakeTopoSetDict} topoSet -dict system/topoSetDict.{wakeTopoSetDict}\n")
+            file.write(f"{ind}loopRefineMesh\n")
+        # recreate the cellSets on the refined mesh (ALM cellSets for fvOptions)
+        file.write(f"{ind}runApplication -s alm topoSet -dict system/topoSetDict.{wakeTopoSetDict}\n")
+        file.write("\n")
+
+        file.write("\n")
+        # rotate (rotation center alsways 0 0 0, beware of relative simulationarea position, its influencing rotation)
+        file.write(f"{ind}runApplication -s iter1 transformPoints -rollPitchYaw '(0 0 {SimulationArea.getSimulationArea().rotation_angle_deg})'\n")
+        # -rollPitchYaw <vector>
+
+        #translate to actual position
+        # file.write(f"runApplication -s iter2 transformPoints -translate '( {center_x} {center_y} 0)'\n\n")
+        # -translate <vector>
+        # Translate by specified <vector> before rotations
+        # file.write("\n")
+        # overwriting initial conditions
+        # file.write("python createInletBoundaryData.py\n")
+        file.write("\n")
+        # Postprocessing Mesh
+        ################################################
+        # Option1: parallel VTK generation (conflicts with Allrun)
+        # parallel VTK generation
+        # file.write("runApplication decomposePar\n")
+        # file.write("runParallel renumberMesh -overwrite \n")
+        # file.write(f"mpirun -np {computeCores} foamToVTK -parallel \n")
+
+        #Option2: serial VTK generation
+        file.write(f"{ind}runApplication checkMesh\n")
+        file.write(f"{ind}runApplication foamToVTK\n")
+        if meshSettings.meshCache:
+            file.write("    mkdir -p \"$MESHCACHE\"\n")
+            file.write("    cp -r constant/polyMesh \"$MESHCACHE/polyMesh\"\n")
+            file.write("fi\n")
+        file.write("\n")
+        # prepare for Solver
+        file.write("restore0Dir \n")
+        if SolverParameters.getSolverParameters().initialField == "logLaw":
+            # log-law initial velocity per cell centre (system/setExprFieldsDict.U)
+            file.write("runApplication -s U setExprFields -dict system/setExprFieldsDict.U\n")
+        if SolverParameters.getSolverParameters().weightedDecomposition:
+            # ALM cost factor on the turbine cellSets, read by decomposePar (weightField)
+            file.write("runApplication -s cellWeights setFields -dict system/setFieldsDict.cellWeights\n")
+        if meshSettings.meshCache:
+            # decomposed meshes are cached per core count (before renumberMesh), fields are always decomposed anew
+            file.write("if [ -d \"$PROCCACHE/processor0\" ]; then\n")
+            file.write("    echo \"restoring decomposed mesh from $PROCCACHE\"\n")
+            file.write("    rm -rf processor*\n")
+            file.write("    cp -r \"$PROCCACHE\"/processor* .\n")
+            file.write("    runApplication decomposePar -fields\n")
+            file.write("else\n")
+            file.write("    runApplication decomposePar \n")
+            file.write("    for PROC in processor* ; do\n")
+            file.write("        mkdir -p \"$PROCCACHE/$PROC/constant\"\n")
+            file.write("        cp -r \"$PROC/constant/polyMesh\" \"$PROCCACHE/$PROC/constant/polyMesh\"\n")
+            file.write("    done\n")
+            file.write("fi\n")
+        else:
+            file.write("runApplication decomposePar \n")
+        file.write("runParallel renumberMesh -overwrite \n")
+        if SolverParameters.getSolverParameters().coarseSpinUp:
+            # coarse companion case for the spin-up (see create_spinup_case)
+            file.write("(cd spinUp && sh ./Allpre)\n")
+
+        #Check log.files
+        file.write("grep -i 'error' log.* || echo 'no errors!' \n")
+
+    # print(f"Allpre successfully created at: \n{allpre_path}")
+
+create_allpre_script()
+
+
+#------------------------------------------------
+# blockMeshDict
+#------------------------------------------------
+def create_blockMeshDict():
+    """
+    Erstellt die zentrale OpenFOAM-Meshdatei 'blockMeshDict'.
+    
+    Internal Parameter:
+        - blockMeshDict_path: Pfad zur Ausgabedatei
+        - meshParams: dict mit Mesh-Parametern
+    Input:
+        - keine (liest Parameter aus compute_mesh_parameters)
+    Output:
+        - Schreibt 'blockMeshDict' in den system-Ordner des Case
+    Usage:
+        - Definiert das Grundgitter für die Simulation
+    """
+    blockMeshDict_path = os.path.join(get_case_folder(), "system/blockMeshDict")
+    meshParams = compute_mesh_parameters()
+    with open(blockMeshDict_path, 'w') as file:
+        file.write("/*--------------------------------*- C++ -*----------------------------------*\\\n")
+        file.write("| =========                 |                                                 |\n")
+        file.write("| \\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |\n")
+        file.write("|  \\    /   O peration     | Version:  2212                                  |\n")
         file.write("|   \\  /    A nd           | Website:  www.openfoam.com                      |\n")
         file.write("|    \\/     M anipulation  |                                                 |\n")
         file.write("\\*---------------------------------------------------------------------------*/\n")
@@ -1142,7 +2855,7 @@ def create_blockMeshDict():
         file.write(");\n\n")
 
         file.write("blocks\n(\n")
-        file.write(f"    hex (0 1 2 3 4 5 6 7) ({meshParams['xElem']} {meshParams['yElem']} {meshParams['zElem']}) simpleGrading (1 1 1)\n")
+        file.write(f"    hex (0 1 2 3 4 5 6 7) ({meshParams['xElem']} {meshParams['yElem']} {meshParams['zElem']}) simpleGrading (1 1 {meshParams['zGrading']})\n")
         file.write(");\n\n")
 
         file.write("edges\n(\n);\n\n")
@@ -1282,7 +2995,7 @@ def create_U_file():
     Internal Parameter:
         - U_path: Pfad zur Ausgabedatei
     Input:
-        - keine (liest Zielordner aus get_case_folder)
+        - keine (liest Zielordner aus get_case_folder, Inlet-Variante aus Environment.inletTurbulence)
     Output:
         - Schreibt 'U' in den 0.orig-Ordner
     Usage:
@@ -1315,25 +3028,34 @@ def create_U_file():
         file.write("{\n")
         file.write("    inlet\n")
         file.write("    {\n")
-        file.write("        type            turbulentDigitalFilterInlet;\n")
-        file.write("        value           uniform $UInitial;\n")
-        file.write("        variant         digitalFilter;\n")
-        file.write("        n               ( 10 100 );\n")
-        file.write("        L               ( 100 20 20 20 20 20 60 20 20 );\n")
-        file.write("        continuous      true;\n")
-        file.write("        mean\n")
-        file.write("        {\n")
-        file.write("            type            mappedFile;\n")
-        file.write("            mapMethod       nearest;\n")
-        file.write("            fieldTable      UMean;\n")
-        file.write("        }\n")
-        file.write("        R\n")
-        file.write("        {\n")
-        file.write("            type            mappedFile;\n")
-        file.write("            mapMethod       nearest;\n")
-        file.write("            fieldTable      R;\n")
-        file.write("        }\n")
-        file.write("    }\n")
+        if Environment.getEnvironment().inletTurbulence == "precomputed":
+            # snapshots from create_inflow_time_series, interpolated linearly in time
+            file.write("        type            timeVaryingMappedFixedValue;\n")
+            file.write("        value           uniform $UInitial;\n")
+            file.write("        mapMethod       nearest;\n")
+            file.write("        offset          ( 0 0 0 );\n")
+            file.write("        setAverage      false;\n")
+            file.write("    }\n")
+        else:
+            file.write("        type            turbulentDigitalFilterInlet;\n")
+            file.write("        value           uniform $UInitial;\n")
+            file.write("        variant         digitalFilter;\n")
+            file.write("        n               ( 10 100 );\n")
+            file.write("        L               ( 100 20 20 20 20 20 60 20 20 );\n")
+            file.write("        continuous      true;\n")
+            file.write("        mean\n")
+            file.write("        {\n")
+            file.write("            type            mappedFile;\n")
+            file.write("            mapMethod       nearest;\n")
+            file.write("            fieldTable      UMean;\n")
+            file.write("        }\n")
+            file.write("        R\n")
+            file.write("        {\n")
+            file.write("            type            mappedFile;\n")
+            file.write("            mapMethod       nearest;\n")
+            file.write("            fieldTable      R;\n")
+            file.write("        }\n")
+            file.write("    }\n")
         file.write("    outlet\n")
         file.write("    {\n")
         file.write("        type            inletOutlet;\n")
@@ -1545,38 +3267,122 @@ create_initial_conditions_file()
 # Inlet conditions
 #------------------------------------------------
 
+def compute_inlet_plane():
+    """
+    Berechnet Punkte, UMean und R der Inlet-Ebene an den Flächenmittelpunkten des Inlet-Patches.
+
+    Internal Parameter:
+        - faces: Flächenzeilen des Inlets (aus compute_inlet_face_centres)
+        - logLaw: Profilparameter inkl. Referenzhöhe und Veer (aus compute_log_law)
+        - x, y, z: Flächenmittelpunkte im Mesh-KOS, gedreht um rotation_angle (wie transformPoints)
+        - ang: Windrichtung je Punkt, angle + veer * (z - zRef)
+    Input:
+        - keine (liest aus Environment, SimulationArea, compute_log_law, compute_inlet_face_centres)
+    Output:
+        - dict mit "points", "UMean", "R" (flach, je Punkt 3 bzw. 6 Werte), "y", "z", "Umag" je Punkt
+          (Mesh-KOS), "yMin", "yWidth" und "n"; numpy-Arrays falls numpy verfügbar, sonst Listen
+    Usage:
+        - create_inlet_plane und create_inflow_time_series; mit numpy vektorisiert, sonst Schleife je Fläche
+    """
+    environment = Environment.getEnvironment()
+    simulationArea = SimulationArea.getSimulationArea()
+    logLaw = compute_log_law()
+    faces = compute_inlet_face_centres()
+    cos_rot, sin_rot = simulationArea.cos_rotation, simulationArea.sin_rotation
+    ti = environment.turbIntensity_inlet / 100
+    xMax, yMin = faces["xMax"], faces["yMin"]
+    counts = [round(faces["yWidth"] / dy) for z, dy in faces["rows"]]
+
+    if numpy is not None:
+        z = numpy.repeat([z for z, dy in faces["rows"]], counts)
+        dy = numpy.repeat([dy for z, dy in faces["rows"]], counts)
+        j = numpy.concatenate([numpy.arange(n) for n in counts])
+        y = yMin + (j + 0.5) * dy
+        Umag = logLaw["ustar"] / logLaw["kappa"] * numpy.log((z + logLaw["z0"]) / logLaw["z0"])
+        ang = logLaw["angle"] + logLaw["veer"] * (z - logLaw["zRef"])
+        r = (Umag * ti) ** 2
+        zero = numpy.zeros_like(z)
+        points = numpy.column_stack((xMax * cos_rot - y * sin_rot, xMax * sin_rot + y * cos_rot, z)).ravel()
+        UMean = numpy.column_stack((Umag * numpy.cos(ang), Umag * numpy.sin(ang), zero)).ravel()
+        R = numpy.column_stack((r, zero, zero, r, zero, r)).ravel()
+    else:
+        points, UMean, R, y, z, Umag = [], [], [], [], [], []
+        for (zRow, dy), n in zip(faces["rows"], counts):
+            UmagRow = logLaw["ustar"] / logLaw["kappa"] * math.log((zRow + logLaw["z0"]) / logLaw["z0"])
+            ang = logLaw["angle"] + logLaw["veer"] * (zRow - logLaw["zRef"])
+            r = (UmagRow * ti) ** 2
+            for j in range(n):
+                yFace = yMin + (j + 0.5) * dy
+                points += [xMax * cos_rot - yFace * sin_rot, xMax * sin_rot + yFace * cos_rot, zRow]
+                UMean += [UmagRow * math.cos(ang), UmagRow * math.sin(ang), 0.0]
+                R += [r, 0.0, 0.0, r, 0.0, r]
+                y.append(yFace)
+                z.append(zRow)
+                Umag.append(UmagRow)
+
+    return {"points": points, "UMean": UMean, "R": R, "y": y, "z": z, "Umag": Umag,
+            "yMin": yMin, "yWidth": faces["yWidth"], "n": sum(counts)}
+
+def create_inlet_plane():
+    """
+    Erstellt die boundaryData des Inlets als 2D-Ebene an den Flächenmittelpunkten des Inlet-Patches.
+
+    Internal Parameter:
+        - plane: Punkte, UMean und R der Ebene (aus compute_inlet_plane)
+        - binary: wind.inletFormat == "binary"
+    Input:
+        - keine (liest aus Environment, compute_inlet_plane)
+    Output:
+        - Schreibt constant/boundaryData/inlet/points, 0/UMean und 0/R
+    Usage:
+        - create_inlet_conditions bei wind.inletPlane, mapMethod nearest trifft die Flächen dann exakt
+    """
+    environment = Environment.getEnvironment()
+    plane = compute_inlet_plane()
+
+    inlet_path = os.path.join(get_case_folder(), 'constant/boundaryData/inlet')
+    os.makedirs(os.path.join(inlet_path, '0'), exist_ok=True)
+    binary = environment.inletFormat == "binary"
+    write_boundary_data(os.path.join(inlet_path, 'points'), "points", "vectorField", plane["points"], 3, binary)
+    write_boundary_data(os.path.join(inlet_path, '0/UMean'), "UMean", "vectorField", plane["UMean"], 3, binary)
+    write_boundary_data(os.path.join(inlet_path, '0/R'), "R", "symmTensorField", plane["R"], 6, binary)
+
+    # print(f"inlet plane with {plane['n']} points written to: \n{inlet_path}")
+
 def create_inlet_conditions():
     """
     Erstellt die Inlet-Bedingungen für die Simulation basierend auf der Windgeschwindigkeit und -richtung.
     
     Internal Parameter:
         - environment: Environment-Objekt mit Simulationsumgebung
-        - turbines: WindTurbines-Objekt mit Turbineninformationen
-        - angle: berechneter Winkel für die Strömungsrichtung
+        - logLaw: Parameter des logarithmischen Profils (aus compute_log_law)
+        - angle: berechneter Winkel für die Strömungsrichtung, je Höhe um veer * (z - zRef) gedreht (wind.windVeer)
         - k_roughness_inlet, z_zero_inlet: Rauhigkeits- und Referenzhöhe für die logarithmische Geschwindigkeitsverteilung
         - ustar: berechnete Schubspannungsgeschwindigkeit
         - pointsBuffer, UBuffer, RBuffer: Puffervariablen für Punkte, Geschwindigkeits- und Turbulenzdaten
         - outFiles: Ausgabedateien für die Inlet-Bedingungen
         - inlet_path, inlet_0_path: Pfade für die Erstellung der Verzeichnisse
     Input:
-        - keine (liest aus Environment, WindTurbines)
+        - keine (liest aus Environment, compute_log_law)
     Output:
         - Schreibt die Inlet-Bedingungen in die entsprechenden Verzeichnisse
     Usage:
-        - Setzt die Randbedingungen für den Inlet-Bereich der Simulation
+        - Setzt die Randbedingungen für den Inlet-Bereich der Simulation; bei wind.inletPlane (oder
+          inletTurbulence precomputed) übernimmt create_inlet_plane (2D-Ebene statt Profilspalte)
     """
     environment = Environment.getEnvironment()
-    turbines = WindTurbines.getTurbines()
+    if environment.inletPlane or environment.inletTurbulence == "precomputed":
+        create_inlet_plane()
+        return
+    logLaw = compute_log_law()
 
-    angle = environment.windDirectionRad
+    angle = logLaw["angle"]
     # print(f"Inlet angle cos sin: {math.cos(angle)} {math.sin(angle)}")
 
-    k_roughness_inlet = 0.41          # -
-    z_zero_inlet = 0.05               # [m]
-#TODO: ustar for multiple hubheights    
-    # Berechnung von ustar
-    ustar = environment.windSpeed * k_roughness_inlet / math.log((turbines['turbines'][0]['hubHeight'] + z_zero_inlet) / z_zero_inlet)                  # [m/s]
-    # ustar = 0 * k_roughness_inlet / math.log((hubHeight + z_zero_inlet) / z_zero_inlet)                  # [m/s]
+    k_roughness_inlet = logLaw["kappa"]          # -
+    z_zero_inlet = logLaw["z0"]                  # [m]
+    # Berechnung von ustar (compute_log_law)
+    ustar = logLaw["ustar"]                      # [m/s]
 
     Ux_inlet = []
     Uy_inlet = []
@@ -1592,8 +3398,9 @@ def create_inlet_conditions():
     for point in environment.profileHeights_inlet:
         pointsBuffer += f"( 0 0 {point} )\n"
         U = ustar / k_roughness_inlet * math.log((point + z_zero_inlet) / z_zero_inlet)
-        Ux_inlet = U * math.cos(angle)
-        Uy_inlet = U * math.sin(angle)
+        pointAngle = angle + logLaw["veer"] * (point - logLaw["zRef"])
+        Ux_inlet = U * math.cos(pointAngle)
+        Uy_inlet = U * math.sin(pointAngle)
         Uz_inlet = 0
         UBuffer += f"( {Ux_inlet} {Uy_inlet} {Uz_inlet} )\n"
         Rxx_inlet = (U * (environment.turbIntensity_inlet / 100)) ** 2
@@ -1629,6 +3436,258 @@ def create_inlet_conditions():
 
 create_inlet_conditions()
 
+#------------------------------------------------
+# Vorberechnete Zuströmung (timeVaryingMappedFixedValue)
+#------------------------------------------------
+
+def generate_inflow_series(plane, times, lengthScale, timeScale, seed, chunk):
+    """
+    Erzeugt synthetische Turbulenz am Inlet als Folge von Snapshots (Generator, Speicher begrenzt auf einen Chunk).
+
+    Internal Parameter:
+        - lattice: grobes Gitter (Abstand lengthScale) über der Inlet-Ebene mit unabhängigen AR(1)-Prozessen
+          je Knoten und Komponente, a = exp(-dt / timeScale), stationäre Varianz 1
+        - iy, iz, w: bilineare Interpolation der Gitterwerte auf die Flächenmittelpunkte, norm gleicht den
+          Varianzverlust der Interpolation aus
+        - sigma: TI * Umag je Punkt (Standardabweichung wie R aus compute_inlet_plane)
+        - chunk: Anzahl der Snapshots, deren Zufallszahlen und Interpolation gemeinsam berechnet werden
+    Input:
+        - plane: dict aus compute_inlet_plane
+        - times: Liste der Snapshot-Zeiten (äquidistant)
+        - lengthScale: Korrelationslänge quer zur Strömung in m
+        - timeScale: Korrelationszeit in s
+        - seed: Startwert des Zufallsgenerators
+        - chunk: Snapshots pro Chunk
+    Output:
+        - liefert (t, U) je Snapshot, U flach mit 3 Werten je Punkt
+    Usage:
+        - create_inflow_time_series; mit numpy je Chunk vektorisiert, sonst Schleife je Punkt (anderer Zufallsstrom)
+    """
+    environment = Environment.getEnvironment()
+    ti = environment.turbIntensity_inlet / 100
+    dt = times[1] - times[0] if len(times) > 1 else 1.0
+    a = math.exp(-dt / timeScale)
+    b = math.sqrt(1 - a ** 2)
+    zMax = max(plane["z"])
+    ny = math.ceil(plane["yWidth"] / lengthScale) + 1
+    nz = math.ceil(zMax / lengthScale) + 1
+
+    if numpy is not None:
+        fy = (numpy.asarray(plane["y"]) - plane["yMin"]) / lengthScale
+        fz = numpy.asarray(plane["z"]) / lengthScale
+        iy = numpy.clip(numpy.floor(fy).astype(int), 0, ny - 2)
+        iz = numpy.clip(numpy.floor(fz).astype(int), 0, nz - 2)
+        wy, wz = fy - iy, fz - iz
+        w = [(1 - wy) * (1 - wz), wy * (1 - wz), (1 - wy) * wz, wy * wz]
+        norm = numpy.sqrt(sum(wi ** 2 for wi in w))
+        sigma = (ti * numpy.asarray(plane["Umag"]) / norm)[:, None]
+        UMean = numpy.asarray(plane["UMean"]).reshape(-1, 3)
+        rng = numpy.random.default_rng(seed)
+        state = rng.standard_normal((ny, nz, 3))
+        for start in range(0, len(times), chunk):
+            k = min(chunk, len(times) - start)
+            noise = rng.standard_normal((k, ny, nz, 3))
+            lattice = numpy.empty_like(noise)
+            for step in range(k):
+                if start + step > 0:
+                    state = a * state + b * noise[step]
+                lattice[step] = state
+            fluct = (w[0][:, None] * lattice[:, iy, iz] + w[1][:, None] * lattice[:, iy + 1, iz]
+                     + w[2][:, None] * lattice[:, iy, iz + 1] + w[3][:, None] * lattice[:, iy + 1, iz + 1])
+            values = UMean + sigma * fluct
+            for step in range(k):
+                yield times[start + step], values[step].ravel()
+    else:
+        import random
+        rng = random.Random(seed)
+        weights = []
+        for y, z, Umag in zip(plane["y"], plane["z"], plane["Umag"]):
+            fy, fz = (y - plane["yMin"]) / lengthScale, z / lengthScale
+            iy, iz = min(max(int(fy), 0), ny - 2), min(max(int(fz), 0), nz - 2)
+            wy, wz = fy - iy, fz - iz
+            w = ((1 - wy) * (1 - wz), wy * (1 - wz), (1 - wy) * wz, wy * wz)
+            norm = math.sqrt(sum(wi ** 2 for wi in w))
+            weights.append((iy, iz, w, ti * Umag / norm))
+        state = [[[rng.gauss(0, 1) for c in range(3)] for j in range(nz)] for i in range(ny)]
+        for index, t in enumerate(times):
+            if index > 0:
+                state = [[[a * v + b * rng.gauss(0, 1) for v in node] for node in column] for column in state]
+            values = []
+            for p, (iy, iz, w, sigma) in enumerate(weights):
+                for c in range(3):
+                    fluct = (w[0] * state[iy][iz][c] + w[1] * state[iy + 1][iz][c]
+                             + w[2] * state[iy][iz + 1][c] + w[3] * state[iy + 1][iz + 1][c])
+                    values.append(plane["UMean"][3 * p + c] + sigma * fluct)
+            yield t, values
+
+def compute_inflow_plan(benchmark=False):
+    """
+    Bestimmt Umfang und Datenvolumen der vorberechneten Zuströmung und misst optional den Generator.
+
+    Internal Parameter:
+        - times: 0 bis endTime (aus compute_flow_through_schedule) im Abstand wind.inflowInterval
+        - points: Flächenmittelpunkte des Inlets (aus compute_inlet_face_centres)
+        - bytesPerSnapshot: 24 Byte je Punkt binär bzw. ~60 Byte ASCII, dazu ~200 Byte Header
+        - msPerSnapshot: gemessene Zeit je Snapshot über den ersten Chunk (ohne Schreiben); ein Filter im
+          Solver (turbulentDigitalFilterInlet) erzeugt mindestens so ein Feld in jedem Zeitschritt,
+          und zwar auf dem Master-Rank
+    Input:
+        - benchmark: True misst den Generator (nur für print_simulation_summary)
+    Output:
+        - dict mit "active", "times", "points", "bytesPerSnapshot", "totalBytes", "steps" (Solver-Zeitschritte)
+          und "msPerSnapshot" (None ohne Messung)
+    Usage:
+        - create_inflow_time_series, compute_io_plan und print_simulation_summary
+    """
+    environment = Environment.getEnvironment()
+    if environment.inletTurbulence != "precomputed":
+        return {"active": False, "times": [], "points": 0, "bytesPerSnapshot": 0, "totalBytes": 0, "steps": 0,
+                "msPerSnapshot": None}
+    faces = compute_inlet_face_centres()
+    points = sum(round(faces["yWidth"] / dy) for z, dy in faces["rows"])
+    endTime = compute_flow_through_schedule()["endTime"]
+    nTimes = math.ceil(endTime / environment.inflowInterval) + 1
+    times = [round(i * environment.inflowInterval, 6) for i in range(nTimes)]
+    bytesPerSnapshot = 200 + points * (24 if environment.inletFormat == "binary" else 60)
+    msPerSnapshot = None
+    if benchmark:
+        plane = compute_inlet_plane()
+        sample = times[:max(2, min(environment.inflowChunk, nTimes))]
+        start = time.perf_counter()
+        for _ in generate_inflow_series(plane, sample, environment.inflowLengthScale, 100 / environment.windSpeed,
+                                        environment.inflowSeed, environment.inflowChunk):
+            pass
+        msPerSnapshot = 1000 * (time.perf_counter() - start) / len(sample)
+    return {
+        "active": True,
+        "times": times,
+        "points": points,
+        "bytesPerSnapshot": bytesPerSnapshot,
+        "totalBytes": nTimes * bytesPerSnapshot,
+        "steps": math.ceil(endTime / compute_time_step()["deltaT"]),
+        "msPerSnapshot": msPerSnapshot,
+    }
+
+def create_inflow_time_series():
+    """
+    Schreibt die vorberechnete Zuströmung als Zeitverzeichnisse constant/boundaryData/inlet/<t>/U.
+
+    Internal Parameter:
+        - times: Snapshot-Zeiten (aus compute_inflow_plan)
+        - timeScale: 100 m / windSpeed, wie die Längsskala L des turbulentDigitalFilterInlet
+    Input:
+        - keine (liest aus Environment, compute_inflow_plan, compute_inlet_plane)
+    Output:
+        - Schreibt die Zeitverzeichnisse (binär bzw. ASCII nach wind.inletFormat), alte Zeitverzeichnisse
+          außer 0 werden vorher entfernt
+    Usage:
+        - Nur bei wind.inletTurbulence precomputed; die Snapshots werden gestreamt, der Speicherbedarf
+          hängt von inflowChunk ab, nicht von der Anzahl der Zeitschritte
+    """
+    environment = Environment.getEnvironment()
+    if environment.inletTurbulence != "precomputed":
+        return
+    plane = compute_inlet_plane()
+    times = compute_inflow_plan()["times"]
+    timeScale = 100 / environment.windSpeed
+    binary = environment.inletFormat == "binary"
+
+    inlet_path = os.path.join(get_case_folder(), 'constant/boundaryData/inlet')
+    for name in os.listdir(inlet_path):
+        try:
+            stale = float(name) != 0
+        except ValueError:
+            stale = False
+        if stale:
+            shutil.rmtree(os.path.join(inlet_path, name))
+
+    for t, values in generate_inflow_series(plane, times, environment.inflowLengthScale, timeScale,
+                                            environment.inflowSeed, environment.inflowChunk):
+        timeName = f"{t:.6f}".rstrip('0').rstrip('.')
+        os.makedirs(os.path.join(inlet_path, timeName), exist_ok=True)
+        U_path = os.path.join(inlet_path, timeName, 'U')
+        write_boundary_data(U_path, "U", "vectorField", values, 3, binary)
+
+    # print(f"inflowTimeSeries successfully created at: \n{inlet_path}")
+
+create_inflow_time_series()
+
+#------------------------------------------------
+# setExprFieldsDict.U (log-law Anfangsfeld)
+#------------------------------------------------
+def create_setExprFieldsDict_U():
+    """
+    Erstellt 'setExprFieldsDict.U', das das Anfangsfeld U mit dem logarithmischen Inlet-Profil belegt.
+
+    Internal Parameter:
+        - logLaw: ustar, kappa, z0, Windrichtung und Veer (aus compute_log_law, wie create_inlet_conditions)
+        - Umag: ustar / kappa * ln((max(z, 0) + z0) / z0) je Zellmittelpunkt (nach transformPoints, z bleibt gleich)
+        - amplitude: initialPerturbation * sqrt(3), gleichverteilte Störung mit Standardabweichung
+          initialPerturbation * Umag je Komponente (rand mit perturbationSeed, +1, +2)
+        - setExprFieldsDict_path: Pfad zu system/setExprFieldsDict.U
+    Input:
+        - keine (liest aus SolverParameters, compute_log_law)
+    Output:
+        - Schreibt 'system/setExprFieldsDict.U' (nur bei Solver.initialField logLaw)
+    Usage:
+        - Allpre führt setExprFields nach restore0Dir aus; die Grenzschicht muss sich nicht erst vom Inlet
+          aus durch das Gebiet entwickeln
+    """
+    solverParameters = SolverParameters.getSolverParameters()
+    if solverParameters.initialField != "logLaw":
+        return
+    logLaw = compute_log_law()
+    amplitude = solverParameters.initialPerturbation * math.sqrt(3)
+    seed = solverParameters.perturbationSeed
+    setExprFieldsDict_path = os.path.join(get_case_folder(), "system/setExprFieldsDict.U")
+    with open(setExprFieldsDict_path, 'w') as file:
+        file.write("/*--------------------------------*- C++ -*----------------------------------*\\\n")
+        file.write("| =========                 |                                                 |\n")
+        file.write("| \\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |\n")
+        file.write("|  \\    /   O peration     | Version:  v2212                                 |\n")
+        file.write("|   \\  /    A nd           | Website:  www.openfoam.com                      |\n")
+        file.write("|    \\/     M anipulation  |                                                 |\n")
+        file.write("\\*---------------------------------------------------------------------------*/\n")
+        file.write("FoamFile\n{\n")
+        file.write("    version     2.0;\n")
+        file.write("    format      ascii;\n")
+        file.write("    class       dictionary;\n")
+        file.write("    location    \"system\";\n")
+        file.write("    object      setExprFieldsDict;\n")
+        file.write("}\n\n")
+        file.write("// ************************************************************************* //\n")
+        file.write("expressions\n(\n")
+        file.write("    U\n")
+        file.write("    {\n")
+        file.write("        field       U;\n")
+        file.write("        dimensions  [0 1 -1 0 0 0 0];\n")
+        file.write("        variables\n")
+        file.write("        (\n")
+        file.write(f"            \"Umag = {logLaw['ustar']} / {logLaw['kappa']} * log((max(pos().z(), 0) + {logLaw['z0']}) / {logLaw['z0']})\"\n")
+        if logLaw['veer'] != 0:
+            # wind direction turning with height (wind.windVeer), same as the inlet plane
+            file.write(f"            \"ang = {logLaw['angle']} + {logLaw['veer']} * (pos().z() - {logLaw['zRef']})\"\n")
+            cosAngle, sinAngle = "cos(ang)", "sin(ang)"
+        else:
+            cosAngle, sinAngle = math.cos(logLaw['angle']), math.sin(logLaw['angle'])
+        file.write("        );\n")
+        file.write("        expression\n")
+        file.write("        #{\n")
+        if amplitude > 0:
+            file.write(f"            Umag * vector({cosAngle} + {amplitude} * (2 * rand({seed}) - 1),\n")
+            file.write(f"                          {sinAngle} + {amplitude} * (2 * rand({seed + 1}) - 1),\n")
+            file.write(f"                          {amplitude} * (2 * rand({seed + 2}) - 1))\n")
+        else:
+            file.write(f"            Umag * vector({cosAngle}, {sinAngle}, 0)\n")
+        file.write("        #};\n")
+        file.write("    }\n")
+        file.write(");\n")
+        file.write("// ************************************************************************* //\n")
+
+    # print(f"setExprFieldsDict.U successfully created at: \n{setExprFieldsDict_path}")
+
+create_setExprFieldsDict_U()
+
 #------------------------------------------------
 # topoSetDict.refine1 bis 3 und refineMeshDict.refine1 bis 3
 #------------------------------------------------
@@ -1638,26 +3697,23 @@ def create_refine_files():
     Erstellt die topoSetDict- und refineMeshDict-Dateien für die Mesh-Verfeinerung in verschiedenen Höhen.
     
     Internal Parameter:
-        - turbines: WindTurbines-Objekt mit Turbineninformationen
         - meshParams: dict mit Mesh-Parametern
         - refineRegionsnames: Liste der Verfeinerungsregionsnamen
         - refineRegionIndex: Liste der Verfeinerungsindexnamen
-        - refine1height, refine2height, refine3height: Höhen für die Verfeinerung
+        - refine1height, refine2height, refine3height: Höhen für die Verfeinerung (aus compute_mesh_parameters)
         - refineHeights: Liste der Verfeinerungshöhen
     Input:
-        - keine (liest aus WindTurbines, compute_mesh_parameters)
+        - keine (liest aus compute_mesh_parameters)
     Output:
         - Schreibt topoSetDict.refine1, refineMeshDict.refine1 usw. in den system-Ordner des Case
     Usage:
         - Definiert die Verfeinerungszonen und -parameter für die Mesh-Erstellung in OpenFOAM
     """
-    turbines = WindTurbines.getTurbines()
     meshParams = compute_mesh_parameters()
     refineRegionsnames = ["refineRegion1", "refineRegion2", "refineH3"]
     refineRegionIndex = ["refine1", "refine2", "refine3"]
-    refine1height = math.ceil(meshParams['zMax'])
-    refine3height = max(t['hubHeight'] for t in turbines['turbines']) + ( 2 * max(t['rotorRadius'] for t in turbines['turbines']))
-    refine2height = refine1height + ((refine3height - refine1height) / 2)
+    # refine heights come from compute_mesh_parameters (depend on the vertical mesh design)
+    refine1height, refine2height, refine3height = meshParams['refineHeights']
    
     print("Refine heights:", refine1height, refine2height, refine3height)
     refineHeights = [refine1height, refine2height, refine3height]
@@ -1755,27 +3811,130 @@ create_refine_files()
 # topoSetDict.wakeregions
 #------------------------------------------------
 
+def write_alm_cellset_actions(file):
+    """
+    Schreibt die topoSet-Aktionen der kompakten ALM-cellSets (cylinderToCell, optional Turm als boxToCell).
+
+    Internal Parameter:
+        - almCellSet: Geometrie aus WindTurbines.getAlmCellSets
+    Input:
+        - file: geöffnete topoSetDict-Datei
+    Output:
+        - Aktionen ALM_<TurbineId> in der Datei
+    Usage:
+        - create_topoSetDict_wakeregions und create_topoSetDict_nearwake
+    """
+    file.write("    // compact actuator line cellSets (rotor disc + gaussian projection width)\n")
+    for almCellSet in WindTurbines.getAlmCellSets():
+        p1, p2 = almCellSet["p1"], almCellSet["p2"]
+        file.write("    {\n")
+        file.write(f"        name        {almCellSet['id']};\n")
+        file.write("        type        cellSet;\n")
+        file.write("        action      new;\n")
+        file.write("        source      cylinderToCell;\n")
+        file.write(f"        p1          ({p1[0]} {p1[1]} {p1[2]});\n")
+        file.write(f"        p2          ({p2[0]} {p2[1]} {p2[2]});\n")
+        file.write(f"        radius      {almCellSet['radius']};\n")
+        file.write("    }\n\n")
+        if "towerBox" in almCellSet:
+            box_x_min, box_y_min, box_z_min, box_x_max, box_y_max, box_z_max = almCellSet["towerBox"]
+            file.write("    {\n")
+            file.write(f"        name        {almCellSet['id']};\n")
+            file.write("        type        cellSet;\n")
+            file.write("        action      add;\n")
+            file.write("        source      boxToCell;\n")
+            file.write(f"        box ({box_x_min} {box_y_min} {box_z_min}) " +
+                       f"({box_x_max} {box_y_max} {box_z_max});\n")
+            file.write("    }\n\n")
+
+def write_rotor_disc_actions(file):
+    """
+    Schreibt die topoSet-Aktionen der Rotorscheiben (cylinderToCell) für die rotorgemittelte Geschwindigkeit.
+
+    Internal Parameter:
+        - disc: Geometrie aus WindTurbines.getRotorDiscs
+    Input:
+        - file: geöffnete topoSetDict-Datei
+    Output:
+        - Aktionen rotorDisc_<TurbineId> und upstreamDisc_<TurbineId> in der Datei (nur bei Solver.rotorDiscAverage)
+    Usage:
+        - create_topoSetDict_wakeregions und create_topoSetDict_nearwake
+    """
+    if not SolverParameters.getSolverParameters().rotorDiscAverage:
+        return
+    file.write("    // rotor discs for the rotor-averaged velocity (volFieldValue in system/rotorDiscAverages)\n")
+    for disc in WindTurbines.getRotorDiscs():
+        p1, p2 = disc["p1"], disc["p2"]
+        file.write("    {\n")
+        file.write(f"        name        {disc['id']};\n")
+        file.write("        type        cellSet;\n")
+        file.write("        action      new;\n")
+        file.write("        source      cylinderToCell;\n")
+        file.write(f"        p1          ({p1[0]} {p1[1]} {p1[2]});\n")
+        file.write(f"        p2          ({p2[0]} {p2[1]} {p2[2]});\n")
+        file.write(f"        radius      {disc['radius']};\n")
+        file.write("    }\n\n")
+
+def write_average_zone_actions(file):
+    """
+    Schreibt die topoSet-Aktionen der cellZone averageZone (Wake-Regionen und ALM-cellSets) für die
+    auf die Wake-Regionen beschränkte Mittelung.
+
+    Internal Parameter:
+        - wakeBoxes: Boxen der Wake-Regionen (aus WakeRegion.getWakeRegionBoxes, auch bei nestedWakeRefinement)
+    Input:
+        - file: geöffnete topoSetDict-Datei
+    Output:
+        - Aktionen averageRegion (cellSet) und averageZone (cellZoneSet) in der Datei
+          (nur wenn compute_zone_average die Mittelung in der Zone wählt)
+    Usage:
+        - create_topoSetDict_wakeregions und create_topoSetDict_nearwake, gelesen von system/fieldAverage
+    """
+    if not compute_zone_average()["active"]:
+        return
+    file.write("    // averaging region (cellZone for the coded fieldAverage)\n")
+    file.write("    {\n")
+    file.write("        name        averageRegion;\n")
+    file.write("        type        cellSet;\n")
+    file.write("        action      new;\n")
+    file.write("        source      boxToCell;\n")
+    file.write("        boxes\n")
+    file.write("        (\n")
+    for wake in WakeRegion.getWakeRegionBoxes():
+        box_x_min, box_y_min, box_z_min, box_x_max, box_y_max, box_z_max = wake["box"]
+        file.write(f"            ({box_x_min} {box_y_min} {box_z_min}) ({box_x_max} {box_y_max} {box_z_max})\n")
+    file.write("        );\n")
+    file.write("    }\n\n")
+    file.write("    {\n")
+    file.write("        name        averageRegion;\n")
+    file.write("        type        cellSet;\n")
+    file.write("        action      add;\n")
+    file.write("        source      cellToCell;\n")
+    file.write(f"        sets        ({' '.join(almCellSet['id'] for almCellSet in WindTurbines.getAlmCellSets())});\n")
+    file.write("    }\n\n")
+    file.write("    {\n")
+    file.write("        name        averageZone;\n")
+    file.write("        type        cellZoneSet;\n")
+    file.write("        action      new;\n")
+    file.write("        source      setToCellZone;\n")
+    file.write("        set         averageRegion;\n")
+    file.write("    }\n\n")
+
 def create_topoSetDict_wakeregions():
     """
     Erstellt die topoSetDict-Datei für die Windturbinenplatzierung basierend auf den Wake-Regionen.
     
     Internal Parameter:
         - topoSetDictwakeregions_path: Pfad zur Ausgabedatei
-        - simulationArea: SimulationArea-Objekt mit Simulationsbereich
-        - turbine_data: WindTurbines-Objekt mit Turbineninformationen
-        - refine3height: Höhe für die Verfeinerung der Wake-Regionen
+        - wake["box"]: Box der Wake-Region im Mesh-KOS (aus WakeRegion.getWakeRegionBoxes)
     Input:
-        - keine (liest Zielordner aus get_case_folder, SimulationArea und WindTurbines für Daten)
+        - keine (liest Zielordner aus get_case_folder, Boxen aus WakeRegion.getWakeRegionBoxes)
     Output:
         - Schreibt topoSetDict.wakeregions in den system-Ordner des Case
     Usage:
         - Definiert die Platzierung der Windturbinen in der Simulation
     """
     topoSetDictwakeregions_path = os.path.join(get_case_folder(), "system/topoSetDict.wakeregions")
-    simulationArea = SimulationArea.getSimulationArea()
-    turbine_data = WindTurbines.getTurbines()
-
-    refine3height = max(t['hubHeight'] for t in turbine_data['turbines']) + ( 1.5 * max(t['rotorRadius'] for t in turbine_data['turbines']))
 
 
     with open(topoSetDictwakeregions_path, 'w') as file:
@@ -1812,36 +3971,89 @@ def create_topoSetDict_wakeregions():
         
         # New wake region refinement loop using wake.id from the wake region object:
         file.write("    // New wake region refinement using boxToCell based on wake.id\n")
-        for wake in WakeRegion.getSubdividedWakeRegions():
-            # Shift wake coordinates by simulationArea center
-            shifted_points = [(pt[0] - simulationArea.center[0], pt[1] - simulationArea.center[1])
-                              for pt in wake["coordinates"]]
-            # Apply inverse rotation to align with mesh (angle = -rotation_angle)
-            angle = simulationArea.rotation_angle_rad
-            rotated_points = [(p[0]*math.cos(angle) + p[1]*math.sin(angle),
-                               -p[0]*math.sin(angle) + p[1]*math.cos(angle))
-                              for p in shifted_points]
-            xs = [pt[0] for pt in rotated_points]
-            ys = [pt[1] for pt in rotated_points]
-            box_x_min = min(xs)
-            box_y_min = min(ys)
-            box_x_max = max(xs)
-            box_y_max = max(ys)
-            
+        for wake in WakeRegion.getWakeRegionBoxes():
+            box_x_min, box_y_min, box_z_min, box_x_max, box_y_max, box_z_max = wake["box"]
             file.write("    {\n")
             file.write(f"        name        {wake['id']};\n")
             file.write("        type        cellSet;\n")
             file.write("        action      new;\n")
             file.write("        source      boxToCell;\n")
-            file.write(f"        box ({box_x_min} {box_y_min} {0}) " +
-                       f"({box_x_max} {box_y_max} {refine3height});\n")
+            file.write(f"        box ({box_x_min} {box_y_min} {box_z_min}) " +
+                       f"({box_x_max} {box_y_max} {box_z_max});\n")
             file.write("    }\n\n")
-        
+
+        write_alm_cellset_actions(file)
+        write_rotor_disc_actions(file)
+        write_average_zone_actions(file)
+        file.write(");\n")
+        file.write("// ************************************************************************* //\n")
+
+# Call the function
+create_topoSetDict_wakeregions()
+
+#------------------------------------------------
+# topoSetDict.nearwake
+#------------------------------------------------
+
+def create_topoSetDict_nearwake():
+    """
+    Erstellt die topoSetDict-Datei für die Near-Wake-Schalen (nur bei nestedWakeRefinement).
+
+    Internal Parameter:
+        - topoSetDictnearwake_path: Pfad zur Ausgabedatei
+        - nearWakeRegions: Near-Wake-Boxen im Mesh-KOS (aus WakeRegion.getNearWakeRegions)
+    Input:
+        - keine (liest MeshSettings und WakeRegion.getNearWakeRegions)
+    Output:
+        - Schreibt topoSetDict.nearwake in den system-Ordner des Case
+    Usage:
+        - Feinste Verfeinerungsstufe nur um Rotor und Near Wake, der Far Wake bleibt auf refine3-Niveau
+    """
+    if not MeshSettings.getMeshSettings().nestedWakeRefinement:
+        return
+    topoSetDictnearwake_path = os.path.join(get_case_folder(), "system/topoSetDict.nearwake")
+    nearWakeRegions = WakeRegion.getNearWakeRegions()
+
+    with open(topoSetDictnearwake_path, 'w') as file:
+        file.write("/*--------------------------------*- C++ -*----------------------------------*\\\n")
+        file.write("| =========                 |                                                 |\n")
+        file.write("| \\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |\n")
+        file.write("|  \\    /   O peration     | Version:  v2212                                 |\n")
+        file.write("|   \\  /    A nd           | Website:  www.openfoam.com                      |\n")
+        file.write("|    \\/     M anipulation  |                                                 |\n")
+        file.write("\\*---------------------------------------------------------------------------*/\n")
+        file.write("FoamFile\n{\n")
+        file.write("    version     2.0;\n")
+        file.write("    format      ascii;\n")
+        file.write("    class       dictionary;\n")
+        file.write("    location    \"system\";\n")
+        file.write("    object      topoSetDict;\n")
+        file.write("}\n\n")
+
+        file.write("// ************************************************************************* //\n")
+        file.write("actions\n(\n")
+        # union of all shells, used for refineMesh
+        file.write("    {\n")
+        file.write("        name        nearWake;\n")
+        file.write("        type        cellSet;\n")
+        file.write("        action      new;\n")
+        file.write("        source      boxToCell;\n")
+        file.write("        boxes\n")
+        file.write("        (\n")
+        for nearWake in nearWakeRegions:
+            xs = [pt[0] for pt in nearWake["coordinates"]]
+            ys = [pt[1] for pt in nearWake["coordinates"]]
+            file.write(f"            ({min(xs)} {min(ys)} {0}) ({max(xs)} {max(ys)} {nearWake['zMax']})\n")
+        file.write("        );\n")
+        file.write("    }\n\n")
+        write_alm_cellset_actions(file)
+        write_rotor_disc_actions(file)
+        write_average_zone_actions(file)
         file.write(");\n")
         file.write("// ************************************************************************* //\n")
 
 # Call the function
-create_topoSetDict_wakeregions()
+create_topoSetDict_nearwake()
 
 
 #------------------------------------------------
@@ -1932,6 +4144,8 @@ def create_allrun_script():
     
     Internal Parameter:
         - computeCores: Anzahl der zu verwendenden Rechenkernen
+        - convergenceStop: startet utilConvergenceWatchdog.sh im Hintergrund (beendet nach dem Solver)
+        - keepSnapshots: startet utilPruneSnapshots.sh im Hintergrund (nach dem Solver ein letzter Durchlauf)
         - allrun_path: Pfad zur Ausgabedatei
     Input:
         - keine (liest Anzahl der Kerne aus SolverParameters)
@@ -1941,6 +4155,8 @@ def create_allrun_script():
         - Führt die Simulation auf dem HPC-System aus
     """
     computeCores = SolverParameters.getSolverParameters().computeCores
+    convergenceStop = SolverParameters.getSolverParameters().convergenceStop
+    keepSnapshots = compute_io_plan()["keepSnapshots"]
     allrun_path = os.path.join(get_case_folder(), "Allrun")
     with open(allrun_path, 'w') as file:
         file.write("#!/bin/sh\n\n")
@@ -1954,7 +4170,18 @@ def create_allrun_script():
 
         file.write("restore0Dir\n\n")
         
+        if convergenceStop:
+            file.write("bash utilConvergenceWatchdog.sh &\n")
+            file.write("WATCHDOG_PID=$!\n\n")
+        if keepSnapshots:
+            file.write("bash utilPruneSnapshots.sh &\n")
+            file.write("PRUNE_PID=$!\n\n")
         file.write(f"mpirun -np {computeCores} pimpleFoam -parallel\n")
+        if convergenceStop:
+            file.write("kill $WATCHDOG_PID 2>/dev/null\n")
+        if keepSnapshots:
+            file.write("kill $PRUNE_PID 2>/dev/null\n")
+            file.write("bash utilPruneSnapshots.sh once\n")
         file.write("\n")
         file.write("runApplication reconstructPar\n")
         file.write("\n")
@@ -2001,168 +4228,874 @@ create_allpost_script()
 #------------------------------------------------
 # Allrun.slurm
 #------------------------------------------------
-def create_allrun_slurm_script():
+def create_allrun_slurm_script(restart=False):
+    """
+    Erstellt das SLURM-Skript 'Allrun.slurm' zum Ausführen der Simulation in parallel auf dem HPC.
+    
+    Internal Parameter:
+        - computeCores: Anzahl der zu verwendenden Rechenkernen
+        - layout: Knoten, Tasks, Binding und Speicher (aus compute_slurm_layout)
+        - keepSnapshots: utilPruneSnapshots.sh läuft neben dem Solver (ersetzt purgeWrite, siehe compute_io_plan)
+        - checkpointMode: pimpleFoam läuft im Hintergrund, SIGUSR1 (--signal, 600 s vor Ablauf der Wall-Time)
+          setzt 'stopAt writeNow'; ist endTime danach nicht erreicht, wird 'Allrun.restart.slurm' als
+          Folgejob eingereicht (Abbruch durch den Konvergenzwächter reicht nichts nach)
+        - allrun_slurm_path: Pfad zur Ausgabedatei
+    Input:
+        - restart: True schreibt die Neustart-Variante 'Allrun.restart.slurm' (hängt das Log des vorigen
+          Abschnitts an log.slurm_pimpleFoam.chunks an, zerlegte Daten bleiben erhalten, Zeitordner ohne
+          volle Felder nach dem letzten Neustartstand werden entfernt)
+    Output:
+        - Schreibt SLURM-Skript 'Allrun.slurm' bzw. 'Allrun.restart.slurm' in den Case-Ordner
+    Usage:
+        - SLURM-Skript zur Ausführung der Simulation auf dem HPC
+    """
+    solverParameters = SolverParameters.getSolverParameters()
+    computeCores = solverParameters.computeCores
+    layout = compute_slurm_layout()
+    keepSnapshots = compute_io_plan()["keepSnapshots"]
+    allrun_slurm_path = os.path.join(get_case_folder(), "Allrun.restart.slurm" if restart else "Allrun.slurm")
+    with open(allrun_slurm_path, 'w') as file:
+        file.write("#!/bin/bash\n\n")
+        file.write("### SLURM script for running the offshore wind park simulation in parallel\n")
+        file.write("### HLRS, 2024-2025\n\n")
+        file.write(f"#SBATCH --partition={layout['partition']}                     ### Partition\n")
+        file.write("#SBATCH --job-name=openfoamsimoffshore          ### Job Name\n")
+        file.write(f"#SBATCH --time={layout['wallTime']}                        ### WallTime\n")
+        file.write(f"#SBATCH --mem-per-cpu {layout['memPerCpu']}\n")
+        # ntasks = numberOfSubdomains (decomposeParDict) = mpirun -np
+        file.write(f"#SBATCH --ntasks {computeCores}\n")
+        file.write(f"#SBATCH --ntasks-per-core {layout['tasksPerCore']}\n")
+        file.write(f"#SBATCH --ntasks-per-node {layout['tasksPerNode']}\n")
+        file.write("#SBATCH --cpus-per-task 1\n")
+        file.write(f"#SBATCH --nodes {layout['nodes']}\n")
+        if layout['hint']:
+            file.write(f"#SBATCH --hint={layout['hint']}\n")
+        if solverParameters.checkpointMode:
+            file.write("#SBATCH --signal=B:USR1@600         ### Checkpoint vor Ablauf der Wall-Time\n")
+        file.write("#SBATCH -o slurm.%j.out         # STDOUT\n")
+        file.write("#SBATCH -e slurm.%j.err         # STDERR\n\n")
+        file.write("source /home/hpcschud/.bashrc\n\n")
+        file.write("cd $SLURM_SUBMIT_DIR\n\n")
+        if restart:
+            file.write("cat log.slurm_pimpleFoam >> log.slurm_pimpleFoam.chunks 2>/dev/null\n")
+            # latestTime must be a full snapshot, writeRegisteredObject directories after it only hold outputFields;
+            # only full writes carry uniform/time (p may be one of the outputFields)
+            file.write("TIMES=$(ls -d processor0/[0-9]* | xargs -n 1 basename | sort -g)\n")
+            file.write("CHECKPOINT=0\n")
+            file.write("for time in $TIMES; do\n")
+            file.write("    [ -f processor0/$time/uniform/time ] && CHECKPOINT=$time\n")
+            file.write("done\n")
+            file.write("for time in $TIMES; do\n")
+            file.write("    awk -v t=\"$time\" -v c=\"$CHECKPOINT\" 'BEGIN { exit !(t > c) }' && rm -rf processor*/$time\n")
+            file.write("done\n")
+            file.write("echo \"restart from $CHECKPOINT\"\n\n")
+        # estimates and measured peak memory per rank for the calibration (update_run_calibration)
+        file.write("echo \"slurmJobId=$SLURM_JOB_ID\" > log.slurm_pimpleFoam\n")
+        file.write(f"echo \"memEstimatePerRank={estimate_rank_memory()['estimate']}MB\" >> log.slurm_pimpleFoam\n")
+        file.write(f"echo \"costEstimatePerStep={compute_run_cost()['stepTimeEstimate']}s\" >> log.slurm_pimpleFoam\n")
+        file.write("TIMECMD=\"\"\n")
+        file.write("[ -x /usr/bin/time ] && TIMECMD=\"/usr/bin/time -f memMaxRSS=%MkB\"\n\n")
+        if solverParameters.convergenceStop:
+            file.write("bash utilConvergenceWatchdog.sh &\n")
+            file.write("WATCHDOG_PID=$!\n\n")
+        if keepSnapshots:
+            file.write("bash utilPruneSnapshots.sh &\n")
+            file.write("PRUNE_PID=$!\n\n")
+        if solverParameters.coarseSpinUp and not restart:
+            # developed flow of the coarse spin-up case (spinUp/, see create_spinup_case) as initial condition,
+            # only on the first start: resubmits and Allredistribute continue from latestTime
+            file.write(f"FIRSTSTART=$(ls -d processor0/[0-9]* 2>/dev/null | xargs -r -n 1 basename | awk -v s={solverParameters.startTime} '$1 > s {{ n++ }} END {{ print n ? 0 : 1 }}')\n")
+            file.write("if [ \"$FIRSTSTART\" -eq 1 ]; then\n")
+            if compute_spinup_plan()["cores"] != computeCores:
+                # mapFieldsPar reads the source with as many ranks as the target
+                file.write("    (cd spinUp && reconstructPar -latestTime > log.reconstructPar.map 2>&1 && "
+                           "decomposePar -latestTime -force -decomposeParDict system/decomposeParDict.map > log.decomposePar.map 2>&1) || exit 1\n")
+            file.write(f"    mpirun -np {computeCores} {layout['bind']}-- mapFieldsPar spinUp -consistent -sourceTime latestTime -parallel > log.mapFieldsPar 2>&1 || exit 1\n")
+            file.write("fi\n\n")
+        if solverParameters.checkpointMode:
+            file.write("CHUNK_END=0\n")
+            file.write("trap 'CHUNK_END=1; sed -i \"s/^stopAt .*/stopAt          writeNow;/\" system/controlDict' USR1\n\n")
+            file.write(f"mpirun -np {computeCores} {layout['bind']}-- $TIMECMD pimpleFoam -parallel >> log.slurm_pimpleFoam 2>&1 &\n")
+            file.write("SOLVER_PID=$!\n")
+            file.write("# wait returns early when the trap fires, keep waiting until the checkpoint is written\n")
+            file.write("while kill -0 $SOLVER_PID 2>/dev/null; do\n")
+            file.write("    wait $SOLVER_PID\n")
+            file.write("done\n")
+        else:
+            file.write(f"mpirun -np {computeCores} {layout['bind']}-- $TIMECMD pimpleFoam -parallel >> log.slurm_pimpleFoam 2>&1\n")
+        if solverParameters.convergenceStop:
+            file.write("kill $WATCHDOG_PID 2>/dev/null\n")
+        if keepSnapshots:
+            file.write("kill $PRUNE_PID 2>/dev/null\n")
+            file.write("bash utilPruneSnapshots.sh once\n")
+        if solverParameters.checkpointMode:
+            endTime = compute_flow_through_schedule()["endTime"]
+            file.write("\n")
+            file.write("LATEST=$(ls -d processor0/[0-9]* 2>/dev/null | xargs -n 1 basename | sort -g | tail -n 1)\n")
+            file.write(f"if [ \"$CHUNK_END\" -eq 1 ] && awk -v t=\"$LATEST\" 'BEGIN {{ exit !(t < {endTime}) }}'; then\n")
+            file.write("    sed -i \"s/^stopAt .*/stopAt          endTime;/\" system/controlDict\n")
+            file.write("    sbatch Allrun.restart.slurm\n")
+            file.write("fi\n")
+
+    # print(f"AllrunSlurm successfully created at: \n{allrun_slurm_path}")
+
+update_run_calibration()
+create_allrun_slurm_script()
+if SolverParameters.getSolverParameters().checkpointMode:
+    create_allrun_slurm_script(restart=True)
+
+# ------------------------------------------------
+# Allpost.slurm
+# ------------------------------------------------
+def create_allpost_slurm_script():
+    """
+    Erstellt das SLURM-Skript 'Allpost.slurm' für die Nachbearbeitung der Simulationsergebnisse.
+    
+    Internal Parameter:
+        - allpost_slurm_path: Pfad zur Ausgabedatei
+        - layout: Partition, Speicher und Laufzeit (aus compute_slurm_layout, wie Allrun.slurm)
+    Input:
+        - keine (liest Zielordner aus get_case_folder, Layout aus compute_slurm_layout)
+    Output:
+        - Schreibt SLURM-Skript 'Allpost.slurm' in den Case-Ordner
+    Usage:
+        - SLURM-Skript zur Nachbearbeitung der Simulationsergebnisse
+    """
+    allpost_slurm_path = os.path.join(get_case_folder(), "Allpost.slurm")
+    layout = compute_slurm_layout()
+
+    with open(allpost_slurm_path, 'w') as file:
+        file.write("#!/bin/bash\n\n")
+        file.write("### SLURM script for post-processing the offshore wind park simulation\n")
+        file.write("### HLRS, 2024-2025\n\n")
+        file.write(f"#SBATCH --partition={layout['postPartition']}                     ### Partition\n")
+        file.write("#SBATCH --job-name=openfoamsimoffshore          ### Job Name\n")
+        file.write(f"#SBATCH --time={layout['wallTime']}                        ### WallTime\n")
+        # reconstructPar holds the whole mesh in one process
+        file.write(f"#SBATCH --mem-per-cpu {layout['postMem']}\n")
+        file.write("#SBATCH --ntasks 1\n")
+        file.write("#SBATCH --cpus-per-task 1\n")
+        file.write("#SBATCH -o slurm.%j.out         # STDOUT\n")
+        file.write("#SBATCH -e slurm.%j.err         # STDERR\n\n")
+        file.write("source /home/hpcschud/.bashrc\n\n")
+        file.write("cd $SLURM_SUBMIT_DIR\n\n")
+        file.write(". $WM_PROJECT_DIR/bin/tools/RunFunctions\n\n")
+        file.write("runApplication reconstructPar\n")
+        file.write("runApplication foamToVTK\n")
+    # print(f"AllpostSlurm successfully created at: \n{allpost_slurm_path}")
+
+create_allpost_slurm_script()
+
+# ------------------------------------------------
+# Allredistribute.slurm
+# ------------------------------------------------
+def create_allredistribute_slurm_script():
+    """
+    Erstellt das SLURM-Skript 'Allredistribute.slurm', das einen zerlegten Lauf mit redistributePar
+    parallel von previousCores auf computeCores umverteilt und danach den Lauf wieder einreicht.
+
+    Internal Parameter:
+        - ranks: max(previousCores, computeCores), redistributePar braucht alle Quell- und Ziel-Prozessoren
+        - memPerRank: Speicher für die Teilgebiete der kleineren Kernzahl ohne Solver-Matrizen
+        - layout: Knoten, Tasks und Binding für ranks (aus compute_slurm_layout)
+        - allredistribute_slurm_path: Pfad zur Ausgabedatei
+    Input:
+        - keine (liest previousCores und computeCores aus SolverParameters)
+    Output:
+        - Schreibt 'Allredistribute.slurm' in den Case-Ordner (nur wenn previousCores != computeCores)
+    Usage:
+        - Wechsel der Kernzahl zwischen zwei Abschnitten; decomposeParDict und Allrun.slurm nutzen bereits
+          computeCores, controlDict setzt mit startFrom latestTime fort
+    """
+    solverParameters = SolverParameters.getSolverParameters()
+    if not solverParameters.isRedistribution():
+        return
+    previousCores, computeCores = solverParameters.previousCores, solverParameters.computeCores
+    ranks = max(previousCores, computeCores)
+    memPerRank = estimate_rank_memory(ranks=min(previousCores, computeCores), solver=False)["request"]
+    layout = compute_slurm_layout(ranks, memPerRank)
+    allredistribute_slurm_path = os.path.join(get_case_folder(), "Allredistribute.slurm")
+
+    with open(allredistribute_slurm_path, 'w') as file:
+        file.write("#!/bin/bash\n\n")
+        file.write(f"### SLURM script for moving the decomposed case from {previousCores} to {computeCores} cores\n")
+        file.write("### HLRS, 2024-2025\n\n")
+        file.write(f"#SBATCH --partition={layout['partition']}                     ### Partition\n")
+        file.write("#SBATCH --job-name=openfoamsimoffshore          ### Job Name\n")
+        file.write(f"#SBATCH --time={layout['wallTime']}                        ### WallTime\n")
+        file.write(f"#SBATCH --mem-per-cpu {layout['memPerCpu']}\n")
+        file.write(f"#SBATCH --ntasks {ranks}\n")
+        file.write(f"#SBATCH --ntasks-per-core {layout['tasksPerCore']}\n")
+        file.write(f"#SBATCH --ntasks-per-node {layout['tasksPerNode']}\n")
+        file.write("#SBATCH --cpus-per-task 1\n")
+        file.write(f"#SBATCH --nodes {layout['nodes']}\n")
+        if layout['hint']:
+            file.write(f"#SBATCH --hint={layout['hint']}\n")
+        file.write("#SBATCH -o slurm.%j.out         # STDOUT\n")
+        file.write("#SBATCH -e slurm.%j.err         # STDERR\n\n")
+        file.write("source /home/hpcschud/.bashrc\n\n")
+        file.write("cd $SLURM_SUBMIT_DIR\n\n")
+        # all time directories, so reconstructPar sees one consistent decomposition
+        file.write(f"mpirun -np {ranks} {layout['bind']}-- redistributePar -parallel -overwrite > log.redistributePar 2>&1 || exit 1\n")
+        if computeCores < previousCores:
+            # the surplus processors hold empty meshes after shrinking
+            file.write(f"for i in $(seq {computeCores} {previousCores - 1}); do\n")
+            file.write("    rm -rf processor$i\n")
+            file.write("done\n")
+        file.write("\n")
+        file.write(f"sbatch {'Allrun.restart.slurm' if solverParameters.checkpointMode else 'Allrun.slurm'}\n")
+    # print(f"AllredistributeSlurm successfully created at: \n{allredistribute_slurm_path}")
+
+create_allredistribute_slurm_script()
+
+# controlDict
+#------------------------------------------------
+def create_controlDict():
+    """
+    Erstellt die Steuerdatei 'controlDict' für die OpenFOAM-Simulation.
+    
+    Internal Parameter:
+        - solverParameters: SolverParameters-Objekt mit Solver-Einstellungen
+        - timeStep: Zeitschritt aus compute_time_step (fixed, auto oder adaptive)
+        - schedule: endTime aus compute_flow_through_schedule (Eingabe oder Vielfaches der Durchströmzeit)
+        - ioPlan: writeInterval, Neustartstände und writeRegisteredObject aus compute_io_plan
+        - controlDict_path: Pfad zur Ausgabedatei
+    Input:
+        - keine (liest aus SolverParameters, compute_time_step, compute_flow_through_schedule, compute_io_plan)
+    Output:
+        - Schreibt 'controlDict' in den system-Ordner des Case
+    Usage:
+        - Definiert die Steuerparameter für die Simulation
+    """
+    solverParameters = SolverParameters.getSolverParameters()
+    timeStep = compute_time_step()
+    schedule = compute_flow_through_schedule()
+    ioPlan = compute_io_plan()
+    controlDict_path = os.path.join(get_case_folder(), "system/controlDict")
+    with open(controlDict_path, 'w') as file:
+        file.write("/*--------------------------------*- C++ -*----------------------------------*\\\n")
+        file.write("| =========                 |                                                 |\n")
+        file.write("| \\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |\n")
+        file.write("|  \\    /   O peration     | Version:  2212                                  |\n")
+        file.write("|   \\  /    A nd           | Website:  www.openfoam.com                      |\n")
+        file.write("|    \\/     M anipulation  |                                                 |\n")
+        file.write("\\*---------------------------------------------------------------------------*/\n")
+        file.write("\n")
+        file.write("FoamFile\n")
+        file.write("{\n")
+        file.write("    version     2.0;                    // OpenFOAM-Version\n")
+        file.write("    format      ascii;                   // Datei im ASCII-Format\n")
+        file.write("    class       dictionary;              // OpenFOAM-Dictionary\n")
+        file.write("    location    \"system\";                // Speicherort der Datei\n")
+        file.write("    object      controlDict;             // Name des Objekts\n")
+        file.write("}\n")
+        file.write("\n")
+        file.write("// ************************************************************************* //\n")
+        file.write("\n")
+        file.write("// Anwendung: Definiert den verwendeten OpenFOAM-Solver\n")
+        file.write("application     pimpleFoam;              // PIMPLE-Solver für inkompressible, instationäre Strömung\n")
+        file.write("\n")
+        file.write("// Startoptionen der Simulation\n")
+        if solverParameters.checkpointMode or solverParameters.isRedistribution():
+            file.write("startFrom       latestTime;              // Fortsetzung vom letzten Neustartstand (beim ersten Lauf startTime)\n")
+        else:
+            file.write("startFrom       startTime;               // Simulation beginnt bei startTime\n")
+        file.write(f"startTime       {solverParameters.startTime};                       // Startzeit der Simulation\n")
+        file.write("\n")
+        file.write("// Stoppkriterium für die Simulation\n")
+        file.write("stopAt          endTime;                 // Simulation läuft bis `endTime`\n")
+        if schedule["active"]:
+            if solverParameters.coarseSpinUp:
+                file.write(f"endTime         {schedule['endTime']};                     // Anpassen + Mittelung ({schedule['spinUpFlowThroughs']} + {solverParameters.averagingFlowThroughs} Durchströmzeiten, Einschwingen im groben Case)\n")
+            else:
+                file.write(f"endTime         {schedule['endTime']};                     // Einschwingen + Mittelung ({schedule['spinUpFlowThroughs']} + {solverParameters.averagingFlowThroughs} Durchströmzeiten)\n")
+        else:
+            file.write(f"endTime         {solverParameters.endTime};                     // Endzeitpunkt der Simulation (physikalische Zeit in Sekunden)\n")
+        file.write("\n")
+        file.write("// Zeitschrittgröße\n")
+        if timeStep["mode"] == "fixed":
+            file.write(f"deltaT          {timeStep['deltaT']};                    // Zeitschrittweite Δt = 0.5s (LES erfordert kleine Zeitschritte)\n")
+        else:
+            file.write(f"deltaT          {timeStep['deltaT']};                    // Zeitschrittweite aus {timeStep['driver']} (feinste Zelle)\n")
+        if timeStep["mode"] == "adaptive":
+            file.write("adjustTimeStep  yes;                     // Zeitschritt über die Courant-Zahl anpassen\n")
+            file.write(f"maxCo           {timeStep['maxCo']};                     // max. Courant-Zahl (inkl. Blattspitzen-Kriterium)\n")
+            file.write(f"maxDeltaT       {timeStep['maxDeltaT']};                    // obere Grenze aus CFL und Blattspitzengeschwindigkeit\n")
+        file.write("\n")
+        file.write("// Steuerung der Datenausgabe\n")
+        file.write("writeControl    adjustableRunTime;       // Ausgabe basierend auf dynamischer Simulationszeit\n")
+        if ioPlan["mode"] in ("reduced", "checkpoint"):
+            file.write(f"writeInterval   {ioPlan['writeInterval']};                    // Neustartstände aller Felder, Zeitreihen über writeRegisteredObject ({'checkpointMode' if ioPlan['mode'] == 'checkpoint' else 'diskBudget'})\n")
+        else:
+            file.write(f"writeInterval   {solverParameters.writeInterval};                    // Ausgabeintervall für Ergebnisse (wenn, = endtime, dann keine speicherung der Ergebnisse des gesamten Gebietes)\n")
+        file.write("\n")
+        file.write("// Speicherverwaltung für Ausgabe\n")
+        if ioPlan["keepSnapshots"]:
+            file.write(f"purgeWrite      0;                        // Ältere Neustartstände dünnt utilPruneSnapshots.sh aus (letzte {ioPlan['keepSnapshots']} bleiben)\n")
+        else:
+            file.write("purgeWrite      0;                        // Keine alten Ausgabedateien löschen\n")
+        file.write("writeFormat     binary;                   // Speicherung im binären Format (platzsparend)\n")
+        file.write("writePrecision  6;                        // Genauigkeit der Ausgabedaten (6 Dezimalstellen)\n")
+        file.write("writeCompression off;                     // Keine Komprimierung der Ergebnisse\n")
+        file.write("\n")
+        file.write("// Zeitformat für Ausgabe\n")
+        file.write("timeFormat      general;                  // Ausgabe im allgemeinen Zeitformat\n")
+        file.write("timePrecision   6;                        // Genauigkeit der Zeitausgabe (6 Dezimalstellen)\n")
+        file.write("\n")
+        file.write("// Laufzeitmodifikation\n")
+        file.write("runTimeModifiable yes;                    // Simulationseinstellungen können während der Laufzeit geändert werden\n")
+        file.write("\n")
+        file.write("// Einbindung von dynamischen Bibliotheken für die Simulation\n")
+        file.write("libs (\"libturbinesFoam.so\" \"libatmosphericModels.so\"); // Turbinen- und atmosphärische Modellbibliotheken\n")
+        file.write("\n")
+        file.write("// Funktionen für die Simulation\n")
+        file.write("functions\n")
+        file.write("{\n")
+        if solverParameters.fieldAverage:
+            file.write("   #include \"fieldAverage\"                 // Berechnet Mittelwerte von Strömungsgrößen\n")
+        else:
+            file.write("   //#include \"fieldAverage\"               // Berechnet Mittelwerte von Strömungsgrößen\n")
+        file.write("   //#include \"monitorPoints\"              // Definiert Messpunkte zur Überwachung der Strömung\n")
+        if ioPlan["objects"]:
+            file.write("   #include \"writeRegisteredObject\"        // Speichert registrierte OpenFOAM-Objekte\n")
+        else:
+            file.write("   //#include \"writeRegisteredObject\"      // Speichert registrierte OpenFOAM-Objekte\n")
+        file.write("   //#include \"writeForceAllTurbines\"      // Erfasst Kräfte auf alle Windturbinen\n")
+        if solverParameters.rotorDiscAverage:
+            file.write("   #include \"rotorDiscAverages\"            // Rotorgemittelte Geschwindigkeit je Turbine (volFieldValue)\n")
+        if solverParameters.surfaceSampling:
+            file.write("   #include \"sampleSliceDict\"              // Schnitte in Nabenhöhe, Rotorebene und Nachlauf (surfaces)\n")
+        else:
+            file.write("   //#include \"sampleSliceDict\"            // Schnitte in Nabenhöhe, Rotorebene und Nachlauf (surfaces)\n")
+        file.write("}\n")
+        file.write("\n")
+        file.write("// ************************************************************************* //\n")
+
+    # print(f"controlDict successfully created at: \n{controlDict_path}")
+
+create_controlDict()
+
+# fieldAverage
+#------------------------------------------------
+def write_zone_fieldAverage(fieldAverage_path, timeStart):
+    """
+    Schreibt 'fieldAverage' als coded-Functionobject, das Mittelwerte und prime2Mean von U und p nur für die
+    Zellen der cellZone averageZone hält (statt vier zusätzlicher Felder über das ganze Gebiet).
+
+    Internal Parameter:
+        - averages: (Feld, Typ des Mittelwerts, Typ von prime2Mean, Dimension) für U und p
+        - codeRead: legt die Zonen-Werte an und setzt nach einem Neustart die geschriebenen Mittelwerte fort
+        - codeExecute: zeitgewichtete laufende Mittel von f und f*f (beta = deltaT / gemittelte Zeit)
+        - codeWrite: UMean, UPrime2Mean, pMean, pPrime2Mean als volle volFields (außerhalb der Zone null),
+          nacheinander angelegt, damit höchstens ein volles Feld zusätzlich im Speicher liegt
+    Input:
+        - fieldAverage_path: Pfad zu system/fieldAverage
+        - timeStart: Beginn der Mittelung (aus compute_flow_through_schedule)
+    Output:
+        - Schreibt 'fieldAverage'; die Mittelwerte heißen wie beim Standard-fieldAverage, reconstructPar und
+          foamToVTK in Allpost verarbeiten sie unverändert
+    Usage:
+        - create_fieldAverage, wenn compute_zone_average die Mittelung in der Zone wählt; die cellZone kommt aus
+          write_average_zone_actions
+    """
+    averages = (("U", "vector", "symmTensor", "U.dimensions()"),
+                ("p", "scalar", "scalar", "p.dimensions()"))
+
+    def io(name, read):
+        return (f"IOobject(\"{name}\", mesh().time().timeName(), mesh(), "
+                f"IOobject::{'MUST_READ' if read else 'NO_READ'}, IOobject::NO_WRITE, false)")
+
+    with open(fieldAverage_path, 'w') as file:
+        file.write("fieldAverage\n")
+        file.write("{\n")
+        file.write("// mean and prime2Mean of U and p only in the cellZone averageZone (wake regions and ALM cellSets)\n\n")
+        file.write("    libs            (utilityFunctionObjects);\n")
+        file.write("    type            coded;\n")
+        file.write("    name            zoneFieldAverage;\n")
+        file.write("    writeControl    writeTime;\n")
+        file.write(f"    timeStart       {timeStart};\n\n")
+
+        file.write("    codeData\n")
+        file.write("    #{\n")
+        file.write("        bool initialised_ = false;\n")
+        file.write("        scalar totalTime_ = 0;\n")
+        for field, meanType, prime2Type, dimension in averages:
+            file.write(f"        Field<{meanType}> {field}Mean_;\n")
+            file.write(f"        Field<{prime2Type}> {field}SqrMean_;\n")
+        file.write("    #};\n\n")
+
+        file.write("    codeRead\n")
+        file.write("    #{\n")
+        file.write("        if (!initialised_)\n")
+        file.write("        {\n")
+        file.write("            initialised_ = true;\n")
+        file.write("            const cellZone& zone = mesh().cellZones()[\"averageZone\"];\n")
+        for field, meanType, prime2Type, dimension in averages:
+            file.write(f"            {field}Mean_.setSize(zone.size(), Zero);\n")
+            file.write(f"            {field}SqrMean_.setSize(zone.size(), Zero);\n")
+        file.write("            // continue the averages written before a restart, one full field at a time\n")
+        file.write(f"            if ({io('UMean', True)}.typeHeaderOk<volVectorField>(true))\n")
+        file.write("            {\n")
+        file.write(f"                totalTime_ = mesh().time().value() - {timeStart};\n")
+        for field, meanType, prime2Type, dimension in averages:
+            file.write("                {\n")
+            file.write(f"                    const GeometricField<{meanType}, fvPatchField, volMesh> mean({io(field + 'Mean', True)}, mesh());\n")
+            file.write(f"                    {field}Mean_ = Field<{meanType}>(mean.primitiveField(), zone);\n")
+            file.write("                }\n")
+            file.write("                {\n")
+            file.write(f"                    const GeometricField<{prime2Type}, fvPatchField, volMesh> prime2({io(field + 'Prime2Mean', True)}, mesh());\n")
+            file.write(f"                    {field}SqrMean_ = Field<{prime2Type}>(prime2.primitiveField(), zone) + sqr({field}Mean_);\n")
+            file.write("                }\n")
+        file.write("            }\n")
+        file.write("        }\n")
+        file.write("    #};\n\n")
+
+        file.write("    codeExecute\n")
+        file.write("    #{\n")
+        file.write("        const cellZone& zone = mesh().cellZones()[\"averageZone\"];\n")
+        file.write("        const volVectorField& U = mesh().lookupObject<volVectorField>(\"U\");\n")
+        file.write("        const volScalarField& p = mesh().lookupObject<volScalarField>(\"p\");\n")
+        file.write("        totalTime_ += mesh().time().deltaTValue();\n")
+        file.write("        const scalar beta = mesh().time().deltaTValue() / totalTime_;\n")
+        file.write("        forAll(zone, i)\n")
+        file.write("        {\n")
+        for field, meanType, prime2Type, dimension in averages:
+            file.write(f"            {field}Mean_[i] = (1 - beta) * {field}Mean_[i] + beta * {field}[zone[i]];\n")
+            file.write(f"            {field}SqrMean_[i] = (1 - beta) * {field}SqrMean_[i] + beta * sqr({field}[zone[i]]);\n")
+        file.write("        }\n")
+        file.write("    #};\n\n")
+
+        file.write("    codeWrite\n")
+        file.write("    #{\n")
+        file.write("        // full fields for reconstructPar and foamToVTK, zero outside the zone, one at a time\n")
+        file.write("        const cellZone& zone = mesh().cellZones()[\"averageZone\"];\n")
+        file.write("        const volVectorField& U = mesh().lookupObject<volVectorField>(\"U\");\n")
+        file.write("        const volScalarField& p = mesh().lookupObject<volScalarField>(\"p\");\n")
+        for field, meanType, prime2Type, dimension in averages:
+            file.write("        {\n")
+            file.write(f"            GeometricField<{meanType}, fvPatchField, volMesh> mean({io(field + 'Mean', False)}, mesh(), "
+                       f"dimensioned<{meanType}>({dimension}, Zero));\n")
+            file.write(f"            forAll(zone, i) {{ mean[zone[i]] = {field}Mean_[i]; }}\n")
+            file.write("            mean.write();\n")
+            file.write("        }\n")
+            file.write("        {\n")
+            file.write(f"            GeometricField<{prime2Type}, fvPatchField, volMesh> prime2({io(field + 'Prime2Mean', False)}, mesh(), "
+                       f"dimensioned<{prime2Type}>(sqr({dimension}), Zero));\n")
+            file.write(f"            forAll(zone, i) {{ prime2[zone[i]] = {field}SqrMean_[i] - sqr({field}Mean_[i]); }}\n")
+            file.write("            prime2.write();\n")
+            file.write("        }\n")
+        file.write("    #};\n")
+        file.write("}\n")
+
+def create_fieldAverage():
+    """
+    Erstellt 'fieldAverage' (Mittelwerte und Reynolds-Spannungen von U und p), eingebunden über controlDict.
+
+    Internal Parameter:
+        - schedule: Beginn der Mittelung aus compute_flow_through_schedule (ohne Zeitplan Solver.averageStart)
+        - fieldAverage_path: Pfad zur Ausgabedatei
+    Input:
+        - keine (liest aus compute_flow_through_schedule)
+    Output:
+        - Schreibt 'fieldAverage' in den system-Ordner des Case
+    Usage:
+        - Mittelung erst nach der Einschwingphase; bei Mittelung in der Zone (compute_zone_average) übernimmt
+          write_zone_fieldAverage
+    """
+    schedule = compute_flow_through_schedule()
+    fieldAverage_path = os.path.join(get_case_folder(), "system/fieldAverage")
+    if compute_zone_average()["active"]:
+        write_zone_fieldAverage(fieldAverage_path, schedule['averageStart'])
+        return
+    with open(fieldAverage_path, 'w') as file:
+        file.write("fieldAverage\n")
+        file.write("{\n")
+        file.write("    enabled         true;                          // Aktivierung der Funktion\n")
+        file.write("    type            fieldAverage;                  // Mittelwertbildung von Feldern über die Zeit\n")
+        file.write("    libs            (\"libfieldFunctionObjects.so\"); // Benötigte OpenFOAM-Bibliothek\n")
+        file.write("\n")
+        file.write("    writeControl    writeTime;                     // Ausgabe erfolgt synchron mit den Zeitschritten\n")
+        file.write("    restartOnRestart no;                           // Kein Reset der Mittelwerte bei Neustart\n")
+        file.write(f"    timeStart       {schedule['averageStart']};                          // Beginn der Mittelwertberechnung ab t = {schedule['averageStart']} s\n")
+        file.write("\n")
+        file.write("    fields\n")
+        file.write("    (\n")
+        for field, description in (("U", ("U (Geschwindigkeit)", "u'u' (Reynolds-Spannungen)")),
+                                   ("p", ("p (Druck)", "p'p' (Druckschwankungen)"))):
+            file.write(f"        {field}\n")
+            file.write("        {\n")
+            file.write(f"            mean        on;                         // Berechnung des Mittelwerts von {description[0]}\n")
+            file.write(f"            prime2Mean  on;                         // Berechnung von {description[1]}\n")
+            file.write("            base        time;                       // Zeitliche Mittelung\n")
+            file.write("        }\n")
+            if field == "U":
+                file.write("\n")
+        file.write("    );\n")
+        file.write("}")
+
+    # print(f"fieldAverage successfully created at: \n{fieldAverage_path}")
+
+create_fieldAverage()
+
+# rotorDiscAverages
+#------------------------------------------------
+def create_rotorDiscAverages():
+    """
+    Erstellt 'rotorDiscAverages' mit einem volFieldValue-Functionobject (volAverage von U) je Rotorscheibe.
+
+    Internal Parameter:
+        - discs: cellSets der Scheiben (aus WindTurbines.getRotorDiscs, in topoSetDict.wakeregions/nearwake)
+        - rotorDiscAverages_path: Pfad zu system/rotorDiscAverages
+    Input:
+        - keine (liest aus SolverParameters, WindTurbines)
+    Output:
+        - Schreibt 'system/rotorDiscAverages' (nur bei Solver.rotorDiscAverage), Zeitreihen unter
+          postProcessing/<disc>/<t>/volFieldValue.dat
+    Usage:
+        - In controlDict eingebunden; rotorgemittelte Anströmung und Wake-Verluste je Turbine ohne volle Felder
+    """
+    solverParameters = SolverParameters.getSolverParameters()
+    if not solverParameters.rotorDiscAverage:
+        return
+    rotorDiscAverages_path = os.path.join(get_case_folder(), "system/rotorDiscAverages")
+    with open(rotorDiscAverages_path, 'w') as file:
+        for disc in WindTurbines.getRotorDiscs():
+            file.write(f"{disc['id']}\n")
+            file.write("{\n")
+            file.write("    type            volFieldValue;\n")
+            file.write("    libs            (\"libfieldFunctionObjects.so\");\n")
+            file.write("    writeControl    timeStep;\n")
+            file.write(f"    writeInterval   {solverParameters.discInterval};\n")
+            file.write("    log             false;\n")
+            file.write("    writeFields     false;\n")
+            file.write("    regionType      cellSet;\n")
+            file.write(f"    name            {disc['id']};\n")
+            file.write("    operation       volAverage;\n")
+            file.write("    fields          (U);\n")
+            file.write("}\n\n")
+
+    # print(f"rotorDiscAverages successfully created at: \n{rotorDiscAverages_path}")
+
+create_rotorDiscAverages()
+
+# Konvergenzwächter (utilConvergenceWatchdog.sh)
+#------------------------------------------------
+def create_convergence_watchdog():
+    """
+    Erstellt 'utilConvergenceWatchdog.sh', das während des Laufs die turbinesFoam-Ausgaben
+    (postProcessing/turbines/<Zeit>/<TurbineId>.csv) überwacht und bei statistischer Konvergenz
+    'stopAt writeNow' in controlDict setzt (runTimeModifiable yes übernimmt die Änderung).
+
+    Internal Parameter:
+        - signals: überwachte Spalten je Turbine, cp (Leistung) und cd (Schub)
+        - discs: bei rotorDiscAverage zusätzlich |U| der Rotorscheiben (postProcessing/rotorDisc_<Id>/<Zeit>/volFieldValue.dat)
+        - averageStart: Beginn der Auswertung (wie fieldAverage, aus compute_flow_through_schedule)
+        - earliestStop: averageStart + convergenceMinWindow * Durchströmzeit
+        - Batch-Means-Test: Werte ab averageStart in convergenceBatches gleich große Blöcke,
+          Standardfehler der Blockmittel / |Mittelwert| <= convergenceTolerance für alle Turbinen und Spalten
+    Input:
+        - keine (liest aus SolverParameters, WindTurbines, compute_flow_through_schedule)
+    Output:
+        - Schreibt 'utilConvergenceWatchdog.sh' in den Case-Ordner (nur bei Solver.convergenceStop)
+    Usage:
+        - Wird von Allrun und Allrun.slurm im Hintergrund gestartet, Protokoll in log.convergenceWatchdog
+    """
+    solverParameters = SolverParameters.getSolverParameters()
+    if not solverParameters.convergenceStop:
+        return
+    schedule = compute_flow_through_schedule()
+    earliestStop = schedule["averageStart"] + solverParameters.convergenceMinWindow * schedule["flowThrough"]
+    turbineIds = [turbine['id'] for turbine in WindTurbines.getTurbines()['turbines']]
+    discIds = [disc['id'] for disc in WindTurbines.getRotorDiscs() if disc['id'].startswith("rotorDisc_")] \
+        if solverParameters.rotorDiscAverage else []
+    watchdog_path = os.path.join(get_case_folder(), "utilConvergenceWatchdog.sh")
+    with open(watchdog_path, 'w') as file:
+        file.write("#!/bin/bash\n")
+        file.write("# Dieses Skript überwacht Leistung (cp) und Schub (cd) aller Turbinen aus den turbinesFoam-Ausgaben.\n")
+        file.write("# Ab AVERAGE_START werden die Werte in BATCHES Blöcke geteilt (Batch Means). Ist der relative\n")
+        file.write("# Standardfehler der Blockmittel für alle Turbinen kleiner als TOLERANCE und die Simulationszeit\n")
+        file.write("# mindestens EARLIEST_STOP, wird in system/controlDict 'stopAt writeNow' gesetzt.\n")
+        file.write("# Erzeugt von process_input.py (Solver.convergenceStop), gestartet von Allrun bzw. Allrun.slurm.\n\n")
+        file.write(f"TURBINES=\"{' '.join(turbineIds)}\"\n")
+        file.write("SIGNALS=\"cp cd\"\n")
+        if discIds:
+            file.write(f"DISCS=\"{' '.join(discIds)}\"\n")
+        file.write(f"AVERAGE_START={schedule['averageStart']}\n")
+        file.write(f"EARLIEST_STOP={round(earliestStop, 3)}\n")
+        file.write(f"TOLERANCE={solverParameters.convergenceTolerance}\n")
+        file.write(f"BATCHES={solverParameters.convergenceBatches}\n")
+        file.write(f"CHECK_INTERVAL={solverParameters.convergenceCheckInterval}\n")
+        file.write("CONTROL_DICT=\"system/controlDict\"\n")
+        file.write("LOG=\"log.convergenceWatchdog\"\n\n")
+        file.write("# Ausgabe: ok|open|wait Mittelwert relativerFehler\n")
+        file.write("check_signal() {\n")
+        file.write("    awk -F, -v col=\"$2\" -v t0=\"$AVERAGE_START\" -v tMin=\"$EARLIEST_STOP\" -v nb=\"$BATCHES\" -v tol=\"$TOLERANCE\" '\n")
+        file.write("        NR == 1 { for (i = 1; i <= NF; i++) if ($i == col) c = i; next }\n")
+        file.write("        $1 + 0 >= t0 { n++; v[n] = $c; tEnd = $1 }\n")
+        file.write("        END {\n")
+        file.write("            if (!c || n < 2 * nb || tEnd + 0 < tMin) { print \"wait\"; exit }\n")
+        file.write("            size = int(n / nb); sum = 0\n")
+        file.write("            for (b = 0; b < nb; b++) {\n")
+        file.write("                s = 0\n")
+        file.write("                for (i = b * size + 1; i <= (b + 1) * size; i++) s += v[i]\n")
+        file.write("                m[b] = s / size; sum += m[b]\n")
+        file.write("            }\n")
+        file.write("            mean = sum / nb; var = 0\n")
+        file.write("            for (b = 0; b < nb; b++) var += (m[b] - mean) ^ 2\n")
+        file.write("            se = sqrt(var / (nb - 1) / nb)\n")
+        file.write("            rel = (mean != 0) ? se / (mean < 0 ? -mean : mean) : 1\n")
+        file.write("            printf \"%s %.5g %.3g\\n\", (rel <= tol ? \"ok\" : \"open\"), mean, rel\n")
+        file.write("        }' \"$1\"\n")
+        file.write("}\n\n")
+        file.write("echo \"$(date +%T) watchdog started (tolerance $TOLERANCE, earliest stop t = $EARLIEST_STOP s)\" > \"$LOG\"\n")
+        file.write("while true; do\n")
+        file.write("    sleep \"$CHECK_INTERVAL\"\n")
+        file.write("    converged=1\n")
+        file.write("    for turbine in $TURBINES; do\n")
+        file.write("        # latest time directory (after a restart turbinesFoam writes to a new one)\n")
+        file.write("        csv=$(ls -d postProcessing/turbines/*/\"$turbine\".csv 2>/dev/null | sort -V | tail -n 1)\n")
+        file.write("        if [ -z \"$csv\" ]; then\n")
+        file.write("            converged=0\n")
+        file.write("            continue\n")
+        file.write("        fi\n")
+        file.write("        for signal in $SIGNALS; do\n")
+        file.write("            result=$(check_signal \"$csv\" \"$signal\")\n")
+        file.write("            echo \"$(date +%T) $turbine $signal $result\" >> \"$LOG\"\n")
+        file.write("            [ \"${result%% *}\" = \"ok\" ] || converged=0\n")
+        file.write("        done\n")
+        file.write("    done\n")
+        if discIds:
+            file.write("    # rotor-averaged |U| (volFieldValue writes vectors as (x y z))\n")
+            file.write("    for disc in $DISCS; do\n")
+            file.write("        dat=$(ls -d postProcessing/\"$disc\"/*/volFieldValue.dat 2>/dev/null | sort -V | tail -n 1)\n")
+            file.write("        if [ -z \"$dat\" ]; then\n")
+            file.write("            converged=0\n")
+            file.write("            continue\n")
+            file.write("        fi\n")
+            file.write("        result=$(tr -d '()' < \"$dat\" | awk 'BEGIN { print \"Time,Umag\" } !/^#/ && NF >= 4 { printf \"%s,%.8g\\n\", $1, sqrt($2^2 + $3^2 + $4^2) }' | check_signal - Umag)\n")
+            file.write("        echo \"$(date +%T) $disc Umag $result\" >> \"$LOG\"\n")
+            file.write("        [ \"${result%% *}\" = \"ok\" ] || converged=0\n")
+            file.write("    done\n")
+        file.write("    if [ \"$converged\" -eq 1 ]; then\n")
+        file.write("        sed -i 's/^stopAt .*/stopAt          writeNow;                \\/\\/ Konvergenz erreicht (utilConvergenceWatchdog.sh)/' \"$CONTROL_DICT\"\n")
+        file.write("        echo \"$(date +%T) converged, stopAt writeNow\" >> \"$LOG\"\n")
+        file.write("        exit 0\n")
+        file.write("    fi\n")
+        file.write("done\n")
+
+    # print(f"utilConvergenceWatchdog.sh successfully created at: \n{watchdog_path}")
+
+create_convergence_watchdog()
+
+# Ausdünnen der Neustartstände (utilPruneSnapshots.sh)
+#------------------------------------------------
+def create_snapshot_pruner():
     """
-    Erstellt das SLURM-Skript 'Allrun.slurm' zum Ausführen der Simulation in parallel auf dem HPC.
-    
+    Erstellt 'utilPruneSnapshots.sh', das in den Modi reduced und checkpoint nur die letzten Neustartstände
+    vollständig behält. Ersetzt purgeWrite, das ganze Zeitordner löscht, also auch die outputFields von
+    writeRegisteredObject, wenn beide Intervalle zusammenfallen.
+
     Internal Parameter:
-        - computeCores: Anzahl der zu verwendenden Rechenkernen
-        - allrun_slurm_path: Pfad zur Ausgabedatei
+        - ioPlan: keepSnapshots, objects und objectInterval aus compute_io_plan
+        - Neustartstände: Zeitordner mit uniform/time (writeRegisteredObject schreibt nur seine Felder)
+        - ältere Neustartstände: zu Zeiten von writeRegisteredObject bleiben nur die outputFields, sonst wird
+          der Zeitordner entfernt
     Input:
-        - keine (liest Anzahl der Kerne aus SolverParameters)
+        - keine (liest aus compute_io_plan)
     Output:
-        - Schreibt SLURM-Skript 'Allrun.slurm' in den Case-Ordner
+        - Schreibt 'utilPruneSnapshots.sh' in den Case-Ordner (nur in den Modi reduced und checkpoint)
     Usage:
-        - SLURM-Skript zur Ausführung der Simulation auf dem HPC
+        - Wird von Allrun und Allrun.slurm im Hintergrund gestartet und nach dem Solver einmal mit 'once'
+          aufgerufen, Protokoll in log.pruneSnapshots
     """
-    computeCores = SolverParameters.getSolverParameters().computeCores
-    allrun_slurm_path = os.path.join(get_case_folder(), "Allrun.slurm")
-    with open(allrun_slurm_path, 'w') as file:
-        file.write("#!/bin/bash\n\n")
-        file.write("### SLURM script for running the offshore wind park simulation in parallel\n")
-        file.write("### HLRS, 2024-2025\n\n")
-        file.write("#SBATCH --partition=compute                     ### Partition\n")
-        file.write("#SBATCH --job-name=openfoamsimoffshore          ### Job Name\n")
-        file.write("#SBATCH --time=512:00:00                        ### WallTime\n")
-        file.write("#SBATCH --mem-per-cpu 2G\n")
-        file.write(f"#SBATCH --ntasks {computeCores}\n")
-        file.write("#SBATCH --ntasks-per-core 2\n")
-        file.write("#SBATCH --ntasks-per-node 15\n")
-        file.write("#SBATCH --cpus-per-task 1\n")
-        file.write("#SBATCH --nodes 10\n")
-        file.write("#SBATCH -o slurm.%j.out         # STDOUT\n")
-        file.write("#SBATCH -e slurm.%j.err         # STDERR\n\n")
-        file.write("source /home/hpcschud/.bashrc\n\n")
-        file.write("cd $SLURM_SUBMIT_DIR\n\n")
-        file.write(f"mpirun -np {computeCores} -- pimpleFoam -parallel > log.slurm_pimpleFoam 2>&1\n")
+    ioPlan = compute_io_plan()
+    if not ioPlan["keepSnapshots"]:
+        return
+    pruner_path = os.path.join(get_case_folder(), "utilPruneSnapshots.sh")
+    with open(pruner_path, 'w') as file:
+        file.write("#!/bin/bash\n")
+        file.write("# Dieses Skript behält nur die letzten KEEP Neustartstände (Zeitordner mit uniform/time) vollständig.\n")
+        file.write("# In älteren Ständen bleiben zu Zeiten von writeRegisteredObject die OBJECTS erhalten, sonst wird der\n")
+        file.write("# Zeitordner entfernt. Erzeugt von process_input.py (diskBudget bzw. checkpointMode), gestartet von\n")
+        file.write("# Allrun bzw. Allrun.slurm; 'once' dünnt einmal aus und beendet sich.\n\n")
+        file.write(f"KEEP={ioPlan['keepSnapshots']}\n")
+        file.write(f"OBJECTS=\"{' '.join(ioPlan['objects'])}\"\n")
+        file.write(f"OBJECT_INTERVAL={ioPlan['objectInterval']}\n")
+        file.write("CHECK_INTERVAL=300\n")
+        file.write("LOG=\"log.pruneSnapshots\"\n\n")
+        file.write("prune() {\n")
+        file.write("    DIRS=$(ls -d processor[0-9]* 2>/dev/null)\n")
+        file.write("    [ -n \"$DIRS\" ] || DIRS=.\n")
+        file.write("    for dir in $DIRS; do\n")
+        file.write("        old=$(ls -d \"$dir\"/[0-9]*/uniform/time 2>/dev/null | awk -F/ '{ print $(NF - 2) }' | sort -g | head -n -\"$KEEP\")\n")
+        file.write("        for time in $old; do\n")
+        file.write("            if awk -v t=\"$time\" -v i=\"$OBJECT_INTERVAL\" 'BEGIN { r = t / i - int(t / i + 0.5); exit !(r < 1e-6 && r > -1e-6) }'; then\n")
+        file.write("                for entry in \"$dir/$time\"/*; do\n")
+        file.write("                    case \" $OBJECTS \" in\n")
+        file.write("                        *\" ${entry##*/} \"*) ;;\n")
+        file.write("                        *) rm -rf \"$entry\" ;;\n")
+        file.write("                    esac\n")
+        file.write("                done\n")
+        file.write("            else\n")
+        file.write("                rm -rf \"${dir:?}/$time\"\n")
+        file.write("            fi\n")
+        file.write("            [ \"$dir\" = processor0 ] || [ \"$dir\" = . ] && echo \"$(date +%T) pruned snapshot $time\" >> \"$LOG\"\n")
+        file.write("        done\n")
+        file.write("    done\n")
+        file.write("}\n\n")
+        file.write("if [ \"$1\" = \"once\" ]; then\n")
+        file.write("    prune\n")
+        file.write("    exit 0\n")
+        file.write("fi\n")
+        file.write("while true; do\n")
+        file.write("    sleep \"$CHECK_INTERVAL\"\n")
+        file.write("    prune\n")
+        file.write("done\n")
 
-    # print(f"AllrunSlurm successfully created at: \n{allrun_slurm_path}")
+    # print(f"utilPruneSnapshots.sh successfully created at: \n{pruner_path}")
 
-create_allrun_slurm_script()
+create_snapshot_pruner()
 
-# ------------------------------------------------
-# Allpost.slurm
-# ------------------------------------------------
-def create_allpost_slurm_script():
+# writeRegisteredObject
+#------------------------------------------------
+def create_writeRegisteredObject():
     """
-    Erstellt das SLURM-Skript 'Allpost.slurm' für die Nachbearbeitung der Simulationsergebnisse.
-    
+    Erstellt 'writeRegisteredObject' (writeObjects), das ausgewählte Felder in einem eigenen Intervall schreibt.
+
     Internal Parameter:
-        - allpost_slurm_path: Pfad zur Ausgabedatei
+        - ioPlan: Felder und Intervall aus compute_io_plan (nur im Modus reduced aktiv)
+        - writeRegisteredObject_path: Pfad zur Ausgabedatei
     Input:
-        - keine (liest Zielordner aus get_case_folder)
+        - keine (liest aus compute_io_plan)
     Output:
-        - Schreibt SLURM-Skript 'Allpost.slurm' in den Case-Ordner
+        - Schreibt 'writeRegisteredObject' in den system-Ordner des Case
     Usage:
-        - SLURM-Skript zur Nachbearbeitung der Simulationsergebnisse
+        - Zeitreihen weniger Felder statt voller Ausgaben, wenn diskBudget knapp ist
     """
-    allpost_slurm_path = os.path.join(get_case_folder(), "Allpost.slurm")
+    ioPlan = compute_io_plan()
+    writeRegisteredObject_path = os.path.join(get_case_folder(), "system/writeRegisteredObject")
+    with open(writeRegisteredObject_path, 'w') as file:
+        file.write("writeRegisteredObject\n")
+        file.write("{\n")
+        file.write(f"    enabled             {'true' if ioPlan['objects'] else 'false'};\n")
+        file.write("    type                writeObjects;\n")
+        file.write("    libs                (\"libutilityFunctionObjects.so\");\n")
+        file.write("    writeControl    \tadjustableRunTime;\n")
+        file.write(f"    writeInterval       {ioPlan['objectInterval'] or 10.0};\n")
+        file.write(f"    objects             ({' '.join(ioPlan['objects'] or ['U'])});\n")
+        file.write("}\n")
 
-    with open(allpost_slurm_path, 'w') as file:
-        file.write("#!/bin/bash\n\n")
-        file.write("### SLURM script for post-processing the offshore wind park simulation\n")
-        file.write("### HLRS, 2024-2025\n\n")
-        file.write("#SBATCH --partition=compute                     ### Partition\n")
-        file.write("#SBATCH --job-name=openfoamsimoffshore          ### Job Name\n")
-        file.write("#SBATCH --time=512:00:00                        ### WallTime\n")
-        file.write("#SBATCH --mem-per-cpu 2G\n")
-        file.write("#SBATCH --ntasks 1\n")
-        file.write("#SBATCH --cpus-per-task 1\n")
-        file.write("#SBATCH -o slurm.%j.out         # STDOUT\n")
-        file.write("#SBATCH -e slurm.%j.err         # STDERR\n\n")
-        file.write("source /home/hpcschud/.bashrc\n\n")
-        file.write("cd $SLURM_SUBMIT_DIR\n\n")
-        file.write("runApplication reconstructPar\n")
-        file.write("runApplication foamToVTK\n")
-    # print(f"AllpostSlurm successfully created at: \n{allpost_slurm_path}")
+    # print(f"writeRegisteredObject successfully created at: \n{writeRegisteredObject_path}")
+
+create_writeRegisteredObject()
 
-# controlDict
 #------------------------------------------------
-def create_controlDict():
+# fvSolution
+#------------------------------------------------
+def create_fvSolution():
     """
-    Erstellt die Steuerdatei 'controlDict' für die OpenFOAM-Simulation.
-    
+    Erstellt die Datei 'fvSolution' mit Löser- und PIMPLE-Einstellungen.
+
     Internal Parameter:
-        - solverParameters: SolverParameters-Objekt mit Solver-Einstellungen
-        - controlDict_path: Pfad zur Ausgabedatei
+        - fvSolution_path: Pfad zur Ausgabedatei
+        - settings: Einstellungen aus compute_fvSolution_settings
     Input:
-        - keine (liest aus SolverParameters)
+        - keine (liest aus compute_fvSolution_settings)
     Output:
-        - Schreibt 'controlDict' in den system-Ordner des Case
+        - Schreibt 'fvSolution' in den system-Ordner des Case
     Usage:
-        - Definiert die Steuerparameter für die Simulation
+        - GAMG-Agglomeration passend zur Zellanzahl pro Rank (Solver.fvSolutionPreset scaled)
     """
-    solverParameters = SolverParameters.getSolverParameters()
-    controlDict_path = os.path.join(get_case_folder(), "system/controlDict")
-    with open(controlDict_path, 'w') as file:
+    settings = compute_fvSolution_settings()
+    fvSolution_path = os.path.join(get_case_folder(), "system/fvSolution")
+    with open(fvSolution_path, 'w') as file:
         file.write("/*--------------------------------*- C++ -*----------------------------------*\\\n")
         file.write("| =========                 |                                                 |\n")
-        file.write("| \\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |\n")
-        file.write("|  \\    /   O peration     | Version:  2212                                  |\n")
-        file.write("|   \\  /    A nd           | Website:  www.openfoam.com                      |\n")
-        file.write("|    \\/     M anipulation  |                                                 |\n")
+        file.write("| \\\\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |\n")
+        file.write("|  \\\\    /   O peration     | Version:  v2212                                 |\n")
+        file.write("|   \\\\  /    A nd           | Website:  www.openfoam.com                      |\n")
+        file.write("|    \\\\/     M anipulation  |                                                 |\n")
         file.write("\\*---------------------------------------------------------------------------*/\n")
         file.write("\n")
         file.write("FoamFile\n")
         file.write("{\n")
         file.write("    version     2.0;                    // OpenFOAM-Version\n")
         file.write("    format      ascii;                   // Datei im ASCII-Format\n")
-        file.write("    class       dictionary;              // OpenFOAM-Dictionary\n")
-        file.write("    location    \"system\";                // Speicherort der Datei\n")
-        file.write("    object      controlDict;             // Name des Objekts\n")
+        file.write("    class       dictionary;              // OpenFOAM-Dictionary-Datei\n")
+        file.write("    object      fvSolution;              // Name des Objekts (Löser- und Korrektoreinstellungen)\n")
         file.write("}\n")
         file.write("\n")
         file.write("// ************************************************************************* //\n")
         file.write("\n")
-        file.write("// Anwendung: Definiert den verwendeten OpenFOAM-Solver\n")
-        file.write("application     pimpleFoam;              // PIMPLE-Solver für inkompressible, instationäre Strömung\n")
-        file.write("\n")
-        file.write("// Startoptionen der Simulation\n")
-        file.write("startFrom       startTime;               // Simulation beginnt bei startTime\n")
-        file.write(f"startTime       {solverParameters.startTime};                       // Startzeit der Simulation\n")
-        file.write("\n")
-        file.write("// Stoppkriterium für die Simulation\n")
-        file.write("stopAt          endTime;                 // Simulation läuft bis `endTime`\n")
-        file.write(f"endTime         {solverParameters.endTime};                     // Endzeitpunkt der Simulation (physikalische Zeit in Sekunden)\n")
-        file.write("\n")
-        file.write("// Zeitschrittgröße\n")
-        file.write(f"deltaT          {solverParameters.deltaT};                    // Zeitschrittweite Δt = 0.5s (LES erfordert kleine Zeitschritte)\n")
-        file.write("\n")
-        file.write("// Steuerung der Datenausgabe\n")
-        file.write("writeControl    adjustableRunTime;       // Ausgabe basierend auf dynamischer Simulationszeit\n")
-        file.write(f"writeInterval   {solverParameters.writeInterval};                    // Ausgabeintervall für Ergebnisse (wenn, = endtime, dann keine speicherung der Ergebnisse des gesamten Gebietes)\n")
+        file.write("// Definition der numerischen Löser für verschiedene Felder\n")
+        file.write("solvers\n")
+        file.write("{\n")
+        file.write("    // Druckfeld-Löser p\n")
+        file.write("    p\n")
+        file.write("    {\n")
+        file.write("        solver          GAMG;             // Generalized Algebraic Multigrid (GAMG)\n")
+        file.write("        tolerance       0;                // Absoluter Toleranzwert für Konvergenz (hier deaktiviert)\n")
+        file.write("        relTol          0.05;             // Relative Toleranz (Konvergenzkriterium)\n")
+        file.write("        smoother        GaussSeidel;      // Glättungsalgorithmus: Gauss-Seidel\n")
+        file.write("        cacheAgglomeration true;          // Agglomeration aktiv für bessere Konvergenz\n")
+        file.write(f"        nCellsInCoarsestLevel {str(settings['nCellsInCoarsestLevel']) + ';':<12}// Minimale Zellanzahl auf der grobsten Ebene\n")
+        file.write("        agglomerator    faceAreaPair;     // Methode zur Zellagglomeration (Flächenpaare)\n")
+        file.write(f"        mergeLevels     {str(settings['mergeLevels']) + ';':<18}// Anzahl der Zusammenführungslevel\n")
+        if settings["processorAgglomerator"]:
+            file.write(f"        processorAgglomerator {settings['processorAgglomerator']};  // Grobe Ebenen auf wenigen Ranks zusammenfassen\n")
+        file.write("    }\n")
         file.write("\n")
-        file.write("// Speicherverwaltung für Ausgabe\n")
-        file.write("purgeWrite      0;                        // Keine alten Ausgabedateien löschen\n")
-        file.write("writeFormat     binary;                   // Speicherung im binären Format (platzsparend)\n")
-        file.write("writePrecision  6;                        // Genauigkeit der Ausgabedaten (6 Dezimalstellen)\n")
-        file.write("writeCompression off;                     // Keine Komprimierung der Ergebnisse\n")
+        file.write("    // Endkorrektur-Löser für Druck (Final)\n")
+        file.write("    pFinal\n")
+        file.write("    {\n")
+        file.write("        $p;                               // Übernimmt die Parameter von `p`\n")
+        file.write("        smoother        DICGaussSeidel;   // Diskrete Inkompressible Korrektur (DIC) mit Gauss-Seidel\n")
+        file.write("        tolerance       1e-06;            // Höhere absolute Toleranz für finale Iteration\n")
+        file.write("        relTol          0.01;             // Niedrigere relative Toleranz für finale Konvergenz\n")
+        file.write("    }\n")
         file.write("\n")
-        file.write("// Zeitformat für Ausgabe\n")
-        file.write("timeFormat      general;                  // Ausgabe im allgemeinen Zeitformat\n")
-        file.write("timePrecision   6;                        // Genauigkeit der Zeitausgabe (6 Dezimalstellen)\n")
+        file.write("    // Geschwindigkeits- und Turbulenzfeld-Löser für U, k, und ν~\n")
+        file.write("    \"(U|k|nuTilda)\"\n")
+        file.write("    {\n")
+        file.write("        //solver          PBiCGStab;      // Alternative: Prä-konditionierter BiCG-Stab-Löser\n")
+        file.write("        //preconditioner  DILU;           // Diagonale inkomplette LU-Zerlegung\n")
+        file.write("        solver          smoothSolver;     // Glättungsbasierter iterativer Löser\n")
+        file.write("        smoother        symGaussSeidel;   // Symmetrisches Gauss-Seidel-Verfahren\n")
+        file.write("        tolerance       1e-08;            // Sehr niedrige absolute Toleranz für hohe Genauigkeit\n")
+        file.write("        relTol          0.1;              // Relative Toleranz\n")
+        file.write("        maxIter         5;                // Maximale Iterationen pro Zeitschritt\n")
+        file.write("    }\n")
         file.write("\n")
-        file.write("// Laufzeitmodifikation\n")
-        file.write("runTimeModifiable yes;                    // Simulationseinstellungen können während der Laufzeit geändert werden\n")
+        file.write("    // Endkorrektur-Löser für U, k und ν~\n")
+        file.write("    \"(U|k|nuTilda)Final\"\n")
+        file.write("    {\n")
+        file.write("        $U;                               // Übernimmt die Parameter von `(U|k|nuTilda)`\n")
+        file.write("        tolerance       1e-08;            // Sehr geringe absolute Toleranz\n")
+        file.write("        relTol          0.05;             // Genauere relative Toleranz in der finalen Iteration\n")
+        file.write("    }\n")
+        file.write("}\n")
         file.write("\n")
-        file.write("// Einbindung von dynamischen Bibliotheken für die Simulation\n")
-        file.write("libs (\"libturbinesFoam.so\" \"libatmosphericModels.so\"); // Turbinen- und atmosphärische Modellbibliotheken\n")
+        file.write("// ************************************************************************* //\n")
         file.write("\n")
-        file.write("// Funktionen für die Simulation\n")
-        file.write("functions\n")
+        file.write("// PIMPLE-Korrektoreinstellungen für die Druck-Geschwindigkeits-Kopplung\n")
+        file.write("PIMPLE\n")
         file.write("{\n")
-        file.write("   //#include \"fieldAverage\"               // Berechnet Mittelwerte von Strömungsgrößen\n")
-        file.write("   //#include \"monitorPoints\"              // Definiert Messpunkte zur Überwachung der Strömung\n")
-        file.write("   //#include \"writeRegisteredObject\"      // Speichert registrierte OpenFOAM-Objekte\n")
-        file.write("   //#include \"writeForceAllTurbines\"      // Erfasst Kräfte auf alle Windturbinen\n")
-        file.write("   #include \"sampleSliceDict\"       // (Deaktiviert) Mögliche Extraktion von Querschnitten\n")
+        file.write(f"    nOuterCorrectors {str(settings['nOuterCorrectors']) + ';':<21}// Anzahl äußerer Korrekturen (für PIMPLE)\n")
+        file.write(f"    nCorrectors     {str(settings['nCorrectors']) + ';':<22}// Anzahl der inneren Druckkorrekturen\n")
+        file.write(f"    nNonOrthogonalCorrectors {str(settings['nNonOrthogonalCorrectors']) + ';':<14}// Korrekturen für nicht-orthogonale Netze (0 für gut ausgerichtete Netze)\n")
+        if settings["pRefPoint"]:
+            # rotation invariant point below the top of the domain (centre of the domain is always 0 0)
+            file.write(f"    pRefPoint       ({settings['pRefPoint'][0]} {settings['pRefPoint'][1]} {settings['pRefPoint'][2]});  // Referenzpunkt für Druck (oben, Gebietsmitte)\n")
+        else:
+            file.write(f"    pRefCell        {str(settings['pRefCell']) + ';':<23}// Referenzzelle für Druck (Vermeidung von Singularitäten)\n")
+        file.write("    pRefValue       0;                     // Referenzwert für Druck\n")
         file.write("}\n")
         file.write("\n")
-        file.write("// ************************************************************************* //\n")
+        file.write("// ************************************************************************* //")
 
-    # print(f"controlDict successfully created at: \n{controlDict_path}")
+    # print(f"fvSolution successfully created at: \n{fvSolution_path}")
 
-create_controlDict()
+create_fvSolution()
 
 #------------------------------------------------
 # decomposeParDict
@@ -2174,8 +5107,11 @@ def create_decomposeParDict():
     Internal Parameter:
         - solverParameters: SolverParameters-Objekt mit Solver-Einstellungen
         - decomposeParDict_path: Pfad zur Ausgabedatei
+        - nx, ny, nz: Zerlegung des Grundgitters (aus compute_mesh_parameters)
+        - transform: Koordinatensystem der geometrischen Zerlegung, um rotation_angle gedreht,
+          damit n und die Scheiben im Mesh-KOS (vor transformPoints) gelten
     Input:
-        - keine (liest Anzahl der Kerne aus SolverParameters)
+        - keine (liest Anzahl der Kerne, decompositionMethod und weightedDecomposition aus SolverParameters)
     Output:
         - Schreibt 'decomposeParDict' in den system-Ordner des Case
     Usage:
@@ -2183,6 +5119,21 @@ def create_decomposeParDict():
     """
     solverParameters = SolverParameters.getSolverParameters()
     decomposeParDict_path = os.path.join(get_case_folder(), "system/decomposeParDict")
+    nx, ny, nz = compute_mesh_parameters()["decomposition"]
+    simulationArea = SimulationArea.getSimulationArea()
+
+    def write_transform(ind):
+        # decomposePar runs after transformPoints, the lattice axes are rotated by rotation_angle
+        file.write(f"{ind}transform\n")
+        file.write(f"{ind}{{\n")
+        file.write(f"{ind}    origin          (0 0 0);\n")
+        file.write(f"{ind}    rotation\n")
+        file.write(f"{ind}    {{\n")
+        file.write(f"{ind}        type            axes;\n")
+        file.write(f"{ind}        e1              ({simulationArea.cos_rotation:.12g} {simulationArea.sin_rotation:.12g} 0);\n")
+        file.write(f"{ind}        e3              (0 0 1);\n")
+        file.write(f"{ind}    }}\n")
+        file.write(f"{ind}}}\n")
 
     with open(decomposeParDict_path, 'w') as file:
         file.write("/*--------------------------------*- C++ -*----------------------------------*\\\n")
@@ -2203,15 +5154,51 @@ def create_decomposeParDict():
         file.write("\n")
         file.write(f"numberOfSubdomains {solverParameters.computeCores};\n")
         file.write("\n")
-        file.write("method          scotch;\n\n")
+        if solverParameters.weightedDecomposition:
+            # per-cell load (ALM cellSets weighted, see setFieldsDict.cellWeights)
+            file.write("weightField     cellWeights;\n")
+            file.write("\n")
+        if solverParameters.decompositionMethod == "hierarchical":
+            # near-cubic subdomains on the base lattice (see compute_decomposition)
+            file.write("method          hierarchical;\n\n")
+            file.write("hierarchicalCoeffs\n")
+            file.write("{\n")
+            file.write(f"    n               ({nx} {ny} {nz});\n")
+            file.write("    order           xyz;\n")
+            write_transform("    ")
+            file.write("}\n")
+        elif solverParameters.decompositionMethod == "multiLevel":
+            # level0: slabs along the main flow direction, level1: scotch inside each slab
+            file.write("method          multiLevel;\n\n")
+            file.write("multiLevelCoeffs\n")
+            file.write("{\n")
+            file.write("    level0\n")
+            file.write("    {\n")
+            file.write(f"        numberOfSubdomains {nx};\n")
+            file.write("        method          hierarchical;\n")
+            file.write("        coeffs\n")
+            file.write("        {\n")
+            file.write(f"            n               ({nx} 1 1);\n")
+            file.write("            order           xyz;\n")
+            write_transform("            ")
+            file.write("        }\n")
+            file.write("    }\n")
+            file.write("    level1\n")
+            file.write("    {\n")
+            file.write(f"        numberOfSubdomains {ny * nz};\n")
+            file.write("        method          scotch;\n")
+            file.write("    }\n")
+            file.write("}\n")
+        else:
+            file.write("method          scotch;\n\n")
 
-        file.write("//method          multiLevel;\n")
-        file.write("\n")
-        file.write("//multiLevelCoeffs\n")
-        file.write("//{\n")
-        file.write("//    method scotch;\n")
-        file.write("//    domains (2 64);\n")
-        file.write("//}\n")
+            file.write("//method          multiLevel;\n")
+            file.write("\n")
+            file.write("//multiLevelCoeffs\n")
+            file.write("//{\n")
+            file.write("//    method scotch;\n")
+            file.write("//    domains (2 64);\n")
+            file.write("//}\n")
         file.write("\n")
         file.write("// ************************************************************************* //\n")
 
@@ -2230,11 +5217,10 @@ def create_fvOptions():
     Internal Parameter:
         - fvOptions_path: Pfad zur Ausgabedatei
         - simulation_area: SimulationArea-Objekt mit Simulationsbereich
-        - wakeRegions: Liste der Wake-Regionen
         - turbine_data: WindTurbines-Objekt mit Turbineninformationen
         - turbine_blocks: Generierter Block für jede Turbine
     Input:
-        - keine (liest aus SimulationArea, WakeRegion, WindTurbines)
+        - keine (liest aus SimulationArea, WindTurbines)
     Output:
         - Schreibt 'fvOptions' in den constant-Ordner des Case
     Usage:
@@ -2244,20 +5230,7 @@ def create_fvOptions():
     fvOptions_path = os.path.join(get_case_folder(), "constant/fvOptions")
     simulation_area = SimulationArea.getSimulationArea()
     center_x, center_y = simulation_area.center[0], simulation_area.center[1]
-    
-    wakeRegions = WakeRegion.getSubdividedWakeRegions()
-
-    def shift_polygons_coordinates(polygons, cx, cy):
-        """
-        Shift all coordinates in a list of polygons by a given offset.
-        """
-        for polygon in polygons:
-            polygon["coordinates"] = [(x - cx, y - cy) for (x, y) in polygon["coordinates"]]
-            cx_old, cy_old, cz = polygon["center"]
-            polygon["center"] = [cx_old - cx, cy_old - cy, cz]
-        return polygons
 
-    wakeRegions_shifted = shift_polygons_coordinates(wakeRegions, center_x, center_y)
 
     def shift_points_coordinates(points, cx, cy):
         """
@@ -2304,7 +5277,7 @@ def create_fvOptions():
     hub = turbine_data['fvOptions']['hubCheckbox']
 
     turbine_blocks = ""
-    # Iterate over each turbine and assign wake region if the turbine lies within one.
+    # Iterate over each turbine, each one gets its own compact ALM cellSet (topoSetDict.wakeregions).
     for turbine in turbine_data_shifted['turbines']:
         turbine_name = turbine['id']
         turbine_type = turbine['turbineType']
@@ -2314,13 +5287,11 @@ def create_fvOptions():
         tipSpeedRatio = turbine['tipSpeedRatio']
         elements = turbine_type.split('_')[-1]
         type = turbine_type.split('_')[0]
+        # element count and (possibly resampled) element tables
+        nElements, elementSet = compute_blade_elements(turbine)
 
-        # Determine the cellSet for this turbine's fvOptions by checking each shifted wake region.
-        cellset = 'None'
-        for wakeR in wakeRegions_shifted:
-            if point_in_poly(x, y, wakeR):
-                cellset = wakeR['id']
-                break
+        # ALM cost scales with the rotor size, not with the size of the (clustered) wake region
+        cellset = f"ALM_{turbine_name}"
 
         turbine_block = f"""{turbine_name}
 {{
@@ -2370,14 +5341,14 @@ def create_fvOptions():
             {{
                 writePerf           true;
                 writeElementPerf    true;
-                nElements           17;
+                nElements           {nElements};
                 elementProfiles
                 (
-                    #include "{type}_Blade/{type}_{elements}_elementProfiles"
+                    #include "{type}_Blade/{type}_{elementSet}_elementProfiles"
                 );
                 elementData
                 (
-                    #include "{type}_Blade/{type}_{elements}_elementData"
+                    #include "{type}_Blade/{type}_{elementSet}_elementData"
                 );
                 collectivePitch     0.0;
             }}
@@ -2495,6 +5466,92 @@ def create_fvOptions():
 
 create_fvOptions()
 
+#------------------------------------------------
+# cellWeights (weighted decomposition)
+#------------------------------------------------
+def create_cellWeights():
+    """
+    Erstellt das Gewichtsfeld 'cellWeights' und das setFieldsDict, das die ALM-cellSets mit ihrem Kostenfaktor markiert.
+
+    Internal Parameter:
+        - cellWeights_path: Pfad zum Feld im 0.orig-Ordner
+        - setFieldsDict_path: Pfad zu system/setFieldsDict.cellWeights
+        - weights: Gewicht je Turbine (aus compute_load_balance)
+    Input:
+        - keine (liest aus SolverParameters, compute_load_balance)
+    Output:
+        - Schreibt '0.orig/cellWeights' und 'system/setFieldsDict.cellWeights' (nur bei Solver.weightedDecomposition)
+    Usage:
+        - Allpre setzt die Gewichte mit setFields, decomposePar liest sie über weightField
+    """
+    if not SolverParameters.getSolverParameters().weightedDecomposition:
+        return
+    weights = compute_load_balance()["weights"]
+    cellWeights_path = os.path.join(get_case_folder(), "0.orig/cellWeights")
+    with open(cellWeights_path, 'w') as file:
+        file.write("/*--------------------------------*- C++ -*----------------------------------*\\\n")
+        file.write("| =========                 |                                                 |\n")
+        file.write("| \\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |\n")
+        file.write("|  \\    /   O peration     | Version:  2212                                  |\n")
+        file.write("|   \\  /    A nd           | Website:  www.openfoam.com                      |\n")
+        file.write("|    \\/     M anipulation  |                                                 |\n")
+        file.write("\\*---------------------------------------------------------------------------*/\n")
+        file.write("FoamFile\n")
+        file.write("{\n")
+        file.write("    version     2.0;\n")
+        file.write("    format      ascii;\n")
+        file.write("    class       volScalarField;\n")
+        file.write("    location    \"0\";\n")
+        file.write("    object      cellWeights;\n")
+        file.write("}\n")
+        file.write("// ************************************************************************* //\n")
+        file.write("\n")
+        file.write("dimensions      [ 0 0 0 0 0 0 0 ];\n")
+        file.write("internalField   uniform 1;\n")
+        file.write("boundaryField\n")
+        file.write("{\n")
+        file.write("    #includeEtc \"caseDicts/setConstraintTypes\"\n")
+        file.write("    \".*\"\n")
+        file.write("    {\n")
+        file.write("        type            calculated;\n")
+        file.write("        value           uniform 1;\n")
+        file.write("    }\n")
+        file.write("}\n")
+        file.write("// ************************************************************************* //\n")
+
+    setFieldsDict_path = os.path.join(get_case_folder(), "system/setFieldsDict.cellWeights")
+    with open(setFieldsDict_path, 'w') as file:
+        file.write("/*--------------------------------*- C++ -*----------------------------------*\\\n")
+        file.write("| =========                 |                                                 |\n")
+        file.write("| \\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |\n")
+        file.write("|  \\    /   O peration     | Version:  v2212                                 |\n")
+        file.write("|   \\  /    A nd           | Website:  www.openfoam.com                      |\n")
+        file.write("|    \\/     M anipulation  |                                                 |\n")
+        file.write("\\*---------------------------------------------------------------------------*/\n")
+        file.write("FoamFile\n{\n")
+        file.write("    version     2.0;\n")
+        file.write("    format      ascii;\n")
+        file.write("    class       dictionary;\n")
+        file.write("    location    \"system\";\n")
+        file.write("    object      setFieldsDict;\n")
+        file.write("}\n\n")
+        file.write("// ************************************************************************* //\n")
+        file.write("defaultFieldValues\n(\n")
+        file.write("    volScalarFieldValue cellWeights 1\n")
+        file.write(");\n\n")
+        file.write("regions\n(\n")
+        # ALM cellSets from topoSetDict.wakeregions / nearwake
+        for turbine, weight in weights.items():
+            file.write("    cellToCell\n")
+            file.write("    {\n")
+            file.write(f"        set ALM_{turbine};\n")
+            file.write(f"        fieldValues ( volScalarFieldValue cellWeights {weight} );\n")
+            file.write("    }\n")
+        file.write(");\n")
+        file.write("// ************************************************************************* //\n")
+
+create_cellWeights()
+
 #------------------------------------------------
 # monitorPoints
 #------------------------------------------------
@@ -2616,71 +5673,198 @@ create_writeForceAllTurbines()
 #------------------------------------------------
 # sampleSlice
 #------------------------------------------------
-#TODO: make it work for openFOAM (needs to be aktivated in controlDict)
 def create_sampleSlice():
     """
-    Erstellt die sampleSliceDict-Datei für die Extraktion von Querschnitten in der Simulation.
-    
+    Erstellt 'sampleSliceDict' mit einem surfaces-Functionobject (in controlDict eingebunden) für Schnitte
+    in Nabenhöhe sowie Rotorebene, Querschnitte und Längsschnitte je Turbine.
+
     Internal Parameter:
-        - turbines: WindTurbines-Objekt mit Turbineninformationen
-        - hubHeight: Hubhöhe der Turbinen
+        - frames: Nabe, Nachlauf- und Querrichtung je Turbine (aus get_turbine_frames)
+        - hubHeights: verschiedene Nabenhöhen, je eine horizontale Ebene über das ganze Gebiet
+        - distances: Rotorebene (0) und Solver.sampleDistances in Rotordurchmessern, Querschnitte hinter
+          dem Gebietsende entfallen
+        - half: halbe Kantenlänge der bounds um Rotor und Querschnitte (1.5 * rotorRadius)
+        - zTop: Obergrenze der Längsschnitte (Nabe + 2 * rotorRadius, wie refine3)
         - sampleSlice_path: Pfad zur Ausgabedatei
     Input:
-        - keine (liest aus WindTurbines)
+        - keine (liest aus SolverParameters, get_turbine_frames, compute_mesh_parameters)
     Output:
         - Schreibt 'sampleSliceDict' in den system-Ordner des Case
     Usage:
-        - Definiert die Querschnitts-Einstellungen für die Ergebnisanalyse
+        - Ergebnisse als kompakte Schnitte (sampleFormat, vtk binär) im eigenen Intervall sampleInterval,
+          volle Felder (ioPlan) können dann weitgehend entfallen
     """
-    turbines = WindTurbines.getTurbines()
-    hubHeight = turbines['turbines'][0]['hubHeight']
+    solverParameters = SolverParameters.getSolverParameters()
+    meshParams = compute_mesh_parameters()
+    frames = get_turbine_frames()
+    extent = meshParams['xDepth'] + meshParams['yWidth']
     sampleSlice_path = os.path.join(get_case_folder(), "system/sampleSliceDict")
 
+    def vector(v):
+        return f"({round(v[0], 3)} {round(v[1], 3)} {round(v[2], 3)})"
+
+    def write_plane(file, name, point, normal, bounds=None):
+        file.write(f"        {name}\n")
+        file.write("        {\n")
+        file.write("            type        cuttingPlane;\n")
+        file.write(f"            point       {vector(point)};\n")
+        file.write(f"            normal      {vector(normal)};\n")
+        if bounds:
+            file.write(f"            bounds      {vector(bounds[0])} {vector(bounds[1])};\n")
+        file.write("            interpolate true;\n")
+        file.write("        }\n")
+
     with open(sampleSlice_path, 'w') as file:
-        file.write("/*--------------------------------*- C++ -*----------------------------------*\\\n")
-        file.write("| =========                 |                                                 |\n")
-        file.write("| \\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |\n")
-        file.write("|  \\    /   O peration     | Version:  v2212                                 |\n")
-        file.write("|   \\  /    A nd           | Website:  www.openfoam.com                      |\n")
-        file.write("|    \\/     M anipulation  |                                                 |\n")
-        file.write("\\*---------------------------------------------------------------------------*/\n")
-        file.write("FoamFile\n{\n")
-        file.write("    version     2.0;\n")
-        file.write("    format      ascii;\n")
-        file.write("    class       dictionary;\n")
-        file.write("    location    \"system\";\n")
-        file.write("    object      sampleSlice;\n")
-        file.write("}\n\n")
-        
-        file.write("// ************************************************************************* //\n")
-        file.write("\n")
-        file.write("interpolationScheme cellPoint;\n")
-        file.write("\n")
-        file.write("setFormat vtk;\n")
-        file.write("\n")
-        file.write("sets\n")
-        file.write("(\n")
-        file.write("    hubSlice\n")
+        file.write("sampleSlice\n")
+        file.write("{\n")
+        file.write("    type            surfaces;\n")
+        file.write("    libs            (\"libsampling.so\");\n")
+        file.write(f"    enabled         {'true' if solverParameters.surfaceSampling else 'false'};\n")
+        file.write("    writeControl    adjustableRunTime;\n")
+        file.write(f"    writeInterval   {solverParameters.sampleInterval};\n")
+        file.write(f"    surfaceFormat   {solverParameters.sampleFormat};\n")
+        file.write("    formatOptions\n")
         file.write("    {\n")
-        file.write("        type        cuttingPlane;\n")
-        file.write("        planeType   pointAndNormal;\n")
-        file.write("        pointAndNormalDict\n")
+        file.write("        vtk\n")
         file.write("        {\n")
-        file.write(f"            basePoint   (0 0 {hubHeight});\n")
-        file.write("            normalVector (0 0 1);\n")
+        file.write("            format      binary;\n")
         file.write("        }\n")
-        file.write("        interpolate true;\n")
-        file.write("        fields      (U p);\n")
         file.write("    }\n")
-        file.write(");\n")
+        file.write("    interpolationScheme cellPoint;\n")
+        file.write(f"    fields          ({' '.join(solverParameters.sampleFields)});\n")
         file.write("\n")
-        file.write("// ************************************************************************* //\n")
+        file.write("    surfaces\n")
+        file.write("    {\n")
+        for hubHeight in sorted(set(frame['hubHeight'] for frame in frames)):
+            write_plane(file, f"hubHeight_{str(hubHeight).replace('.', 'p')}", (0, 0, hubHeight), (0, 0, 1))
+        for frame in frames:
+            radius = frame['rotorRadius']
+            half = 1.5 * radius
+            origin, downstream = frame['origin'], frame['downstream']
+            for distance in [0] + list(solverParameters.sampleDistances):
+                # wake points to -x in the mesh, skip sections behind the outlet
+                if frame['mesh'][0] - distance * 2 * radius <= meshParams['xMin']:
+                    continue
+                point = tuple(origin[i] + distance * 2 * radius * downstream[i] for i in range(3))
+                bounds = ((point[0] - half, point[1] - half, max(0, point[2] - half)),
+                          (point[0] + half, point[1] + half, point[2] + half))
+                name = f"{frame['id']}_rotor" if distance == 0 else f"{frame['id']}_{distance}D"
+                write_plane(file, name, point, downstream, bounds)
+            zTop = frame['hubHeight'] + 2 * radius
+            write_plane(file, f"{frame['id']}_streamwise", origin, frame['lateral'],
+                        ((origin[0] - extent, origin[1] - extent, 0), (origin[0] + extent, origin[1] + extent, zTop)))
+        file.write("    }\n")
+        file.write("}\n")
 
     # print(f"sampleSlice successfully created at: \n{sampleSlice_path}")
 
 # Call the function
 create_sampleSlice()
 
+#------------------------------------------------
+# Spin-up-Case (grob) und Allsubmit
+#------------------------------------------------
+def create_spinup_case():
+    """
+    Erzeugt bei Solver.coarseSpinUp den groben Begleit-Case 'spinUp/' (gleiches Gebiet, spinUpCoarsening
+    Verfeinerungsstufen weniger) für die Einschwingphase und das Skript 'Allsubmit', das beide Läufe
+    mit SLURM-Abhängigkeit einreicht.
+
+    Internal Parameter:
+        - plan: Kernzahl, Zeitschritt und endTime des groben Case (aus compute_spinup_plan)
+        - ignore: statische Vorlagen werden kopiert, Meshes, Zeitordner, Logs und Prozessor-Ordner nicht
+        - spinUp_data: Simulationsdaten mit mesh.skipRefinementLevels, Ausgabe nur am Ende, ohne
+          Mittelung, Zeitplan, Konvergenzwächter, Checkpoints und Schnitte
+    Input:
+        - keine (liest aus get_simulation_data, SolverParameters, compute_spinup_plan)
+    Output:
+        - Schreibt 'spinUp/' (über einen zweiten Aufruf von process_input.py mit spinUp/simulation_parameters.json)
+          und 'Allsubmit' in den Case-Ordner
+    Usage:
+        - Allpre bereitet beide Meshes vor, Allrun.slurm des feinen Case übernimmt die Felder beim ersten Start mit
+          mapFieldsPar (bei abweichender Kernzahl vorher über spinUp/system/decomposeParDict.map neu zerlegt)
+    """
+    solverParameters = SolverParameters.getSolverParameters()
+    if not solverParameters.coarseSpinUp:
+        return
+    plan = compute_spinup_plan()
+    case_path = get_case_folder()
+    spinUp_path = os.path.join(case_path, "spinUp")
+    skipNames = {"spinUp", "VTK", "postProcessing", "polyMesh", MeshSettings.getMeshSettings().meshCacheDir, "Allsubmit",
+                 "Allrun.restart.slurm", "Allredistribute.slurm", "memoryCalibration.json", "costCalibration.json"}
+
+    def ignore(directory, names):
+        return [name for name in names if name in skipNames or name.startswith(("processor", "log.", "slurm."))
+                or (directory == case_path and name.replace(".", "", 1).isdigit())]
+
+    shutil.copytree(case_path, spinUp_path, ignore=ignore, dirs_exist_ok=True)
+
+    spinUp_data = copy.deepcopy(get_simulation_data())
+    spinUp_data["rootFolder"] = os.path.join(spinUp_data["rootFolder"].strip("'\""), "spinUp")
+    spinUp_data.setdefault("mesh", {}).update({"skipRefinementLevels": solverParameters.spinUpCoarsening, "meshCache": False})
+    spinUp_data["Solver"].update({
+        "endTime": plan["endTime"],
+        "writeInterval": plan["endTime"],
+        "deltaT": plan["deltaT"],
+        "timeStepMode": "fixed",
+        "computeCores": plan["cores"],
+        "fieldAverage": False,
+        "flowThroughSchedule": False,
+        "convergenceStop": False,
+        "checkpointMode": False,
+        "diskBudget": 0,
+        "previousCores": 0,
+        "coarseSpinUp": False,
+        "surfaceSampling": False,
+        "rotorDiscAverage": False,
+    })
+    spinUpJson_path = os.path.join(spinUp_path, "simulation_parameters.json")
+    with open(spinUpJson_path, 'w') as file:
+        json.dump(spinUp_data, file, indent=2)
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), spinUpJson_path], capture_output=True, text=True)
+    if result.returncode != 0:
+        print(result.stdout + result.stderr)
+        print("Fehler: Spin-up-Case konnte nicht erzeugt werden!")
+        sys.exit(1)
+    if plan["cores"] != solverParameters.computeCores:
+        # the last spin-up state is decomposed onto the ranks of the fine run for mapFieldsPar
+        decomposeParDictMap_path = os.path.join(spinUp_path, "system/decomposeParDict.map")
+        with open(decomposeParDictMap_path, 'w') as file:
+            file.write("/*--------------------------------*- C++ -*----------------------------------*\\\n")
+            file.write("| =========                 |                                                 |\n")
+            file.write("| \\      /  F ield         | OpenFOAM: The Open Source CFD Toolbox           |\n")
+            file.write("|  \\    /   O peration     | Version:  v2212                                 |\n")
+            file.write("|   \\  /    A nd           | Website:  www.openfoam.com                      |\n")
+            file.write("|    \\/     M anipulation  |                                                 |\n")
+            file.write("\\*---------------------------------------------------------------------------*/\n")
+            file.write("FoamFile\n")
+            file.write("{\n")
+            file.write("    version     2.0;\n")
+            file.write("    format      ascii;\n")
+            file.write("    class       dictionary;\n")
+            file.write("    object      decomposeParDict;\n")
+            file.write("}\n")
+            file.write("// * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * //\n")
+            file.write("\n")
+            file.write(f"numberOfSubdomains {solverParameters.computeCores};\n")
+            file.write("\n")
+            file.write("method          scotch;\n")
+            file.write("\n")
+            file.write("// ************************************************************************* //\n")
+
+    allsubmit_path = os.path.join(case_path, "Allsubmit")
+    with open(allsubmit_path, 'w') as file:
+        file.write("#!/bin/sh\n\n")
+        file.write("### Script for submitting the coarse spin-up and the fine run of the offshore wind park simulation\n")
+        file.write("### HLRS, 2024-2025\n\n")
+        file.write("SPINUP=$(cd spinUp && sbatch --parsable Allrun.slurm) || exit 1\n")
+        file.write("echo \"spin-up job $SPINUP\"\n")
+        file.write("sbatch --dependency=afterok:$SPINUP Allrun.slurm\n")
+
+    # print(f"spinUp successfully created at: \n{spinUp_path}")
+
+create_spinup_case()
+
 #------------------------------------------------
 #------------------------------------------------
 # Summary
@@ -2710,6 +5894,121 @@ def print_simulation_summary():
     print(f"Width: {meshParameters['yMax'] - meshParameters['yMin']} meters")
     print(f"Length: {meshParameters['xMax'] - meshParameters['xMin']} meters")
     print(f"Height: {meshParameters['zMax'] - meshParameters['zMin']} meters")
+    print(f"baseCells: {meshParameters['total_cells']} ({meshParameters['xElem']} x {meshParameters['yElem']} x {meshParameters['zElem']})")
+    print(f"decomposition: {' x '.join(str(n) for n in meshParameters['decomposition'])} "
+          f"({SolverParameters.getSolverParameters().decompositionMethod})")
+    if meshParameters['zGrading'] != "1":
+        print(f"zGrading: {meshParameters['zFineElem']} uniform cells up to {meshParameters['zFineElem'] * meshParameters['cell_size']} meters, "
+              f"{meshParameters['zElem'] - meshParameters['zFineElem']} stretched cells above")
+    cellCounts = estimate_cell_counts()
+    loadBalance = compute_load_balance()
+    print(f"estimatedCells: {cellCounts['total']} (levels 0-4: {', '.join(str(n) for n in cellCounts['levels'])}; "
+          f"ALM cells: {sum(cellCounts['alm'].values())})")
+    print(f"loadImbalance: {round(100 * loadBalance['unweighted'], 1)} % unweighted, "
+          f"{round(100 * loadBalance['weighted'], 1)} % weighted "
+          f"(weightedDecomposition {'on' if SolverParameters.getSolverParameters().weightedDecomposition else 'off'})")
+    if SolverParameters.getSolverParameters().weightedDecomposition and loadBalance["weighted"] >= loadBalance["unweighted"]:
+        # rotors fit into single ranks: the weights only move plain cells onto the other ranks
+        print(f"Warnung: weightedDecomposition verschlechtert die Lastverteilung ({round(100 * loadBalance['weighted'], 1)} % "
+              f"statt {round(100 * loadBalance['unweighted'], 1)} % ungewichtet), Solver.weightedDecomposition ausschalten")
+    layout = compute_slurm_layout()
+    memory = estimate_rank_memory()
+    print(f"memoryPerRank: {memory['estimate']} MB (mesh {memory['mesh']}, fields {memory['fields']}, matrices {memory['matrices']}, "
+          f"ALM {memory['alm']}, halo {memory['halo']}, base {memory['base']}; calibration {round(memory['calibration'], 3)}) "
+          f"-> request {memory['request']} MB")
+    print(f"slurm: {SolverParameters.getSolverParameters().computeCores} ranks on {layout['nodes']} nodes "
+          f"({layout['tasksPerNode']} per node, {layout['tasksPerCore']} per core), mem-per-cpu {layout['memPerCpu']}"
+          f"{'' if layout['hint'] else ' (no cluster profile)'}")
+    cost = compute_run_cost()
+    print(f"runCost: {cost['steps']} steps x {round(cost['stepTime'], 3)} s = {round(cost['wallClock'], 1)} h wall-clock, "
+          f"{round(cost['coreHours'])} core-hours on {SolverParameters.getSolverParameters().computeCores} cores "
+          f"(efficiency {round(100 * cost['efficiency'])} %, calibration {round(cost['calibration'], 3)})")
+    recommendedCores, recommendedCost = recommend_core_count()
+    print(f"recommendedCores: {recommendedCores} ({round(recommendedCost['wallClock'], 1)} h wall-clock, "
+          f"{round(recommendedCost['coreHours'])} core-hours, efficiency {round(100 * recommendedCost['efficiency'])} %)")
+    schedule = compute_flow_through_schedule()
+    if schedule["active"]:
+        savedCoreHours = compute_run_cost(endTime=schedule["userEndTime"])["coreHours"] - cost["coreHours"]
+        print(f"flowThroughSchedule: flow-through {round(schedule['flowThrough'], 1)} s, averaging {schedule['averageStart']}-{schedule['endTime']} s, "
+              f"endTime {schedule['endTime']} s instead of {schedule['userEndTime']} s "
+              f"({'saves' if savedCoreHours >= 0 else 'costs'} {abs(round(savedCoreHours))} core-hours)")
+    solverParameters = SolverParameters.getSolverParameters()
+    ioPlan = compute_io_plan()
+    print(f"ioPlan: {ioPlan['mode']}, {round(ioPlan['bytesPerWrite'] / 1e9, 2)} GB per write x {ioPlan['writes']} writes, "
+          f"total {round(ioPlan['totalBytes'] / 1e9, 1)} GB"
+          + (f"{f' of {solverParameters.diskBudget} GB budget' if solverParameters.diskBudget > 0 else ''} (writeInterval {ioPlan['writeInterval']}, keep {ioPlan['keepSnapshots']} snapshots"
+             + (f", {' '.join(ioPlan['objects'])} every {ioPlan['objectInterval']} s" if ioPlan['objects'] else "") + ")"
+             if solverParameters.diskBudget > 0 or ioPlan['mode'] != "full" else " (no diskBudget)"))
+    inflowPlan = compute_inflow_plan(benchmark=True)
+    if inflowPlan["active"]:
+        # a filter inside the solver builds at least one such field per time step, serially on the master rank
+        generateSeconds = inflowPlan["msPerSnapshot"] * len(inflowPlan["times"]) / 1000
+        filterHours = inflowPlan["msPerSnapshot"] * inflowPlan["steps"] / 3.6e6
+        print(f"inflowTimeSeries: {len(inflowPlan['times'])} snapshots x {inflowPlan['points']} points "
+              f"({round(inflowPlan['totalBytes'] / 1e9, 2)} GB, included in ioPlan), {round(inflowPlan['msPerSnapshot'], 1)} ms per snapshot "
+              f"({'numpy' if numpy is not None else 'pure Python'}): ~{round(generateSeconds)} s once before the run instead of "
+              f">= {round(filterHours, 2)} h on the master rank over {inflowPlan['steps']} solver steps")
+    if solverParameters.coarseSpinUp:
+        spinUpPlan = compute_spinup_plan()
+        print(f"coarseSpinUp: spinUp/ with {spinUpPlan['cells']} cells on {spinUpPlan['cores']} cores until t = {spinUpPlan['endTime']} s "
+              f"(deltaT {spinUpPlan['deltaT']} s, {round(spinUpPlan['coreHours'])} core-hours), fine run maps the fields "
+              f"(saves {round(spinUpPlan['savedCoreHours'])} core-hours)")
+    if solverParameters.isRedistribution():
+        print(f"redistribution: {solverParameters.previousCores} -> {solverParameters.computeCores} ranks with redistributePar "
+              f"on {max(solverParameters.previousCores, solverParameters.computeCores)} ranks (Allredistribute.slurm)")
+    if solverParameters.surfaceSampling:
+        print(f"surfaceSampling: {len(set(t['hubHeight'] for t in WindTurbines.getTurbines()['turbines']))} hub-height planes, "
+              f"rotor plane, {'/'.join(str(d) for d in solverParameters.sampleDistances)}D sections and streamwise cut per turbine, "
+              f"every {solverParameters.sampleInterval} s ({solverParameters.sampleFormat})")
+    if solverParameters.rotorDiscAverage:
+        discs = WindTurbines.getRotorDiscs()
+        print(f"rotorDiscAverage: {len(discs)} discs (rotor and {solverParameters.discUpstream}D upstream), "
+              f"volAverage of U every {solverParameters.discInterval} steps")
+    zoneAverage = compute_zone_average()
+    if zoneAverage["requested"]:
+        cellsPerRank = estimate_cell_counts()["total"] / solverParameters.computeCores / (1024 * 1024)
+        domainAverage = zoneAverage["domainBytes"] * cellsPerRank
+        wakeAverage = zoneAverage["zoneBytes"] * cellsPerRank
+        if zoneAverage["active"]:
+            print(f"averageRegion: wake, {round(100 * zoneAverage['fraction'])} % of the cells from t = {schedule['averageStart']} s, "
+                  f"averages peak at {round(wakeAverage)} MB instead of {round(domainAverage)} MB per rank "
+                  f"(saves {round(domainAverage - wakeAverage)} MB), written as full fields, zero outside averageZone")
+        else:
+            breakEven = 1 - 48 / zoneAverage["domainBytes"]
+            print(f"averageRegion: wake falls back to the domain fieldAverage, {round(100 * zoneAverage['fraction'])} % "
+                  f"of the cells lie in the wake regions, zone averages would peak at {round(wakeAverage)} MB instead of "
+                  f"{round(domainAverage)} MB per rank (saves memory only below {round(100 * breakEven)} %)")
+    if solverParameters.fieldAverage:
+        averagingTime = schedule["endTime"] - schedule["averageStart"]
+        if averagingTime <= 0:
+            print(f"Warnung: fieldAverage beginnt bei t = {schedule['averageStart']} s, nicht vor endTime {schedule['endTime']} s, "
+                  f"es entstehen keine Mittelwerte (Solver.flowThroughSchedule einschalten oder endTime erhöhen)")
+        elif averagingTime < solverParameters.averagingFlowThroughs * schedule["flowThrough"] - 1e-9 and solverParameters.averageStart == "auto":
+            print(f"Warnung: fieldAverage mittelt nur {round(averagingTime, 1)} s ({round(averagingTime / schedule['flowThrough'], 2)} "
+                  f"statt {solverParameters.averagingFlowThroughs} Durchströmzeiten), Solver.flowThroughSchedule einschalten oder endTime erhöhen")
+    if not ioPlan["fits"]:
+        print(f"Warnung: Ausgabe {round(ioPlan['totalBytes'] / 1e9, 1)} GB passt nicht in diskBudget {solverParameters.diskBudget} GB")
+    if solverParameters.convergenceStop:
+        earliestStop = schedule["averageStart"] + solverParameters.convergenceMinWindow * schedule["flowThrough"]
+        maxSaved = cost["coreHours"] - compute_run_cost(endTime=min(earliestStop, schedule["endTime"]))["coreHours"]
+        print(f"convergenceStop: cp/cd of {len(WindTurbines.getTurbines()['turbines'])} turbines, tolerance "
+              f"{round(100 * solverParameters.convergenceTolerance, 2)} %, earliest stop {round(earliestStop)} s "
+              f"(saves up to {round(maxSaved)} core-hours)")
+        if earliestStop >= schedule["endTime"]:
+            print(f"Warnung: convergenceStop kann den Lauf nicht beenden, frühester Stopp {round(earliestStop)} s liegt nicht vor "
+                  f"endTime {schedule['endTime']} s (Solver.flowThroughSchedule einschalten oder convergenceMinWindow verkleinern)")
+    timeStep = compute_time_step()
+    print(f"deltaT: {timeStep['deltaT']} s ({timeStep['mode']}; stable limit {timeStep['stableDeltaT']} s from {timeStep['driver']}"
+          f"{', maxCo ' + str(timeStep['maxCo']) if timeStep['mode'] == 'adaptive' else ''})")
+    if timeStep['deltaT'] > timeStep['stableDeltaT']:
+        print(f"Warnung: deltaT {timeStep['deltaT']} s liegt über dem stabilen Zeitschritt {timeStep['stableDeltaT']} s")
+    print(f"refinementTransitions: ok ({MeshSettings.getMeshSettings().transitionCells} cells between levels"
+          f"{', autoGrowRefinement' if MeshSettings.getMeshSettings().autoGrowRefinement else ''})")
+    if MeshSettings.getMeshSettings().nestedWakeRefinement:
+        # horizontal area at the finest level (overlapping shells counted once per turbine)
+        nearWakeArea = sum(polygon_area(nearWake) for nearWake in WakeRegion.getNearWakeRegions())
+        wakeArea = sum(polygon_area(wake) for wake in WakeRegion.getSubdividedWakeRegions())
+        print(f"nestedWakeRefinement: finest level area {round(nearWakeArea)} m² (full wake regions {round(wakeArea)} m²)")
 
 print_simulation_summary()
 